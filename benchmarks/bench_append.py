@@ -0,0 +1,101 @@
+""" Benchmark da atualização incremental (utils.ingest.append_delta) x reconstrução completa do artefato (utils.storage.build_artifact).
+
+    O arquivo de atualização tem 1% das linhas do CSV: metade são restaurantes existentes com novas avaliações e metade são
+    restaurantes novos. O resultado do upsert é conferido contra a limpeza completa do CSV já com as mudanças aplicadas, e as métricas
+    de concorrência atualizadas somente em volta das mudanças (utils.competition.update_competition_metrics) contra o cálculo completo.
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_append.py
+"""
+#==============================================
+# Libraries
+#==============================================
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from bench_cleaning import scale_dataset
+from utils.aggregates import AGGREGATE_KEYS, build_aggregates
+from utils.cleaning import clean_dataframe, compact_dataframe
+from utils.competition import competition_metrics
+from utils.ingest import append_delta
+from utils.storage import DATASET_PATH, aggregates_path, artifact_metadata, build_artifact, load_clean, read_competition
+
+#==============================================
+# Funções
+#==============================================
+# Função para gerar o arquivo de atualização:
+def make_delta(df, fraction=0.01):
+    """ Retorna um CSV bruto com `fraction` das linhas: metade restaurantes existentes com +10 avaliações e metade restaurantes novos. """
+    sample = df.drop_duplicates('Restaurant ID').sample(frac=fraction, random_state=0)
+    half = len(sample) // 2
+
+    updated = sample.iloc[:half].assign(Votes=lambda x: x['Votes'] + 10)
+    inserted = sample.iloc[half:].assign(**{'Restaurant ID': lambda x: x['Restaurant ID'] + 900_000_000})
+
+    return pd.concat([updated, inserted], ignore_index=True)
+
+
+# Função para aplicar a atualização diretamente no CSV bruto:
+def apply_to_source(df, delta):
+    """ Retorna o CSV bruto com as linhas da atualização substituindo (ou acrescentando) os restaurantes, para conferência. """
+    replaced = df['Restaurant ID'].isin(delta['Restaurant ID'])
+
+    updated = delta.set_index('Restaurant ID').loc[df.loc[replaced, 'Restaurant ID']].reset_index()
+
+    patched = df.copy()
+    patched.loc[replaced, :] = updated.loc[:, df.columns].to_numpy()
+
+    return pd.concat([patched, delta.loc[~delta['Restaurant ID'].isin(df['Restaurant ID'])]], ignore_index=True)
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    df_original = pd.read_csv(os.path.join(ROOT, DATASET_PATH))
+
+    print(f"{'fator':>6} {'linhas':>8} {'delta':>6} {'rebuild (s)':>12} {'append (s)':>11} {'speedup':>8}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+
+        for factor in (1, 10):
+
+            source = os.path.join(tmp, 'zomato.csv')
+            artifact = os.path.join(tmp, 'zomato.parquet')
+            delta_path = os.path.join(tmp, 'delta.csv')
+
+            df_source = scale_dataset(df_original, factor)
+            delta = make_delta(df_source)
+
+            df_source.to_csv(source, index=False)
+            delta.to_csv(delta_path, index=False)
+
+            start = time.perf_counter()
+            build_artifact(source, artifact, cache_dir=tempfile.mkdtemp(dir=tmp))
+            rebuild = time.perf_counter() - start
+
+            start = time.perf_counter()
+            append_delta(delta_path, source, artifact)
+            append = time.perf_counter() - start
+
+            print(f'{factor:>6} {len(df_source):>8} {len(delta):>6} {rebuild:>12.3f} {append:>11.3f} {rebuild / append:>7.1f}x')
+
+            # Conferência: o upsert deve ser igual à limpeza completa do CSV com as mudanças, e os agregados incrementais iguais aos recalculados.
+            expected = compact_dataframe(clean_dataframe(apply_to_source(df_source, delta).astype(df_source.dtypes.to_dict())))
+            result = load_clean(source, artifact=artifact)
+
+            pd.testing.assert_frame_equal(result, expected)
+            stored = pd.read_parquet(aggregates_path(artifact)).set_index(AGGREGATE_KEYS)
+            pd.testing.assert_frame_equal(stored, build_aggregates(expected), check_exact=False)
+            pd.testing.assert_frame_equal(read_competition(artifact_metadata(artifact)['version'], artifact), competition_metrics(expected))
+
+            os.remove(artifact)
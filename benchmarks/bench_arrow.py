@@ -0,0 +1,109 @@
+""" Benchmark das tabelas enviadas ao st.dataframe (utils.tables): página copiada do dataframe e convertida para Arrow pelo Streamlit a
+    cada execução (como as páginas faziam) x página selecionada da tabela Arrow do dataset e serializada diretamente.
+
+    Tabelas medidas, com 7 mil e 1 milhão de restaurantes:
+        - ranking da Visão Tipos de Culinária (utils.ranking.ranked_rows) com páginas de 20 e 100 restaurantes e uma página de 5000;
+        - 50 restaurantes mais próximos de Nova Délhi da Visão Geral (utils.nearby.restaurants_near);
+        - trecho contínuo de 5000 linhas do dataset (fatia sem cópia).
+
+    Para cada tabela, mede o tempo de montar e serializar a tabela (a mesma serialização do st.dataframe, streamlit.elements.arrow.marshall)
+    e o tamanho da mensagem enviada ao navegador, e confere que as duas versões têm os mesmos valores.
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_arrow.py
+"""
+#==============================================
+# Libraries
+#==============================================
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from streamlit.elements.arrow import marshall
+from streamlit.proto.Arrow_pb2 import Arrow as ArrowProto
+
+from bench_map import scale_points
+from utils.bitmaps import build_bitmap_index
+from utils.clusters import build_spatial_index
+from utils.loader import load_dataset
+from utils.nearby import restaurants_near
+from utils.ranking import build_ranking_index, ranked_rows
+from utils.tables import build_arrow_table, table_rows
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Colunas da tabela do ranking:
+RANKING_COLUMNS = ['restaurant_id', 'restaurant_name', 'city', 'country', 'cuisines', 'average_cost_for_two', 'aggregate_rating',
+                   'votes', 'nearest_competitor_km', 'competitors_1km']
+
+# Colunas da tabela de restaurantes próximos:
+NEARBY_COLUMNS = ['restaurant_name', 'city', 'country', 'cuisines', 'price_type', 'aggregate_rating']
+
+#==============================================
+# Funções
+#==============================================
+# Versão anterior: página copiada do dataframe:
+def pandas_page(df, rows, columns):
+    """ Copia as linhas e as colunas da página do dataframe (df.iloc). """
+    return df.iloc[rows, df.columns.get_indexer(columns)]
+
+
+# Serialização feita pelo st.dataframe:
+def serialize(data):
+    """ Retorna os bytes da tabela como o st.dataframe os envia ao navegador (conversão para Arrow, se necessária, e serialização). """
+    proto = ArrowProto()
+    marshall(proto, data)
+
+    return proto.data
+
+
+# Função para medir uma tabela:
+def measure(build):
+    """ Retorna (ms, bytes) para montar a tabela com `build` e serializá-la. """
+    elapsed = min(timeit.repeat(lambda: serialize(build()), number=5, repeat=5)) / 5 * 1000
+
+    return elapsed, len(serialize(build()))
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    df = load_dataset()
+
+    print(f"{'restaurantes':>12} {'tabela':>18} {'pandas (ms)':>12} {'arrow (ms)':>11} {'pandas (KB)':>12} {'arrow (KB)':>11}")
+
+    for rows in (len(df), 1_000_000):
+
+        df_aux = df if rows == len(df) else scale_points(df, rows).assign(restaurant_id=np.arange(rows, dtype=np.int32))
+
+        table = build_arrow_table(df_aux)
+        ranked = ranked_rows(build_ranking_index(df_aux), build_bitmap_index(df_aux), ('bench', rows))
+        nearby, _ = restaurants_near(df_aux, build_spatial_index(df_aux), 28.6139, 77.2090, 5, limit=50)
+
+        cases = [('ranking 20', ranked[:20], RANKING_COLUMNS),
+                 ('ranking 100', ranked[980:1080], RANKING_COLUMNS),
+                 ('ranking 5000', ranked[:5000], RANKING_COLUMNS),
+                 ('próximos 50', nearby, NEARBY_COLUMNS),
+                 ('trecho contínuo', np.arange(1000, 6000), RANKING_COLUMNS)]
+
+        for name, page, columns in cases:
+
+            old = pandas_page(df_aux, page, columns)
+            new = table_rows(table, page, columns)
+
+            pd.testing.assert_frame_equal(old.reset_index(drop=True), new.to_pandas())
+
+            old_ms, old_bytes = measure(lambda: pandas_page(df_aux, page, columns))
+            new_ms, new_bytes = measure(lambda: table_rows(table, page, columns))
+
+            print(f'{rows:>12} {name:>18} {old_ms:>12.2f} {new_ms:>11.2f} {old_bytes / 1024:>12.1f} {new_bytes / 1024:>11.1f}')
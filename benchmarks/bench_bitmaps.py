@@ -0,0 +1,70 @@
+""" Benchmark dos filtros das páginas: df['coluna'].isin(seleção) + cópia filtrada do dataframe x índice de bitmaps (utils.bitmaps).
+
+    Mede a seleção padrão da Visão Tipos de Culinária (todos os países e todos os tipos de culinária, o caso de toda primeira visita)
+    e uma seleção parcial (3 países e 20 tipos de culinária).
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_bitmaps.py
+"""
+#==============================================
+# Libraries
+#==============================================
+import os
+import sys
+import time
+import timeit
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from bench_cleaning import scale_dataset
+from utils.bitmaps import build_bitmap_index, select_rows
+from utils.cleaning import clean_dataframe, compact_dataframe
+from utils.storage import DATASET_PATH
+
+#==============================================
+# Funções
+#==============================================
+# Versão anterior: comparação linha a linha e cópia filtrada do dataframe:
+def isin_filter(df, countries, cuisines):
+    """ Reproduz os filtros da página antes do índice de bitmaps. """
+    df = df.loc[df['country'].isin(countries), :]
+    df = df.loc[df['cuisines'].isin(cuisines), :]
+
+    return df
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    df_original = pd.read_csv(os.path.join(ROOT, DATASET_PATH))
+
+    print(f"{'fator':>6} {'linhas':>8} {'seleção':>8} {'índice (ms)':>12} {'isin (ms)':>10} {'bitmaps (ms)':>13} {'speedup':>8}")
+
+    for factor in (1, 10, 50):
+
+        df = compact_dataframe(clean_dataframe(scale_dataset(df_original, factor)))
+
+        start = time.perf_counter()
+        bitmaps = build_bitmap_index(df)
+        build = (time.perf_counter() - start) * 1000
+
+        countries, cuisines = list(df['country'].unique()), list(df['cuisines'].unique())
+
+        for name, selection in (('padrão', (countries, cuisines)), ('parcial', (countries[:3], cuisines[:20]))):
+
+            rows = select_rows(bitmaps, country=selection[0], cuisines=selection[1])
+
+            # Conferência: as posições devem ser as mesmas linhas do filtro com isin.
+            assert np.array_equal(df.index[rows], isin_filter(df, *selection).index)
+
+            before = min(timeit.repeat(lambda: isin_filter(df, *selection), number=10, repeat=5)) / 10 * 1000
+            after = min(timeit.repeat(lambda: select_rows(bitmaps, country=selection[0], cuisines=selection[1]), number=10, repeat=5)) / 10 * 1000
+
+            print(f'{factor:>6} {len(df):>8} {name:>8} {build:>12.1f} {before:>10.2f} {after:>13.2f} {before / after:>7.1f}x')
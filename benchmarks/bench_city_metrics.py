@@ -0,0 +1,100 @@
+""" Benchmark das métricas da Visão Cidades: quatro agrupamentos e ordenações completas por gráfico x uma tabela única
+    (utils.metrics.city_metrics) com seleção parcial do top 10 (utils.metrics.top_n).
+
+    As cópias do dataset recebem cidades com nomes diferentes, para que a quantidade de cidades (e de células do cubo) cresça com o fator.
+    Mede somente a preparação dos dados dos gráficos; a montagem das figuras (plotly) é igual nas duas versões.
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_city_metrics.py
+"""
+#==============================================
+# Libraries
+#==============================================
+import os
+import sys
+import timeit
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from utils.aggregates import build_aggregates, count_distinct, filter_aggregates, rollup
+from utils.cleaning import clean_dataframe, compact_dataframe
+from utils.metrics import city_metrics, top_n
+from utils.storage import DATASET_PATH
+
+#==============================================
+# Funções
+#==============================================
+# Função para aumentar o dataset com cidades novas:
+def scale_cities(df, factor):
+    """ Replica o dataset `factor` vezes com restaurant_id e nomes de cidade diferentes em cada cópia. """
+    copies = []
+
+    for i in range(factor):
+        copy = df.copy()
+        copy['Restaurant ID'] = copy['Restaurant ID'] + i * 100_000_000
+        copy['City'] = copy['City'] + (f' {i}' if i else '')
+        copies.append(copy)
+
+    return pd.concat(copies, ignore_index=True)
+
+
+# Versão anterior: um agrupamento e uma ordenação completa por gráfico:
+def four_passes(aggregates):
+    """ Reproduz a preparação de dados dos quatro gráficos antes da tabela única. """
+    charts = []
+
+    charts.append(rollup(aggregates, ['country', 'city']).loc[:, ['restaurants']]
+                  .sort_values(['restaurants', 'city'], ascending=[False, True]).reset_index().head(10))
+
+    for bucket in ('> 4', '< 2.5'):
+        charts.append(rollup(filter_aggregates(aggregates, rating_bucket=[bucket]), ['country', 'city']).loc[:, ['restaurants']]
+                      .sort_values(['restaurants', 'city'], ascending=[False, True]).reset_index().head(10))
+
+    charts.append(count_distinct(aggregates, ['country', 'city'], 'cuisines').to_frame()
+                  .sort_values(['cuisines', 'city'], ascending=[False, True]).reset_index().head(10))
+
+    return charts
+
+
+# Versão nova: uma tabela de métricas e seleção parcial do top 10:
+def single_pass(aggregates):
+    """ Prepara os dados dos quatro gráficos a partir de city_metrics. """
+    cities = city_metrics(aggregates)
+
+    charts = [top_n(cities.loc[:, ['restaurants']], 'restaurants').reset_index()]
+
+    for column in ('rating_above_4', 'rating_below_2_5'):
+        charts.append(top_n(cities.loc[cities[column] > 0, [column]], column).reset_index())
+
+    charts.append(top_n(cities.loc[:, ['cuisines']], 'cuisines').reset_index())
+
+    return charts
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    df_original = pd.read_csv(os.path.join(ROOT, DATASET_PATH))
+
+    print(f"{'fator':>6} {'cidades':>8} {'células':>8} {'4 passadas (ms)':>16} {'1 passada (ms)':>15} {'speedup':>8}")
+
+    for factor in (1, 10, 50):
+
+        aggregates = build_aggregates(compact_dataframe(clean_dataframe(scale_cities(df_original, factor))))
+
+        # Conferência: os dois caminhos devem gerar os mesmos top 10.
+        for old, new in zip(four_passes(aggregates), single_pass(aggregates)):
+            assert old.iloc[:, :2].equals(new.iloc[:, :2]) and (old.iloc[:, 2].to_numpy() == new.iloc[:, 2].to_numpy()).all()
+
+        before = min(timeit.repeat(lambda: four_passes(aggregates), number=5, repeat=5)) / 5 * 1000
+        after = min(timeit.repeat(lambda: single_pass(aggregates), number=5, repeat=5)) / 5 * 1000
+
+        cities = aggregates.index.droplevel(['cuisines', 'price_type', 'rating_bucket']).nunique()
+
+        print(f'{factor:>6} {cities:>8} {len(aggregates):>8} {before:>16.2f} {after:>15.2f} {before / after:>7.1f}x')
@@ -0,0 +1,124 @@
+""" Benchmark da limpeza dos dados: versão original (linha a linha com .apply()) x versão vetorizada (utils.cleaning).
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_cleaning.py
+"""
+#==============================================
+# Libraries
+#==============================================
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cleaning import (COLORS, COUNTRIES, adjust_columns_order, clean_dataframe, color_name, country_name, create_price_type,
+                            first_cuisine, rename_columns)
+from utils.loader import DATASET_PATH
+
+#==============================================
+# Funções
+#==============================================
+# Versão original da limpeza, com funções aplicadas linha a linha:
+def clean_dataframe_rowwise(df):
+    """ Reproduz a limpeza original (um .apply() por coluna derivada) para servir de referência de saída e de tempo. """
+
+    def create_price_type(price_range):
+        if price_range == 1:
+            return "cheap"
+        elif price_range == 2:
+            return "normal"
+        elif price_range == 3:
+            return "expensive"
+        else:
+            return "gourmet"
+
+    df = df.dropna()
+    df = rename_columns(df)
+    df = df.drop(columns=['switch_to_order_menu'])
+    df['country'] = df.loc[:, 'country_code'].apply(lambda x: COUNTRIES[x])
+    df = df.drop(columns=['country_code'])
+    df['price_type'] = df.loc[:, 'price_range'].apply(lambda x: create_price_type(x))
+    df['color_name'] = df.loc[:, 'rating_color'].apply(lambda x: COLORS[x])
+    df['cuisines'] = df.loc[:, 'cuisines'].apply(lambda x: x.split(',')[0])
+    df = df.drop_duplicates()
+    df = adjust_columns_order(df)
+    df = df.loc[df['average_cost_for_two'] != 25000017, :]
+    df = df.reset_index(drop=True)
+
+    return df
+
+
+# Colunas derivadas - versão original (linha a linha):
+def derived_columns_rowwise(df):
+    """ Cria apenas as quatro colunas derivadas (país, tipo de preço, cor e culinária) com .apply(), como na versão original. """
+    price_types = {1: 'cheap', 2: 'normal', 3: 'expensive'}
+
+    return (df['country_code'].apply(lambda x: COUNTRIES[x]),
+            df['price_range'].apply(lambda x: price_types.get(x, 'gourmet')),
+            df['rating_color'].apply(lambda x: COLORS[x]),
+            df['cuisines'].apply(lambda x: x.split(',')[0]))
+
+
+# Colunas derivadas - versão vetorizada:
+def derived_columns_vectorized(df):
+    """ Cria apenas as quatro colunas derivadas com as funções vetorizadas de utils.cleaning. """
+    return (country_name(df['country_code']),
+            create_price_type(df['price_range']),
+            color_name(df['rating_color']),
+            first_cuisine(df['cuisines']))
+
+
+# Função para medir o melhor tempo de algumas execuções:
+def best_time(func, df, repeat=3):
+    """ Retorna o menor tempo (em segundos) entre `repeat` execuções de func(df). """
+    times = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+# Função para gerar um dataset aumentado:
+def scale_dataset(df, factor):
+    """ Replica o dataset `factor` vezes, alterando o restaurant_id de cada cópia para que as linhas não sejam removidas como duplicadas. """
+    copies = []
+
+    for i in range(factor):
+        copy = df.copy()
+        copy['Restaurant ID'] = copy['Restaurant ID'] + i * 100_000_000
+        copies.append(copy)
+
+    return pd.concat(copies, ignore_index=True)
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    df_original = pd.read_csv(DATASET_PATH)
+
+    pd.testing.assert_frame_equal(clean_dataframe(df_original), clean_dataframe_rowwise(df_original))
+
+    print(f"{'fator':>6} {'linhas':>10} {'etapa':>18} {'apply (s)':>10} {'vetorizado (s)':>15} {'speedup':>8}")
+
+    for factor in (1, 10, 100):
+
+        df_scaled = scale_dataset(df_original, factor)
+        df_renamed = rename_columns(df_scaled.dropna())
+
+        steps = [('colunas derivadas', derived_columns_rowwise, derived_columns_vectorized, df_renamed),
+                 ('clean_dataframe', clean_dataframe_rowwise, clean_dataframe, df_scaled)]
+
+        for step, rowwise_func, vectorized_func, data in steps:
+
+            rowwise = best_time(rowwise_func, data)
+            vectorized = best_time(vectorized_func, data)
+
+            print(f'{factor:>6} {len(df_scaled):>10} {step:>18} {rowwise:>10.3f} {vectorized:>15.3f} {rowwise / vectorized:>7.1f}x')
@@ -0,0 +1,94 @@
+""" Benchmark do cache em disco das etapas da limpeza (utils.cleaning.run_cleaning): limpeza completa sem cache (como clean_dataframe
+    fazia) x limpeza com o resultado de cada etapa guardado pela impressão digital (utils.pipeline).
+
+    Cenários, com 7 mil e 100 mil linhas (em uma pasta temporária de cache):
+        1. sem cache;
+        2. primeira execução com cache (todas as etapas executadas e gravadas);
+        3. mesma entrada de novo (somente o resultado final é lido), com a impressão digital calculada a partir do dataframe e já
+           conhecida (como o hash do CSV que utils.storage informa);
+        4. correção de um mapeamento (COUNTRIES: 'New Zeland' -> 'New Zealand'): somente a etapa do país e as etapas abaixo dela são
+           executadas, as colunas de tipo de preço, cores e culinária vêm do cache.
+
+    Confere que o resultado é sempre igual ao de clean_dataframe sem cache e imprime o tempo de cada etapa do cenário 4.
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_cleaning_dag.py
+"""
+#==============================================
+# Libraries
+#==============================================
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from bench_cleaning import scale_dataset
+from utils import cleaning
+from utils.loader import DATASET_PATH
+from utils.pipeline import frame_fingerprint
+
+#==============================================
+# Funções
+#==============================================
+# Função para medir uma execução da limpeza:
+def measure(df, cache_dir, fingerprint=None):
+    """ Retorna (Dataframe limpo, tabela de tempos das etapas, ms da execução completa, incluindo as impressões digitais). """
+    start = time.perf_counter()
+    clean, timings = cleaning.run_cleaning(df, cache_dir=cache_dir, fingerprint=fingerprint)
+
+    return clean, timings, (time.perf_counter() - start) * 1000
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    df_original = pd.read_csv(DATASET_PATH)
+
+    print(f"{'linhas':>10} {'cenário':>22} {'tempo (ms)':>11} {'executadas':>11} {'do cache':>9}")
+
+    for factor in (1, 15):
+
+        df = scale_dataset(df_original, factor)
+        countries = dict(cleaning.COUNTRIES)
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+
+            expected = cleaning.clean_dataframe(df)
+
+            fingerprint = frame_fingerprint(df)
+
+            scenarios = [('sem cache', None, None), ('1ª execução com cache', cache_dir, None), ('mesma entrada', cache_dir, None),
+                         ('mesma entrada (hash)', cache_dir, fingerprint)]
+
+            for name, directory, known in scenarios:
+
+                clean, timings, elapsed = measure(df, directory, known)
+
+                pd.testing.assert_frame_equal(clean, expected)
+
+                executed = (timings['Estado'] == 'executada').sum()
+                print(f'{len(df):>10} {name:>22} {elapsed:>11.1f} {executed:>11} {len(timings) - executed:>9}')
+
+            cleaning.COUNTRIES[148] = 'New Zealand'
+
+            try:
+                expected = cleaning.clean_dataframe(df)
+                clean, timings, elapsed = measure(df, cache_dir)
+            finally:
+                cleaning.COUNTRIES.clear()
+                cleaning.COUNTRIES.update(countries)
+
+            pd.testing.assert_frame_equal(clean, expected)
+
+            executed = (timings['Estado'] == 'executada').sum()
+            print(f"{len(df):>10} {'COUNTRIES corrigido':>22} {elapsed:>11.1f} {executed:>11} {len(timings) - executed:>9}")
+
+        print(f'\n{timings.to_string(index=False)}\n')
@@ -0,0 +1,69 @@
+""" Benchmark da pirâmide de clusters do mapa interativo (utils.clusters): tempo de construção (uma vez por versão dos dados) e tempo
+    da consulta de uma região visível de 1024x600 pixels em vários níveis de zoom, com 7 mil, 70 mil e 500 mil restaurantes.
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_clusters.py
+"""
+#==============================================
+# Libraries
+#==============================================
+import os
+import sys
+import time
+import timeit
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from bench_map import scale_points
+from utils.clusters import TILE_PIXELS, build_cluster_pyramid, clusters_in_view
+from utils.loader import load_dataset
+
+#==============================================
+# Funções
+#==============================================
+# Função para calcular a região visível de um mapa centralizado em um ponto:
+def view_bounds(latitude, longitude, zoom, width=1024, height=600):
+    """ Retorna a região visível ((sul, oeste), (norte, leste)) de um mapa de width x height pixels (aproximação linear em latitude). """
+    degrees_per_pixel = 360 / (TILE_PIXELS * 2 ** zoom)
+
+    half_width, half_height = width / 2 * degrees_per_pixel, height / 2 * degrees_per_pixel * np.cos(np.radians(latitude))
+
+    return ((latitude - half_height, longitude - half_width), (latitude + half_height, longitude + half_width))
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    df = load_dataset()
+
+    # Centro do mapa: Nova Délhi, a região com mais restaurantes do dataset.
+    center = (28.6, 77.2)
+
+    zooms = (1, 4, 8, 12, 16)
+
+    print(f"{'pontos':>8} {'construção (s)':>15} " + ' '.join(f'{f"zoom {zoom} (ms)":>13}' for zoom in zooms))
+
+    for rows in (len(df), 70_000, 500_000):
+
+        df_aux = df if rows == len(df) else scale_points(df, rows)
+
+        start = time.perf_counter()
+        pyramid = build_cluster_pyramid(df_aux)
+        build = time.perf_counter() - start
+
+        # Conferência: o nível 0 contém todos os restaurantes.
+        assert pyramid[0]['restaurants'].sum() == rows
+
+        queries = []
+
+        for zoom in zooms:
+            bounds = view_bounds(*center, zoom)
+            queries.append(min(timeit.repeat(lambda: clusters_in_view(pyramid, zoom, bounds), number=10, repeat=3)) / 10 * 1000)
+
+        print(f'{rows:>8} {build:>15.2f} ' + ' '.join(f'{query:>13.2f}' for query in queries))
@@ -0,0 +1,84 @@
+""" Benchmark das métricas de concorrência (utils.competition.competition_metrics): tempo do cálculo com a grade 3D com 7 mil, 70 mil,
+    250 mil e 1 milhão de restaurantes x comparação de todos os pares do mesmo tipo de culinária (somente no dataset original).
+
+    Os datasets maiores são gerados com scale_points, que espalha cópias dos restaurantes em volta das posições originais (bem mais
+    denso que o dataset real - a coluna 'concorrentes' mostra a média de concorrentes a até 1 km).
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_competition.py
+"""
+#==============================================
+# Libraries
+#==============================================
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from bench_map import scale_points
+from utils.competition import COMPETITION_RADIUS_KM, competition_metrics
+from utils.loader import load_dataset
+from utils.nearby import haversine_km
+
+#==============================================
+# Funções
+#==============================================
+# Versão com todos os pares do mesmo tipo de culinária:
+def pairwise_competition(df):
+    """ Retorna as mesmas colunas de competition_metrics, calculando a distância de todos os pares de cada tipo de culinária (O(n²)). """
+    nearest = np.full(len(df), np.nan)
+    competitors = np.zeros(len(df), dtype=np.int32)
+
+    latitude, longitude = df['latitude'].to_numpy(), df['longitude'].to_numpy()
+
+    for rows in pd.Series(np.arange(len(df))).groupby(pd.factorize(df['cuisines'])[0]).agg(list):
+
+        rows = np.array(rows)
+
+        distances = haversine_km(latitude[rows][:, None], longitude[rows][:, None], latitude[rows][None, :], longitude[rows][None, :])
+        np.fill_diagonal(distances, np.inf)
+
+        competitors[rows] = (distances <= COMPETITION_RADIUS_KM).sum(axis=1)
+
+        if len(rows) > 1:
+            nearest[rows] = distances.min(axis=1)
+
+    return pd.DataFrame({'nearest_competitor_km': nearest, 'competitors_1km': competitors}, index=df.index)
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    df = load_dataset()
+
+    print(f"{'pontos':>8} {'todos os pares (s)':>19} {'grade (s)':>10} {'concorrentes':>13}")
+
+    for rows in (len(df), 70_000, 250_000, 1_000_000):
+
+        df_aux = df if rows == len(df) else scale_points(df, rows)
+
+        start = time.perf_counter()
+        competition = competition_metrics(df_aux)
+        grid = time.perf_counter() - start
+
+        pairwise = '-'
+
+        if rows == len(df):
+
+            start = time.perf_counter()
+            reference = pairwise_competition(df_aux)
+            pairwise = f'{time.perf_counter() - start:.2f}'
+
+            # Conferência: a grade encontra as mesmas contagens e distâncias que a comparação de todos os pares.
+            assert np.array_equal(competition['competitors_1km'], reference['competitors_1km'])
+            assert np.allclose(competition['nearest_competitor_km'], reference['nearest_competitor_km'], equal_nan=True)
+
+        print(f"{rows:>8} {pairwise:>19} {grid:>10.2f} {competition['competitors_1km'].mean():>13.1f}")
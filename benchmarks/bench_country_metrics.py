@@ -0,0 +1,86 @@
+""" Benchmark das métricas da Visão Países: quatro consolidações do cubo por gráfico x tabela única por seleção de países
+    (utils.metrics.country_summary), no primeiro acesso à seleção (cálculo) e nos reruns seguintes (cache).
+
+    Mede somente a preparação dos dados dos gráficos; para o tempo da página inteira, ver benchmarks/bench_pages.py.
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_country_metrics.py
+"""
+#==============================================
+# Libraries
+#==============================================
+import os
+import sys
+import timeit
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from bench_city_metrics import scale_cities
+from utils.aggregates import build_aggregates, count_distinct, filter_aggregates, rollup
+from utils.cleaning import clean_dataframe, compact_dataframe
+from utils.metrics import _country_cache, country_summary
+from utils.storage import DATASET_PATH
+
+#==============================================
+# Funções
+#==============================================
+# Versão anterior: filtro e uma consolidação do cubo por gráfico a cada rerun:
+def four_passes(aggregates, countries):
+    """ Reproduz a preparação de dados dos quatro gráficos antes da tabela única. """
+    aggregates = filter_aggregates(aggregates, country=countries)
+
+    by_country = rollup(aggregates, 'country')
+    restaurants = by_country['restaurants'].sort_values(ascending=False)
+
+    cities = count_distinct(aggregates, 'country', 'city').sort_values(ascending=False)
+
+    by_country = rollup(aggregates, 'country')
+    votes = (by_country['votes_sum'] / by_country['restaurants']).sort_values(ascending=False)
+
+    by_country = rollup(aggregates, 'country')
+    cost = (by_country['cost_sum'] / by_country['restaurants']).sort_values(ascending=False)
+
+    return restaurants, cities, votes, cost
+
+
+# Versão nova: uma tabela por seleção de países, ordenada por gráfico:
+def single_pass(aggregates, countries, cached=True):
+    """ Prepara os dados dos quatro gráficos a partir de country_summary (cached=False limpa o cache antes, simulando a primeira vez). """
+    if not cached:
+        _country_cache.clear()
+
+    summary = country_summary(aggregates, countries, version='bench')
+
+    return tuple(summary[column].sort_values(ascending=False) for column in ('restaurants', 'cities', 'avg_votes', 'avg_cost_for_two'))
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    df_original = pd.read_csv(os.path.join(ROOT, DATASET_PATH))
+
+    print(f"{'fator':>6} {'células':>8} {'4 passadas (ms)':>16} {'1ª vez (ms)':>12} {'cache (ms)':>11}")
+
+    for factor in (1, 10, 50):
+
+        aggregates = build_aggregates(compact_dataframe(clean_dataframe(scale_cities(df_original, factor))))
+        countries = list(aggregates.index.get_level_values('country').unique())
+
+        # Conferência: a tabela única deve ter os mesmos valores das consolidações separadas.
+        for old, new in zip(four_passes(aggregates, countries), single_pass(aggregates, countries, cached=False)):
+            pd.testing.assert_series_equal(old.sort_index(), new.sort_index(), check_names=False, check_dtype=False)
+
+        timing = lambda function: min(timeit.repeat(function, number=10, repeat=5)) / 10 * 1000
+
+        before = timing(lambda: four_passes(aggregates, countries))
+        miss = timing(lambda: single_pass(aggregates, countries, cached=False))
+        hit = timing(lambda: single_pass(aggregates, countries))
+
+        print(f'{factor:>6} {len(aggregates):>8} {before:>16.2f} {miss:>12.2f} {hit:>11.2f}')
+
@@ -0,0 +1,50 @@
+""" Benchmark da camada de densidade do mapa da Visão Geral (utils.density): tempo para calcular a grade, quantidade de células e
+    tamanho do HTML do mapa de densidade x mapa no modo de alto volume (utils.maps.fast_marker_map), com 7 mil, 70 mil e 500 mil
+    restaurantes.
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_density.py
+"""
+#==============================================
+# Libraries
+#==============================================
+import os
+import sys
+import timeit
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from bench_map import measure, scale_points
+from utils.density import density_grid
+from utils.loader import load_dataset
+from utils.maps import MAP_COLUMNS, density_map, fast_marker_map
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    df = load_dataset().loc[:, MAP_COLUMNS + ['aggregate_rating']]
+
+    print(f"{'pontos':>8} {'grade (ms)':>11} {'células':>8} {'densidade (KB)':>15} {'alto volume (KB)':>17}")
+
+    for rows in (len(df), 70_000, 500_000):
+
+        df_aux = df if rows == len(df) else scale_points(df, rows)
+        positions = np.arange(rows)
+
+        grid = density_grid(df_aux, positions)
+
+        # Conferência: cada restaurante está em exatamente uma célula.
+        assert grid['restaurants'].sum() == rows
+
+        seconds = min(timeit.repeat(lambda: density_grid(df_aux, positions), number=5, repeat=3)) / 5 * 1000
+
+        density_size = measure(lambda df_aux: density_map(grid, 'restaurants'), df_aux)[1] * 1024
+        markers_size = measure(fast_marker_map, df_aux)[1] * 1024
+
+        print(f'{rows:>8} {seconds:>11.2f} {len(grid):>8} {density_size:>15.1f} {markers_size:>17.1f}')
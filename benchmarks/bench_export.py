@@ -0,0 +1,75 @@
+""" Benchmark do download dos dados tratados (utils.exports): leitura de dataset/dados_tratados.csv e nova serialização com to_csv a
+    cada execução da Visão Geral (como a barra lateral fazia, mesmo sem nenhum download) x arquivo gerado somente quando o download é
+    pedido e guardado em cache por versão dos dados.
+
+    Mede, com 7 mil e 100 mil restaurantes, para cada formato (CSV com gzip, Parquet e Arrow), o tempo do primeiro pedido (arquivo
+    gerado), o tempo dos pedidos seguintes (cache) e o tamanho do arquivo, com todos os países e somente com a Índia. Uma execução da
+    página sem pedido de download não gera nenhum arquivo.
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_export.py
+"""
+#==============================================
+# Libraries
+#==============================================
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from bench_map import scale_points
+from utils.bitmaps import build_bitmap_index
+from utils.exports import EXPORT_FORMATS, clear_export_cache, export_data
+from utils.loader import load_dataset
+from utils.tables import build_arrow_table
+
+#==============================================
+# Funções
+#==============================================
+# Versão anterior: leitura e serialização do CSV a cada execução da página:
+def csv_download():
+    """ Lê o CSV dos dados tratados e o serializa de novo, como a barra lateral fazia para o st.download_button. """
+    dados_tratados = pd.read_csv(os.path.join(ROOT, 'dataset', 'dados_tratados.csv'), sep=';')
+
+    return dados_tratados.to_csv(index=False, sep=';')
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    df = load_dataset()
+
+    old = min(timeit.repeat(csv_download, number=1, repeat=5)) * 1000
+
+    print(f'Versão anterior (toda execução da página): {old:.1f} ms, {len(csv_download().encode()) / 1024:.0f} KB')
+    print('Versão nova (execução sem pedido de download): 0 ms\n')
+
+    print(f"{'restaurantes':>12} {'formato':>11} {'países':>7} {'1º pedido (ms)':>15} {'cache (ms)':>11} {'tamanho (KB)':>13}")
+
+    for rows in (len(df), 100_000):
+
+        df_aux = df if rows == len(df) else scale_points(df, rows).assign(restaurant_id=np.arange(rows, dtype=np.int32))
+
+        table = build_arrow_table(df_aux)
+        bitmaps = build_bitmap_index(df_aux)
+
+        for fmt in EXPORT_FORMATS:
+
+            for name, countries in (('todos', None), ('Índia', ['India'])):
+
+                export = lambda: export_data(df_aux, table, bitmaps, ('bench', rows), fmt, countries=countries)
+
+                # Primeiro pedido: o cache é esvaziado antes de cada medida.
+                cold = min(timeit.repeat(export, setup=clear_export_cache, number=1, repeat=3)) * 1000
+
+                warm = min(timeit.repeat(export, number=20, repeat=5)) / 20 * 1000
+
+                print(f'{rows:>12} {fmt:>11} {name:>7} {cold:>15.1f} {warm:>11.3f} {len(export()) / 1024:>13.0f}')
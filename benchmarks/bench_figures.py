@@ -0,0 +1,76 @@
+""" Benchmark do cache de gráficos serializados (utils.figures): tempo de rerun das páginas com gráficos do Plotly quando todos os
+    gráficos são montados de novo (cache esvaziado antes de cada execução, como antes do cache) x quando os gráficos vêm do cache.
+
+    As páginas são executadas como em benchmarks/bench_pages.py (modo "bare", sem servidor do Streamlit).
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_figures.py
+"""
+#==============================================
+# Libraries
+#==============================================
+import glob
+import os
+import runpy
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from bench_pages import RERUNS
+from utils.figures import clear_figure_cache, figure_cache_stats
+
+#==============================================
+# Funções
+#==============================================
+# Função para medir os reruns de uma página com ou sem o cache de gráficos:
+def measure(page, cached, reruns=RERUNS):
+    """ Executa a página `reruns` vezes e retorna a mediana em ms (cached=False esvazia o cache de gráficos antes de cada execução). """
+    times = []
+
+    for _ in range(reruns):
+
+        if not cached:
+            clear_figure_cache()
+
+        start = time.perf_counter()
+        runpy.run_path(page, run_name='__main__')
+        times.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(times)
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    os.chdir(ROOT)
+
+    import streamlit.logger
+
+    streamlit.logger.set_log_level('error')
+
+    pages = [page for page in sorted(glob.glob(os.path.join(ROOT, 'pages', '*.py'))) if 'Main_Page' not in page]
+
+    print(f"{'página':<40} {'gráficos':>9} {'sem cache (ms)':>15} {'com cache (ms)':>15} {'KB no cache':>12}")
+
+    for page in pages:
+
+        # Primeira execução: carrega o dataset e os demais caches do processo.
+        runpy.run_path(page, run_name='__main__')
+
+        clear_figure_cache()
+
+        rebuilt = measure(page, cached=False)
+
+        clear_figure_cache()
+        runpy.run_path(page, run_name='__main__')
+        stats = figure_cache_stats()
+
+        cached = measure(page, cached=True)
+
+        print(f"{os.path.basename(page):<40} {stats['entries']:>9} {rebuilt:>15.1f} {cached:>15.1f} {stats['bytes'] / 1024:>12.1f}")
@@ -0,0 +1,92 @@
+""" Benchmark da ingestão em chunks (utils.ingest) x construção em memória (utils.storage.build_artifact).
+
+    Gera CSVs aumentados (1x, 10x e 40x o dataset de exemplo) em um diretório temporário e constrói o artefato de cada um em um
+    processo novo, medindo o tempo e o pico de memória adicional (VmHWM, Linux). No modo streaming o pico deve ficar estável.
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_ingest.py
+"""
+#==============================================
+# Libraries
+#==============================================
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from bench_cleaning import scale_dataset
+from utils.storage import DATASET_PATH
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Código executado em cada processo filho - imprime o tempo e o pico de memória adicional em JSON:
+CHILD = """
+import json, sys, tempfile, time
+
+def peak_kb():
+    # VmHWM (pico de memória residente) é do próprio processo; o ru_maxrss herda o pico do processo pai no fork.
+    with open('/proc/self/status') as status:
+        return next(int(line.split()[1]) for line in status if line.startswith('VmHWM'))
+
+sys.path.insert(0, {root!r})
+from utils.ingest import stream_build_artifact
+from utils.storage import build_artifact
+
+before = peak_kb()
+start = time.perf_counter()
+if {mode!r} == 'memoria':
+    build_artifact({source!r}, {artifact!r}, cache_dir=tempfile.mkdtemp(dir={tmp!r}))
+else:
+    stream_build_artifact({source!r}, {artifact!r}, chunksize={chunksize})
+elapsed = time.perf_counter() - start
+after = peak_kb()
+print(json.dumps({{'seconds': elapsed, 'peak_mb': (after - before) / 1024}}))
+"""
+
+#==============================================
+# Funções
+#==============================================
+# Função para medir a construção do artefato em um processo novo:
+def measure(mode, source, artifact, chunksize=50_000):
+    """ Constrói o artefato em um processo novo e retorna {'seconds', 'peak_mb'}. """
+    code = CHILD.format(root=ROOT, mode=mode, source=source, artifact=artifact, chunksize=chunksize,
+                        tmp=os.path.dirname(artifact))
+
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=ROOT).stdout
+
+    return json.loads(output)
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    df_original = pd.read_csv(os.path.join(ROOT, DATASET_PATH))
+
+    print(f"{'fator':>6} {'CSV (MB)':>9} {'modo':>9} {'tempo (s)':>10} {'pico (MB)':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+
+        for factor in (1, 10, 40):
+
+            source = os.path.join(tmp, f'zomato_{factor}x.csv')
+            artifact = os.path.join(tmp, f'zomato_{factor}x.parquet')
+
+            scale_dataset(df_original, factor).to_csv(source, index=False)
+
+            size_mb = os.path.getsize(source) / 2 ** 20
+
+            for mode in ('memoria', 'streaming'):
+
+                result = measure(mode, source, artifact)
+
+                print(f"{factor:>6} {size_mb:>9.0f} {mode:>9} {result['seconds']:>10.2f} {result['peak_mb']:>10.1f}")
@@ -0,0 +1,67 @@
+""" Benchmark do mapa da Visão Geral: um folium.Marker por restaurante (utils.maps.marker_map) x modo de alto volume
+    (utils.maps.fast_marker_map), medindo o tempo para montar e renderizar o HTML e o tamanho do HTML enviado ao navegador.
+
+    O modo com um marcador por restaurante só é medido no dataset original (com 10x já leva minutos).
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_map.py
+"""
+#==============================================
+# Libraries
+#==============================================
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from utils.loader import load_dataset
+from utils.maps import MAP_COLUMNS, fast_marker_map, marker_map
+
+#==============================================
+# Funções
+#==============================================
+# Função para aumentar o dataset espalhando as cópias pelo mapa:
+def scale_points(df, rows):
+    """ Retorna `rows` linhas do dataset com pequenos deslocamentos aleatórios nas coordenadas, para simular restaurantes diferentes. """
+    rng = np.random.default_rng(0)
+
+    sample = df.iloc[rng.integers(0, len(df), rows)].reset_index(drop=True)
+
+    return sample.assign(latitude=sample['latitude'] + rng.normal(0, 0.01, rows),
+                         longitude=sample['longitude'] + rng.normal(0, 0.01, rows))
+
+
+# Função para medir a montagem do mapa:
+def measure(build, df_aux):
+    """ Retorna (segundos, MB do HTML) para montar o mapa com `build` e renderizar o HTML, como faz o folium_static. """
+    start = time.perf_counter()
+    html = build(df_aux).get_root().render()
+
+    return time.perf_counter() - start, len(html.encode()) / 2 ** 20
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    df = load_dataset().loc[:, MAP_COLUMNS]
+
+    print(f"{'pontos':>8} {'modo':>12} {'tempo (s)':>10} {'HTML (MB)':>10}")
+
+    for rows in (len(df), 70_000, 500_000):
+
+        df_aux = df if rows == len(df) else scale_points(df, rows)
+
+        modes = [('marcadores', marker_map), ('alto volume', fast_marker_map)] if rows == len(df) else [('alto volume', fast_marker_map)]
+
+        for name, build in modes:
+
+            seconds, size = measure(build, df_aux)
+
+            print(f'{rows:>8} {name:>12} {seconds:>10.2f} {size:>10.1f}')
@@ -0,0 +1,91 @@
+""" Benchmark do cache de mapas renderizados (utils.map_cache): tempo para montar e renderizar o mapa de todos os restaurantes na
+    primeira visita a uma seleção de países x visitas seguintes (servidas pelo cache), com 7 mil, 70 mil e 500 mil restaurantes.
+
+    Mede também utils.map_cache.map_component, chamado a cada execução da página (fora do `streamlit run` o componente retorna o valor
+    padrão): chave do componente já calculada por render_map x hash do JavaScript inteiro a cada execução (versão anterior).
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_map_cache.py
+"""
+#==============================================
+# Libraries
+#==============================================
+import os
+import sys
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from bench_map import scale_points
+from utils.bitmaps import build_bitmap_index, select_rows
+from utils.loader import load_dataset
+from streamlit_folium import _component_func, generate_js_hash
+
+from utils.map_cache import cached_map, clear_map_cache, map_cache_stats, map_component
+from utils.maps import restaurant_map_figure
+
+#==============================================
+# Funções
+#==============================================
+# Versão anterior: hash do JavaScript do mapa a cada chamada do componente:
+def rehash_component(rendered, key, returned_objects):
+    """ Insere o mapa renderizado no componente calculando a chave com generate_js_hash, como map_component fazia. """
+    return _component_func(script=rendered['script'],
+                           html=rendered['html'],
+                           id=rendered['id'],
+                           key=generate_js_hash(rendered['script'], key),
+                           height=600,
+                           width=1024,
+                           returned_objects=returned_objects,
+                           default={name: rendered.get(name) for name in returned_objects},
+                           zoom=None,
+                           center=None,
+                           feature_group=rendered.get('feature_group'))
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    df = load_dataset()
+
+    print(f"{'pontos':>8} {'seleção':>8} {'primeira (ms)':>14} {'cache (ms)':>11} {'MB no cache':>12} {'componente: anterior (ms)':>26}"
+          f" {'nova (ms)':>10}")
+
+    for rows in (len(df), 70_000, 500_000):
+
+        df_aux = df if rows == len(df) else scale_points(df, rows)
+        bitmaps = build_bitmap_index(df_aux)
+
+        clear_map_cache()
+
+        for name, countries in (('todos', list(df_aux['country'].cat.categories)), ('India', ['India'])):
+
+            positions = select_rows(bitmaps, country=countries)
+            build = lambda: restaurant_map_figure(df_aux, positions)
+
+            start = time.perf_counter()
+            first = cached_map(build, countries, version=rows, key='mapa_todos_restaurantes')
+            cold = (time.perf_counter() - start) * 1000
+
+            # A mesma seleção em outra ordem é servida pelo cache:
+            start = time.perf_counter()
+            again = cached_map(build, list(reversed(countries)), version=rows, key='mapa_todos_restaurantes')
+            warm = (time.perf_counter() - start) * 1000
+
+            assert again is first
+
+            # Conferência: a chave guardada é a mesma que a versão anterior calculava a cada execução.
+            assert generate_js_hash(first['script'], 'mapa_todos_restaurantes') == first['key']
+
+            returned = ['last_object_clicked_tooltip']
+
+            old = min(timeit.repeat(lambda: rehash_component(first, 'mapa_todos_restaurantes', returned), number=5, repeat=3)) / 5 * 1000
+            new = min(timeit.repeat(lambda: map_component(first, returned), number=5, repeat=3)) / 5 * 1000
+
+            print(f'{rows:>8} {name:>8} {cold:>14.1f} {warm:>11.3f} {map_cache_stats()["bytes"] / 2 ** 20:>12.1f} {old:>26.1f}'
+                  f' {new:>10.1f}')
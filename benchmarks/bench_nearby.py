@@ -0,0 +1,98 @@
+""" Benchmark da busca de restaurantes próximos (utils.nearby.restaurants_near): haversine calculada par a par em Python (como a
+    biblioteca haversine, antes importada pelas páginas) x haversine vetorizada sobre todas as linhas x busca com o índice espacial,
+    com 7 mil, 100 mil e 1 milhão de restaurantes e raios de 1, 5 e 20 km em volta de Nova Délhi.
+
+    A versão por par só é medida no dataset original.
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_nearby.py
+"""
+#==============================================
+# Libraries
+#==============================================
+import math
+import os
+import sys
+import time
+import timeit
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from bench_map import scale_points
+from utils.clusters import build_spatial_index
+from utils.loader import load_dataset
+from utils.nearby import EARTH_RADIUS_KM, haversine_km, restaurants_near
+
+#==============================================
+# Funções
+#==============================================
+# Haversine de um par de coordenadas, como na biblioteca haversine:
+def haversine_pair(point1, point2):
+    """ Retorna a distância (km) entre dois pontos (latitude, longitude). """
+    lat1, lon1, lat2, lon2 = map(math.radians, (*point1, *point2))
+
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+# Versão com uma chamada de haversine por restaurante:
+def pairwise_near(df, latitude, longitude, radius_km):
+    """ Retorna as posições das linhas dentro do raio, do mais próximo para o mais distante, com uma chamada de haversine por linha. """
+    distances = [haversine_pair((lat, lon), (latitude, longitude)) for lat, lon in zip(df['latitude'], df['longitude'])]
+
+    return sorted((distance, row) for row, distance in enumerate(distances) if distance <= radius_km)
+
+
+# Versão vetorizada sem índice - distância de todas as linhas:
+def scan_near(df, latitude, longitude, radius_km):
+    """ Retorna (posições, distâncias) das linhas dentro do raio, calculando a distância de todas as linhas. """
+    distances = haversine_km(df['latitude'].to_numpy(), df['longitude'].to_numpy(), latitude, longitude)
+
+    rows = np.flatnonzero(distances <= radius_km)
+    order = np.lexsort((rows, distances[rows]))
+
+    return rows[order], distances[rows[order]]
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    df = load_dataset()
+
+    center = (28.6139, 77.2090)
+
+    print(f"{'pontos':>8} {'raio (km)':>10} {'achados':>8} {'por par (ms)':>13} {'vetorizada (ms)':>16} {'índice (ms)':>12}")
+
+    for rows in (len(df), 100_000, 1_000_000):
+
+        df_aux = df if rows == len(df) else scale_points(df, rows)
+
+        start = time.perf_counter()
+        index = build_spatial_index(df_aux)
+        build = time.perf_counter() - start
+
+        for radius in (1, 5, 20):
+
+            found, distances = restaurants_near(df_aux, index, *center, radius)
+
+            # Conferência: o índice devolve as mesmas linhas, na mesma ordem, que a distância de todas as linhas.
+            assert np.array_equal(found, scan_near(df_aux, *center, radius)[0])
+
+            pairwise = '-'
+
+            if rows == len(df):
+                pairwise = f'{min(timeit.repeat(lambda: pairwise_near(df_aux, *center, radius), number=1, repeat=3)) * 1000:.2f}'
+
+            scan = min(timeit.repeat(lambda: scan_near(df_aux, *center, radius), number=5, repeat=3)) / 5 * 1000
+            query = min(timeit.repeat(lambda: restaurants_near(df_aux, index, *center, radius), number=5, repeat=3)) / 5 * 1000
+
+            print(f'{rows:>8} {radius:>10} {len(found):>8} {pairwise:>13} {scan:>16.2f} {query:>12.2f}')
+
+        print(f'{"":>8} índice construído em {build:.2f} s')
@@ -0,0 +1,66 @@
+""" Benchmark do tempo de execução (rerun) das páginas do dashboard.
+
+    Executa cada página várias vezes no mesmo processo, fora do servidor do Streamlit (modo "bare": os comandos st.* não enviam nada ao
+    navegador), e mede o tempo de cada execução. A primeira execução carrega o dataset e preenche os caches; as seguintes correspondem
+    ao rerun que acontece a cada interação do usuário.
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_pages.py                      # todas as páginas
+        python benchmarks/bench_pages.py pages/02_*.py        # páginas escolhidas (aceita arquivos fora de pages/, ex. versões antigas)
+"""
+#==============================================
+# Libraries
+#==============================================
+import glob
+import os
+import runpy
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Quantidade de reruns medidos por página (depois da primeira execução):
+RERUNS = 20
+
+#==============================================
+# Funções
+#==============================================
+# Função para medir os reruns de uma página:
+def measure(page, reruns=RERUNS):
+    """ Executa a página 1 + `reruns` vezes e retorna (primeira execução, mediana dos reruns, mínimo dos reruns) em ms. """
+    times = []
+
+    for _ in range(reruns + 1):
+        start = time.perf_counter()
+        runpy.run_path(page, run_name='__main__')
+        times.append((time.perf_counter() - start) * 1000)
+
+    return times[0], statistics.median(times[1:]), min(times[1:])
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    os.chdir(ROOT)
+
+    import streamlit.logger
+
+    streamlit.logger.set_log_level('error')
+
+    pages = [os.path.abspath(page) for page in sys.argv[1:]] or sorted(glob.glob(os.path.join(ROOT, 'pages', '*.py')))
+
+    print(f"{'página':<40} {'1ª execução (ms)':>17} {'rerun mediana (ms)':>19} {'rerun mínimo (ms)':>18}")
+
+    for page in pages:
+
+        first, median, best = measure(page)
+
+        print(f'{os.path.basename(page):<40} {first:>17.1f} {median:>19.1f} {best:>18.1f}')
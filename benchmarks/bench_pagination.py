@@ -0,0 +1,92 @@
+""" Benchmark do ranking paginado da Visão Tipos de Culinária (utils.ranking.ranked_rows): ordenação das linhas filtradas a cada rerun
+    (como a tabela "Top N restaurantes" fazia) x ranking em cache por estado dos filtros, do qual cada página é uma fatia.
+
+    Mede, com 7 mil, 100 mil e 1 milhão de restaurantes e páginas de 20 restaurantes, o tempo para montar as páginas 1, 50 e 250
+    (restaurantes 1 a 20, 981 a 1000 e 4981 a 5000): na primeira visita ao estado dos filtros (ranking calculado) e nas seguintes (cache).
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_pagination.py
+"""
+#==============================================
+# Libraries
+#==============================================
+import os
+import sys
+import timeit
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from bench_map import scale_points
+from utils.bitmaps import build_bitmap_index, select_rows
+from utils.loader import load_dataset
+from utils.ranking import _ranked_cache, build_ranking_index, ranked_rows
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Colunas da tabela:
+COLUMNS = ['restaurant_id', 'restaurant_name', 'city', 'country', 'cuisines', 'average_cost_for_two', 'aggregate_rating', 'votes',
+           'nearest_competitor_km', 'competitors_1km']
+
+# Restaurantes por página:
+PAGE_SIZE = 20
+
+#==============================================
+# Funções
+#==============================================
+# Versão anterior: ordenação das linhas filtradas a cada rerun:
+def sorted_page(df, bitmaps, countries, page):
+    """ Ordena as linhas filtradas por (aggregate_rating, restaurant_id) e copia as linhas da página. """
+    rows = select_rows(bitmaps, country=countries)
+
+    order = np.lexsort((df['restaurant_id'].to_numpy()[rows], -df['aggregate_rating'].to_numpy()[rows]))
+
+    start = (page - 1) * PAGE_SIZE
+
+    return df.iloc[rows[order[start:start + PAGE_SIZE]], df.columns.get_indexer(COLUMNS)]
+
+
+# Versão nova: página como fatia do ranking em cache:
+def ranked_page(df, ranking, bitmaps, countries, page):
+    """ Copia as linhas da página a partir do ranking das linhas filtradas (ranked_rows). """
+    ranked = ranked_rows(ranking, bitmaps, ('bench', len(df)), country=countries)
+
+    start = (page - 1) * PAGE_SIZE
+
+    return df.iloc[ranked[start:start + PAGE_SIZE], df.columns.get_indexer(COLUMNS)]
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    df = load_dataset()
+
+    print(f"{'restaurantes':>12} {'página':>7} {'ordenação (ms)':>15} {'1ª visita (ms)':>15} {'cache (ms)':>11}")
+
+    for rows in (len(df), 100_000, 1_000_000):
+
+        df_aux = df if rows == len(df) else scale_points(df, rows).assign(restaurant_id=np.arange(rows, dtype=np.int32))
+
+        bitmaps = build_bitmap_index(df_aux)
+        ranking = build_ranking_index(df_aux)
+        countries = list(df_aux['country'].cat.categories)
+
+        for page in (1, 50, 250):
+
+            assert sorted_page(df_aux, bitmaps, countries, page).equals(ranked_page(df_aux, ranking, bitmaps, countries, page))
+
+            sort = min(timeit.repeat(lambda: sorted_page(df_aux, bitmaps, countries, page), number=1, repeat=5)) * 1000
+
+            # Primeira visita: o cache é esvaziado antes de cada medida.
+            cold = min(timeit.repeat(lambda: ranked_page(df_aux, ranking, bitmaps, countries, page),
+                                     setup=_ranked_cache.clear, number=1, repeat=5)) * 1000
+
+            warm = min(timeit.repeat(lambda: ranked_page(df_aux, ranking, bitmaps, countries, page), number=20, repeat=5)) / 20 * 1000
+
+            print(f'{rows:>12} {page:>7} {sort:>15.2f} {cold:>15.2f} {warm:>11.2f}')
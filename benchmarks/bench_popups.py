@@ -0,0 +1,99 @@
+""" Benchmark do tamanho do mapa enviado ao navegador: marcadores com o popup completo (nome, preço, moeda, tipo de culinária e nota) x
+    marcadores só com o restaurant_id e as coordenadas, com os detalhes consultados no servidor no clique (utils.maps.popup_store).
+
+    Mede o mapa com um folium.Marker por restaurante (até MARKER_LIMIT restaurantes) e os arrays do modo de alto volume
+    (utils.maps.compact_points) com 7 mil, 70 mil e 500 mil restaurantes.
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_popups.py
+"""
+#==============================================
+# Libraries
+#==============================================
+import json
+import os
+import sys
+
+import folium
+from folium.plugins import MarkerCluster
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from bench_map import scale_points
+from utils.loader import load_dataset
+from utils.maps import MAP_COLUMNS, POPUP_COLUMNS, compact_points, encode_array, encode_categories, marker_map
+
+#==============================================
+# Funções
+#==============================================
+# Versão anterior: um folium.Popup com os detalhes em cada marcador:
+def popup_marker_map(df_aux):
+    """ Reproduz o mapa com um marcador e um popup HTML por restaurante. """
+    map = folium.Map()
+
+    marker_cluster = MarkerCluster().add_to(map)
+
+    for index, info in df_aux.iterrows():
+
+        popup = folium.Popup(f""" <p><strong>{info['restaurant_name']}</strong></p>
+        Preço: {info['average_cost_for_two']},00 {info['currency']} para dois<br>
+        Cuisine: {info['cuisines']}<br>
+        Aggregate rating: {info['aggregate_rating']}/5.0
+               """,
+        max_width=500,
+        )
+
+        folium.Marker(location=[info['latitude'], info['longitude']],
+                      icon=folium.Icon(icon='glyphicon glyphicon-cutlery', color=info['color_name']),
+                      popup=popup).add_to(marker_cluster)
+
+    return map
+
+
+# Versão anterior: arrays do modo de alto volume com os detalhes do popup:
+def popup_compact_points(df_aux):
+    """ Reproduz os arrays do modo de alto volume com custo, nota, tipo de culinária, moeda e nome de cada restaurante. """
+    return {'latitude': encode_array(df_aux['latitude'], '<f4'),
+            'longitude': encode_array(df_aux['longitude'], '<f4'),
+            'cost': encode_array(df_aux['average_cost_for_two'], '<i4'),
+            'rating': encode_array(df_aux['aggregate_rating'], '<f4'),
+            'color': encode_categories(df_aux['color_name']),
+            'cuisine': encode_categories(df_aux['cuisines']),
+            'currency': encode_categories(df_aux['currency']),
+            'name': df_aux['restaurant_name'].astype(str).tolist()}
+
+
+# Função para medir o tamanho de um texto:
+def size_kb(text):
+    """ Retorna o tamanho do texto em KB (UTF-8). """
+    return len(text.encode()) / 2 ** 10
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    df = load_dataset().loc[:, list(dict.fromkeys(MAP_COLUMNS + POPUP_COLUMNS))]
+
+    print(f"{'modo':>12} {'pontos':>8} {'com popup (KB)':>15} {'só id (KB)':>11} {'redução':>8}")
+
+    for rows in (500, 1_000):
+
+        df_aux = df.iloc[:rows]
+
+        before = size_kb(popup_marker_map(df_aux).get_root().render())
+        after = size_kb(marker_map(df_aux).get_root().render())
+
+        print(f"{'marcadores':>12} {rows:>8} {before:>15.1f} {after:>11.1f} {1 - after / before:>7.0%}")
+
+    for rows in (len(df), 70_000, 500_000):
+
+        df_aux = df if rows == len(df) else scale_points(df, rows)
+
+        before = size_kb(json.dumps(popup_compact_points(df_aux)))
+        after = size_kb(json.dumps(compact_points(df_aux)))
+
+        print(f"{'alto volume':>12} {rows:>8} {before:>15.1f} {after:>11.1f} {1 - after / before:>7.0%}")
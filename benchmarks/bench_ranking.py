@@ -0,0 +1,90 @@
+""" Benchmark do índice de ranking (utils.ranking): melhor restaurante de cada tipo de culinária com filtro e ordenação a cada consulta
+    (como best_per_cuisine fazia) x consulta ao índice, com 7 mil, 100 mil e 1 milhão de restaurantes.
+
+    Mede o tempo para responder todos os tipos de culinária (o que a página faz quando todos são escolhidos) e o tempo de construção
+    do índice, feita uma vez por versão dos dados. No dataset original, confere que os 10 melhores de cada tipo de culinária, cidade e
+    país são os mesmos nas duas versões.
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_ranking.py
+"""
+#==============================================
+# Libraries
+#==============================================
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from bench_map import scale_points
+from utils.bitmaps import build_bitmap_index, select_rows
+from utils.loader import load_dataset
+from utils.ranking import RANKING_COLUMNS, best_in_group, build_ranking_index
+
+#==============================================
+# Funções
+#==============================================
+# Versão anterior: filtro pelo índice de bitmaps e ordenação das linhas do grupo a cada consulta:
+def sorted_best(df, bitmaps, column, value, n=1):
+    """ Retorna as posições dos n melhores restaurantes do grupo, ordenando as linhas do grupo por (aggregate_rating, restaurant_id). """
+    rows = select_rows(bitmaps, **{column: [value]})
+
+    ordered = (df.iloc[rows, df.columns.get_indexer(['aggregate_rating', 'restaurant_id'])]
+                 .assign(position=rows)
+                 .sort_values(['aggregate_rating', 'restaurant_id'], ascending=[False, True]))
+
+    return ordered['position'].to_numpy()[:n]
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    df = load_dataset()
+
+    # Conferência no dataset original (a versão anterior só indexa as colunas de utils.bitmaps, então cidade usa groupby):
+    bitmaps = build_bitmap_index(df)
+    ranking = build_ranking_index(df)
+
+    for column in RANKING_COLUMNS:
+
+        for value, rows in df.groupby(column, observed=True).indices.items():
+
+            expected = rows[np.lexsort((df['restaurant_id'].to_numpy()[rows], -df['aggregate_rating'].to_numpy()[rows]))][:10]
+
+            assert np.array_equal(best_in_group(ranking, column, value, n=10), expected)
+
+            if column in bitmaps:
+                assert np.array_equal(sorted_best(df, bitmaps, column, value, n=10), expected)
+
+    print(f"{'restaurantes':>12} {'culinárias':>11} {'ordenação (ms)':>15} {'índice (ms)':>12} {'construção (ms)':>16}")
+
+    for rows in (len(df), 100_000, 1_000_000):
+
+        df_aux = df if rows == len(df) else scale_points(df, rows).assign(restaurant_id=np.arange(rows, dtype=np.int32))
+
+        bitmaps = build_bitmap_index(df_aux)
+
+        start = time.perf_counter()
+        ranking = build_ranking_index(df_aux)
+        build = (time.perf_counter() - start) * 1000
+
+        cuisines = list(ranking['cuisines']['values'])
+
+        start = time.perf_counter()
+        old = [sorted_best(df_aux, bitmaps, 'cuisines', cuisine) for cuisine in cuisines]
+        sort = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        new = [best_in_group(ranking, 'cuisines', cuisine) for cuisine in cuisines]
+        index = (time.perf_counter() - start) * 1000
+
+        assert all(np.array_equal(a, b) for a, b in zip(old, new))
+
+        print(f'{rows:>12} {len(cuisines):>11} {sort:>15.1f} {index:>12.2f} {build:>16.1f}')
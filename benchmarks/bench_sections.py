@@ -0,0 +1,88 @@
+""" Benchmark das seções das páginas (utils.sections): executa a página, muda um widget e executa de novo, mostrando o tempo de cada
+    seção e se o seu cálculo foi refeito ('recalculada'), veio do cache ('reaproveitada') ou não passa por cache ('sem cache') - somente
+    os cálculos que dependem do widget alterado devem ser refeitos. Todas as seções executam em todas as execuções (são memoizadas, e não
+    puladas).
+
+    Cenários:
+        1. Visão Tipos de Culinária: quantidade de informações (slider) de 20 para 10;
+        2. Visão Geral: raio da busca de restaurantes próximos de 5 para 10 km.
+
+    As páginas são executadas como em benchmarks/bench_pages.py (modo "bare", sem servidor do Streamlit); os widgets alterados são
+    substituídos por funções que retornam o novo valor.
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_sections.py
+"""
+#==============================================
+# Libraries
+#==============================================
+import glob
+import os
+import runpy
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+import streamlit as st
+import streamlit.logger
+
+from utils.sections import section_timings
+
+#==============================================
+# Funções
+#==============================================
+# Função para executar uma página e retornar os tempos das seções:
+def run_page(page):
+    """ Executa a página uma vez e retorna a tabela de section_timings da execução. """
+    runpy.run_path(page, run_name='__main__')
+
+    return section_timings()
+
+
+# Função para executar um cenário:
+def scenario(title, page, widget, value, call=1):
+    """ Executa a página duas vezes (a segunda já com os caches preenchidos) e uma terceira com o widget `widget` (st.sidebar.slider,
+        st.number_input...) retornando `value` na chamada de número `call`, e imprime os tempos das duas últimas execuções.
+    """
+    run_page(page)
+    before = run_page(page)
+
+    module, name = widget
+    original = getattr(module, name)
+    calls = []
+
+    def changed(*args, **kwargs):
+        calls.append(name)
+        return value if len(calls) == call else original(*args, **kwargs)
+
+    setattr(module, name, changed)
+
+    try:
+        after = run_page(page)
+    finally:
+        setattr(module, name, original)
+
+    table = before.rename(columns={'Estado': 'sem mudança', 'Tempo (ms)': 'ms sem mudança'}).merge(
+            after.rename(columns={'Estado': 'widget alterado', 'Tempo (ms)': 'ms widget alterado'}), on='Seção')
+
+    print(f'\n{title}')
+    print(table.to_string(index=False))
+    print(f"{'total':>12} {before['Tempo (ms)'].sum():.1f} ms -> {after['Tempo (ms)'].sum():.1f} ms")
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    os.chdir(ROOT)
+
+    streamlit.logger.set_log_level('error')
+
+    scenario('Visão Tipos de Culinária - slider de quantidade de informações: 20 -> 10',
+             glob.glob(os.path.join(ROOT, 'pages', '04_*.py'))[0], (st.sidebar, 'slider'), 10)
+
+    scenario('Visão Geral - raio da busca de restaurantes próximos: 5 -> 10 km',
+             glob.glob(os.path.join(ROOT, 'pages', '01_*.py'))[0], (st, 'number_input'), 10.0, call=3)
@@ -0,0 +1,81 @@
+""" Benchmark da carga a frio: CSV bruto + clean_dataframe x artefato Parquet já limpo (utils.storage).
+
+    O caminho Parquet usa load_clean, ou seja, inclui o hash do CSV para a verificação de artefato desatualizado.
+    Cada caminho roda em um processo novo, para medir a carga a frio e o pico de memória (VmHWM, Linux) sem interferência do outro.
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_storage.py
+"""
+#==============================================
+# Libraries
+#==============================================
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from utils.storage import ARTIFACT_PATH, DATASET_PATH, build_artifact
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Código executado em cada processo filho - imprime o tempo de carga e o pico de memória adicional em JSON:
+CHILD = """
+import json, sys, time
+
+def peak_kb():
+    # VmHWM (pico de memória residente) é do próprio processo; o ru_maxrss herda o pico do processo pai no fork.
+    with open('/proc/self/status') as status:
+        return next(int(line.split()[1]) for line in status if line.startswith('VmHWM'))
+
+sys.path.insert(0, {root!r})
+import pandas as pd
+from utils.cleaning import clean_dataframe
+from utils.storage import load_clean
+
+before = peak_kb()
+start = time.perf_counter()
+if {mode!r} == 'csv':
+    df = clean_dataframe(pd.read_csv({source!r}))
+else:
+    df = load_clean({source!r}, artifact={artifact!r})
+elapsed = time.perf_counter() - start
+after = peak_kb()
+print(json.dumps({{'seconds': elapsed, 'peak_mb': (after - before) / 1024, 'rows': len(df)}}))
+"""
+
+#==============================================
+# Funções
+#==============================================
+# Função para medir a carga a frio de um dos caminhos:
+def cold_load(mode, source=DATASET_PATH, artifact=ARTIFACT_PATH):
+    """ Executa a carga em um processo novo e retorna {'seconds', 'peak_mb', 'rows'}. """
+    code = CHILD.format(root=ROOT, mode=mode, source=source, artifact=artifact)
+
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=ROOT).stdout
+
+    return json.loads(output)
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    os.chdir(ROOT)
+
+    if not os.path.exists(ARTIFACT_PATH):
+        build_artifact(cache_dir=tempfile.mkdtemp())
+
+    print(f"{'caminho':>8} {'linhas':>8} {'tempo (s)':>10} {'pico (MB)':>10}")
+
+    for mode in ('csv', 'parquet'):
+
+        result = cold_load(mode)
+
+        print(f"{mode:>8} {result['rows']:>8} {result['seconds']:>10.3f} {result['peak_mb']:>10.1f}")
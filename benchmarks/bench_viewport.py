@@ -0,0 +1,102 @@
+""" Benchmark da busca dos restaurantes da região visível do mapa interativo (utils.clusters.points_in_view) x máscara booleana
+    sobre todas as linhas, com uma região de 1024x600 pixels em vários níveis de zoom e 7 mil, 70 mil e 500 mil restaurantes.
+
+    A busca é medida sem seleção (selected=None), com a seleção de todas as linhas (np.arange, como select_rows retorna quando os
+    filtros não restringem nada, o caso padrão da Visão Geral) e com um filtro de tipo de preço, e comparada à versão anterior do
+    filtro da seleção (np.isin a cada movimento do mapa).
+
+    Uso (a partir da raiz do projeto):
+        python benchmarks/bench_viewport.py
+"""
+#==============================================
+# Libraries
+#==============================================
+import os
+import sys
+import timeit
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT)
+
+from bench_clusters import view_bounds
+from bench_map import scale_points
+from utils.bitmaps import build_bitmap_index, select_rows
+from utils.clusters import POINT_CAP, build_spatial_index, points_in_view
+from utils.loader import load_dataset
+
+#==============================================
+# Funções
+#==============================================
+# Versão de referência: comparação de todas as linhas:
+def mask_in_view(df, bounds):
+    """ Retorna as posições das linhas dentro da região visível comparando a latitude e a longitude de todas as linhas. """
+    (south, west), (north, east) = bounds
+
+    latitude, longitude = df['latitude'].to_numpy(), df['longitude'].to_numpy()
+
+    return np.flatnonzero((latitude >= south) & (latitude <= north) & (longitude >= west) & (longitude <= east))
+
+
+# Versão anterior: filtro da seleção com np.isin:
+def isin_in_view(index, bounds, selected, cap=POINT_CAP):
+    """ Retorna as posições das linhas da região visível selecionadas pelos filtros, com np.isin sobre as linhas da região. """
+    (south, west), (north, east) = bounds
+
+    start = np.searchsorted(index['longitude'], west, side='left')
+    end = np.searchsorted(index['longitude'], east, side='right')
+
+    latitude = index['latitude'][start:end]
+    rows = index['rows'][start:end][(latitude >= south) & (latitude <= north)]
+
+    return rows[np.isin(rows, selected, assume_unique=True)][:cap + 1]
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    df = load_dataset()
+
+    # Centro do mapa: Nova Délhi, a região com mais restaurantes do dataset.
+    center = (28.6, 77.2)
+
+    zooms = (4, 8, 12, 16)
+
+    print(f"{'pontos':>8} {'zoom':>5} {'na região':>10} {'máscara (ms)':>13} {'índice (ms)':>12} {'speedup':>8} {'seleção':>8}"
+          f" {'isin (ms)':>10} {'índice (ms)':>12}")
+
+    for rows in (len(df), 70_000, 500_000):
+
+        df_aux = df if rows == len(df) else scale_points(df, rows)
+        index = build_spatial_index(df_aux)
+        bitmaps = build_bitmap_index(df_aux)
+
+        selections = {'todas': np.arange(rows), 'preço': select_rows(bitmaps, price_type=['cheap', 'normal'])}
+
+        for zoom in zooms:
+
+            bounds = view_bounds(*center, zoom)
+
+            # Conferência: sem limite, o índice devolve as mesmas linhas da máscara.
+            found = points_in_view(index, bounds, cap=rows)
+            assert np.array_equal(np.sort(found), mask_in_view(df_aux, bounds))
+
+            before = min(timeit.repeat(lambda: mask_in_view(df_aux, bounds), number=10, repeat=3)) / 10 * 1000
+            after = min(timeit.repeat(lambda: points_in_view(index, bounds), number=10, repeat=3)) / 10 * 1000
+
+            line = f'{rows:>8} {zoom:>5} {len(found):>10} {before:>13.2f} {after:>12.2f} {before / after:>7.1f}x'
+
+            for name, selected in selections.items():
+
+                # Conferência: mesmas linhas da versão anterior.
+                assert np.array_equal(points_in_view(index, bounds, selected), isin_in_view(index, bounds, selected))
+
+                old = min(timeit.repeat(lambda: isin_in_view(index, bounds, selected), number=10, repeat=3)) / 10 * 1000
+                new = min(timeit.repeat(lambda: points_in_view(index, bounds, selected), number=10, repeat=3)) / 10 * 1000
+
+                print(f'{line} {name:>8} {old:>10.2f} {new:>12.2f}')
+                line = ' ' * len(line)
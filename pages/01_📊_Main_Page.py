@@ -1,204 +1,40 @@
 #==============================================
 # Libraries
 #==============================================
-import pandas as pd
-import inflection
-import plotly.express as px
 import folium
-from folium.plugins import MarkerCluster
-from haversine import haversine
 import streamlit as st
-from streamlit_folium import folium_static
 from PIL import Image
 
-#==============================================
-# Variáveis auxiliares
-#==============================================
-# Variável COUNTRIES - Contém o nome do país correspondente a cada código numérico e será usada na função que preencherá o nome dos países (country_name).
-COUNTRIES = {
-    1: "India",
-    14: "Australia",
-    30: "Brazil",
-    37: "Canada",
-    94: "Indonesia",
-    148: "New Zeland",
-    162: "Philippines",
-    166: "Qatar",
-    184: "Singapure",
-    189: "South Africa",
-    191: "Sri Lanka",
-    208: "Turkey",
-    214: "United Arab Emirates",
-    215: "United Kingdom",
-    216: "United States of America",
-}
-
-# Variável COLORS - Contém o nome correspondente a cada código de cor e será usada na função que preencherá o nome das cores (color_name).
-COLORS = {
-    "3F7E00": "darkgreen",
-    "5BA829": "green",
-    "9ACD32": "lightgreen",
-    "CDD614": "orange",
-    "FFBA00": "red",
-    "CBCBC8": "darkred",
-    "FF7800": "darkred",
-}
+from utils.bitmaps import select_rows
+from utils.clusters import POINT_CAP, clusters_in_view, points_in_view, snap_bounds
+from utils.density import density_summary
+from utils.exports import EXPORT_FORMATS, export_data, export_file_name
+from utils.loader import (dataset_version, load_dataset, load_dataset_aggregates, load_dataset_arrow, load_dataset_bitmaps,
+                          load_dataset_clusters, load_dataset_popups, load_dataset_spatial_index)
+from utils.map_cache import cached_map, map_component, render_map
+from utils.maps import cluster_layer, component_key, density_map, map_view, point_layer, restaurant_details, restaurant_map_figure
+from utils.nearby import restaurants_near
+from utils.sections import cached_section, section, show_section_timings, start_sections
+from utils.tables import append_columns, table_rows
 
 #==============================================
 # Funções
 #==============================================
-# Função para renomear as colunas do dataframe:
-def rename_columns(dataframe):
-    """ Essa função tem a responsabilidade de renomear as colunas do dataframe trocando as letras maiúsculas por minúsculas
-        e trocando espaços por underscore (_).
-        
-        Input: Dataframe
-        Output: Dataframe
-    
-    """
-    df = dataframe.copy()
-    title = lambda x: inflection.titleize(x)
-    snakecase = lambda x: inflection.underscore(x)
-    spaces = lambda x: x.replace(" ", "")
-    cols_old = list(df.columns)
-    cols_old = list(map(title, cols_old))
-    cols_old = list(map(spaces, cols_old))
-    cols_new = list(map(snakecase, cols_old))
-    df.columns = cols_new
-    
-    return df
-
+# Função para calcular os totais das métricas gerais:
+def general_totals(aggregates):
+    """ Essa função tem a responsabilidade de calcular os totais exibidos nas métricas gerais (general_metrics).
 
-# Função para preenchimento do nome dos países:
-def country_name(country_id):
-    """ Essa função tem a responsabilidade de preencher o nome dos países utilizando a variável auxiliar COUNTRIES.
-        Aplicar em cada linha da coluna de código numérico dos países por meio do comando .apply().
-    
-    """
-    return COUNTRIES[country_id]
-
-
-# Função para criação da categoria do tipo de preço:
-def create_price_type(price_range):
-    """ Essa função tem a responsabilidade de preencher a categoria do tipo de preço dos restaurantes a partir da coluna de
-        faixa de preço.
-        Aplicar em cada linha da coluna de faixa de preço por meio do comando .apply().
-    """    
-    if price_range == 1:
-        return "cheap"
-    elif price_range == 2:
-        return "normal"
-    elif price_range == 3:
-        return "expensive"
-    else:
-        return "gourmet"
-
-    
-# Função para criação do nome das cores:
-def color_name(color_code):
-    """ Essa função tem a responsabilidade de preencher o nome das cores utilizando a variável auxiliar COLORS.
-        Aplicar em cada linha da coluna de código numérico das cores por meio do comando .apply().
-    """
-    return COLORS[color_code]
-
-
-# Função para ajustar a ordem das colunas:
-def adjust_columns_order(dataframe):
-    """ Essa função tem a responsabilidade de ajustar a ordem das colunas do dataframe.
-        
-        Input: Dataframe
-        Output: Dataframe
-        
+        Input: tabela de agregados (load_dataset_aggregates)
+        Output: dict {'restaurantes', 'paises', 'cidades', 'avaliacoes', 'cuisines'}
     """
-    df = dataframe.copy()
-
-    new_cols_order = [
-        "restaurant_id",
-        "restaurant_name",
-        "country",
-        "city",
-        "address",
-        "locality",
-        "locality_verbose",
-        "longitude",
-        "latitude",
-        "cuisines",
-        "price_range",
-        "price_type",
-        "average_cost_for_two",
-        "currency",
-        "has_table_booking",
-        "has_online_delivery",
-        "is_delivering_now",
-        "aggregate_rating",
-        "rating_color",
-        "color_name",
-        "rating_text",
-        "votes",
-    ]
-
-    return df.loc[:, new_cols_order]
-
-# Função para limpar o dataframe:
-def clean_dataframe(df):
-    """ Essa função tem a responsabilidade de limpar e preprar o dataframe.
-        
-        Tipos de limpeza e preparação realizadas:
-        1. Remoção de NA;
-        2. Mudança do nome das colunas substituindo espaços por _ e letras maiúsculas por minúsculas;
-        3. Remoção da coluna "switch_to_order_menu", que possui apenas um valor em todas as linhas;
-        4. Criação de uma coluna com o nome dos países e remoção da coluna com o código dos países;
-        5. Criação de uma coluna de tipo de preço;
-        6. Criação de uma coluna com o nome das cores;
-        7. Categorização dos restaurantes por somente um tipo de culinária;
-        8. Eliminação de linhas duplicadas;
-        9. Ajuste da ordem das colunas;
-        10. Remoção de outliers;
-        11. Reset do index.
-        
-        Input: Dataframe
-        Output: Dataframe
-        
-    """
-    
-    # Eliminando NaN:
-    df = df.dropna()
-
-    # Renomear as colunas do dataframe:
-    df = rename_columns(df)
-
-    # Remoção da coluna "switch_to_order_menu" - possui apenas um valor em todas as linhas:
-    df = df.drop(columns = ['switch_to_order_menu'])
-
-    # Criação de uma coluna com o nome dos países e remoção da coluna 'country_code':
-    df['country'] = df.loc[:, 'country_code'].apply(lambda x: country_name(x))
-    df = df.drop(columns=['country_code'])
-
-    # Criação de uma coluna da categoria do tipo de preço:
-    df['price_type'] = df.loc[:, 'price_range'].apply(lambda x: create_price_type(x))
-
-    # Criação de uma coluna com o nome das cores:
-    df['color_name'] = df.loc[:, 'rating_color'].apply(lambda x: color_name(x))
-
-    # Categorização dos restaurantes por somente um tipo de culinária:
-    df['cuisines'] = df.loc[:, 'cuisines'].apply(lambda x: x.split(',')[0])
-
-    # Eliminando linhas duplicadas:
-    df = df.drop_duplicates()
-
-    # Ajustando a ordem das colunas:
-    df = adjust_columns_order(df)
-
-    # Removendo outliers:
-    df = df.loc[df['average_cost_for_two'] != 25000017, :]
-
-    # Resetando o index:
-    df = df.reset_index(drop=True)
-        
-    return df
+    return {'restaurantes': aggregates['restaurants'].sum(),
+            'paises': aggregates.index.get_level_values('country').nunique(),
+            'cidades': aggregates.index.get_level_values('city').nunique(),
+            'avaliacoes': aggregates['votes_sum'].sum(),
+            'cuisines': aggregates.index.get_level_values('cuisines').nunique()}
 
 # Função para inserir métricas gerais:
-def general_metrics(metrics):
+def general_metrics(aggregates):
     """ Essa função tem a responsabilidade de inserir as métricas gerais da empresa.
         
         Métricas inseridas:
@@ -208,82 +44,252 @@ def general_metrics(metrics):
         4. Total de avaliações feitas;
         5. Total de tipos de culinária.
         
-        Input: Dataframe
+        Input: tabela de agregados (load_dataset_aggregates), calculada sobre o dataset completo - as métricas não são afetadas pelo filtro.
         Output: None
-        OBS: É necessário inserir a cópia do dataframe salva na variável metrics, para que as métricas não sejam afetadas pelo filtro.
+        OBS: Os agregados são mantidos de forma incremental quando o dataset recebe atualizações (utils.ingest.append_delta). Os totais
+        são calculados uma vez por versão dos dados (utils.sections.cached_section).
     """
+    totais = cached_section('metricas_gerais', lambda: general_totals(aggregates), {}, dataset_version())
 
     col1, col2, col3, col4, col5 = st.columns(5)
 
     with col1:
 
         # Total de restaurantes cadastrados: 
-        restaurantes_cadastrados = metrics['restaurant_id'].nunique()
-
-        col1.metric('Restaurantes cadastrados', restaurantes_cadastrados)
+        col1.metric('Restaurantes cadastrados', totais['restaurantes'])
 
     with col2:
 
         # Total de países cadastrados:
-        paises_cadastrados = metrics['country'].nunique()
-
-        col2.metric('Países cadastrados', paises_cadastrados)
+        col2.metric('Países cadastrados', totais['paises'])
 
     with col3:
 
         # Total de cidades cadastradas:
-        cidades_cadastradas= metrics['city'].nunique()
-
-        col3.metric('Cidades cadastradas', cidades_cadastradas)
+        col3.metric('Cidades cadastradas', totais['cidades'])
 
     with col4:
 
         # Total de avaliações feitas:
-        total_avaliacoes = metrics['votes'].sum()
-
-        col4.metric('Avaliações feitas na plataforma', f'{total_avaliacoes:,}'.replace(',', '.'))
+        col4.metric('Avaliações feitas na plataforma', f"{totais['avaliacoes']:,}".replace(',', '.'))
 
     with col5:
 
         # Total de tipos de culinária:
-        total_cuisines = metrics['cuisines'].nunique()
-
-        col5.metric('Tipos de culinária oferecidos', total_cuisines)
+        col5.metric('Tipos de culinária oferecidos', totais['cuisines'])
         
     return None
 
+# Função para inserir os detalhes do restaurante clicado no mapa:
+def restaurant_popup(popups, value):
+    """ Essa função tem a responsabilidade de inserir o nome, o custo médio para duas pessoas, o tipo de culinária e a média de avaliações
+        do restaurante clicado no mapa. Os marcadores levam somente o restaurant_id e as coordenadas; os detalhes são consultados na
+        tabela indexada pelo restaurant_id (utils.maps.restaurant_details).
+
+        Input:
+            - popups: tabela de detalhes (load_dataset_popups)
+            - value: valor retornado pelo componente do mapa
+        Output: None
+    """
+    info = restaurant_details(popups, (value or {}).get('last_object_clicked_tooltip'))
+
+    if info is None:
+
+        st.caption('Clique em um restaurante para ver os detalhes.')
+
+        return None
+
+    st.markdown(f"""**{info['restaurant_name']}**  
+    Preço: {info['average_cost_for_two']},00 {info['currency']} para dois  
+    Cuisine: {info['cuisines']}  
+    Aggregate rating: {info['aggregate_rating']}/5.0""")
+
+    return None
+
 # Função para criar e inserir o mapa da localização dos restaurantes:
-def restaurant_map(df):
+def restaurant_map(df, popups, rows, countries):
     """ Essa função tem a responsabilidade de criar e inserir o mapa da localização dos restaurantes por meio da latitude e longitude.
-        Além disso, também insere o nome, o custo médio para duas pessoas, o tipo de culinária e a média de avaliações de cada restaurante.
+        Além disso, também insere o nome, o custo médio para duas pessoas, o tipo de culinária e a média de avaliações do restaurante clicado.
+        Acima de MARKER_LIMIT restaurantes o mapa usa o modo de alto volume (utils.maps), com os marcadores criados no navegador.
+        O mapa renderizado fica em cache por seleção de países e versão dos dados (utils.map_cache).
         
-        Input: Dataframe
+        Input:
+            - df: Dataframe completo
+            - popups: tabela de detalhes (load_dataset_popups)
+            - rows: posições das linhas selecionadas pelos filtros (utils.bitmaps.select_rows)
+            - countries: países selecionados no filtro
         Output: None
         
     """
+    rendered = cached_map(lambda: restaurant_map_figure(df, rows), countries, dataset_version(), key='mapa_todos_restaurantes')
+
+    # Somente o clique em um restaurante executa a página de novo (zoom e movimento do mapa não):
+    value = map_component(rendered, returned_objects=['last_object_clicked_tooltip'], width=1024, height=600)
+
+    restaurant_popup(popups, value)
     
-    df_aux = df.loc[:, ['latitude', 'longitude', 'restaurant_name', 'cuisines', 'average_cost_for_two', 'currency','aggregate_rating', 'color_name']]
+    return None
 
-    map = folium.Map()
+# Função para montar a camada da região visível do mapa interativo:
+def cluster_view(df, clusters, spatial_index, countries, rows, folium_map, view):
+    """ Essa função tem a responsabilidade de montar a camada da região visível do mapa interativo: os marcadores dos restaurantes,
+        se a região tiver até POINT_CAP restaurantes, ou os clusters do zoom atual, e renderizar o mapa com a camada como o st_folium.
+
+        Input:
+            - df, clusters, spatial_index, countries, rows: como em restaurant_cluster_map
+            - folium_map: folium.Map base (sem a camada)
+            - view: zoom e região visível (utils.maps.map_view)
+        Output: (dict de utils.map_cache.render_map, legenda do mapa)
+    """
+    points = points_in_view(spatial_index, view['bounds'], selected=rows)
 
-    marker_cluster = MarkerCluster().add_to(map)
+    if len(points) <= POINT_CAP:
+        layer = point_layer(df, points)
+        caption = f'{len(points)} restaurantes na região visível.'
+    else:
+        layer = cluster_layer(clusters_in_view(clusters, view['zoom'], view['bounds'], countries))
+        caption = f'Mais de {POINT_CAP} restaurantes na região visível: aproxime o mapa para ver cada restaurante.'
+
+    return render_map(folium_map, feature_group=layer, key='mapa_restaurantes'), caption
+
+# Função para criar e inserir o mapa interativo agrupado por região:
+def restaurant_cluster_map(df, clusters, spatial_index, popups, countries, rows):
+    """ Essa função tem a responsabilidade de criar e inserir o mapa interativo, que carrega somente a região visível: a cada zoom ou
+        movimento do mapa os restaurantes da região são buscados no índice espacial (utils.clusters.points_in_view). Se a região tiver
+        até POINT_CAP restaurantes, cada um aparece com o seu marcador; se tiver mais, o mapa mostra os clusters do zoom atual
+        (utils.clusters.clusters_in_view), com a quantidade de restaurantes e a nota média de cada região.
+        O tempo não depende do tamanho do dataset, e sim da quantidade de restaurantes ou células visíveis. A região visível é ampliada
+        até as bordas dos tiles do zoom atual (utils.clusters.snap_bounds) e o mapa renderizado fica em cache por região e seleção de
+        países (utils.sections.cached_section): as interações com os outros widgets da página e os movimentos pequenos do mapa não
+        montam o mapa de novo.
+
+        Input:
+            - df: Dataframe completo
+            - clusters: pirâmide de clusters (load_dataset_clusters)
+            - spatial_index: índice espacial (load_dataset_spatial_index)
+            - popups: tabela de detalhes (load_dataset_popups)
+            - countries: países selecionados no filtro
+            - rows: posições das linhas selecionadas pelos filtros (utils.bitmaps.select_rows)
+        Output: None
+    """
+    folium_map = folium.Map()
 
-    for index, info in df_aux.iterrows():
+    # Zoom e região da última interação (lidos antes do componente do mapa para que a camada já corresponda à região atual):
+    view = map_view(st.session_state.get(component_key(folium_map, 'mapa_restaurantes')))
 
-        popup = folium.Popup(f""" <p><strong>{info['restaurant_name']}</strong></p>
-        Preço: {info['average_cost_for_two']},00 {info['currency']} para dois<br>
-        Cuisine: {info['cuisines']}<br>
-        Aggregate rating: {info['aggregate_rating']}/5.0 
-               """,
-        max_width=500,
-        )
+    # Região arredondada para os tiles do zoom, para que a chave do cache não mude a cada pixel de movimento:
+    view = {'zoom': view['zoom'], 'bounds': snap_bounds(view['zoom'], view['bounds'])}
 
-        folium.Marker(location=[info['latitude'], info['longitude']],
-                    icon=folium.Icon(icon='glyphicon glyphicon-cutlery', color=info['color_name']),
-                    popup=popup).add_to(marker_cluster)
+    rendered, caption = cached_section('mapa_agrupado', lambda: cluster_view(df, clusters, spatial_index, countries, rows, folium_map, view),
+                                       {'country': countries, 'zoom': view['zoom'], 'bounds': view['bounds']}, dataset_version())
+
+    value = map_component(rendered, returned_objects=['zoom', 'bounds', 'last_object_clicked_tooltip'], width=1024, height=600)
+
+    st.caption(caption)
+
+    restaurant_popup(popups, value)
+
+    return None
+
+# Função para criar e inserir o mapa de densidade:
+def restaurant_density_map(df, rows, countries, measure):
+    """ Essa função tem a responsabilidade de criar e inserir o mapa de densidade: a região dos restaurantes selecionados é dividida
+        em uma grade (utils.density) e cada célula mostra a quantidade de restaurantes ou a nota média. A grade e o mapa renderizado são
+        calculados uma vez por seleção de países, medida e versão dos dados (utils.map_cache).
+
+        Input:
+            - df: Dataframe completo
+            - rows: posições das linhas selecionadas pelos filtros (utils.bitmaps.select_rows)
+            - countries: países selecionados no filtro
+            - measure: 'restaurants' (quantidade de restaurantes) ou 'rating' (nota média)
+        Output: None
+    """
+    version = dataset_version()
+
+    grid = density_summary(df, rows, countries, version)
+
+    rendered = cached_map(lambda: density_map(grid, measure), countries, version, name=('density', measure), key='mapa_densidade')
+
+    # Nenhuma interação com o mapa executa a página de novo:
+    map_component(rendered, returned_objects=[], width=1024, height=600)
+
+    st.caption(f'{len(grid)} células com restaurantes.')
+
+    return None
+
+# Função para buscar os restaurantes próximos a um ponto:
+def nearby_table(df, table, spatial_index, bitmaps, selections, latitude, longitude, radius):
+    """ Essa função tem a responsabilidade de montar a tabela dos 50 restaurantes mais próximos do ponto, dentro do raio e dos filtros.
+
+        Input:
+            - df, table, spatial_index, bitmaps: como em nearby_restaurants
+            - selections: filtros no formato de utils.bitmaps.select_rows
+            - latitude, longitude, radius: ponto (graus) e raio (km) da busca
+        Output: pa.Table com a coluna distance_km, do mais próximo para o mais distante
+    """
+    rows = select_rows(bitmaps, **selections)
+
+    # Os 50 restaurantes mais próximos:
+    rows, distances = restaurants_near(df, spatial_index, latitude, longitude, radius, selected=rows, limit=50)
+
+    colunas = ['restaurant_name', 'city', 'country', 'cuisines', 'price_type', 'aggregate_rating']
+
+    return append_columns(table_rows(table, rows, colunas), distance_km=distances.round(2))
+
+# Função para inserir a busca de restaurantes próximos:
+def nearby_restaurants(df, table, spatial_index, bitmaps, countries):
+    """ Essa função tem a responsabilidade de inserir a busca de restaurantes próximos a um ponto: dado o ponto (latitude e longitude),
+        o raio e, opcionalmente, os tipos de culinária e de preço, insere a tabela dos restaurantes dentro do raio, do mais próximo
+        para o mais distante (utils.nearby.restaurants_near).
+
+        Input:
+            - df: Dataframe completo
+            - table: tabela Arrow do dataset (load_dataset_arrow)
+            - spatial_index: índice espacial (load_dataset_spatial_index)
+            - bitmaps: índice de bitmaps dos filtros (load_dataset_bitmaps)
+            - countries: países selecionados no filtro
+        Output: None
+    """
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+
+        latitude = st.number_input('Latitude:', min_value=-90.0, max_value=90.0, value=28.6139, format='%.4f')
+
+    with col2:
+
+        longitude = st.number_input('Longitude:', min_value=-180.0, max_value=180.0, value=77.2090, format='%.4f')
+
+    with col3:
+
+        radius = st.number_input('Raio (km):', min_value=0.1, max_value=20_000.0, value=5.0)
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+
+        cuisine_options = st.multiselect('Tipos de culinária (vazio para todos):', list(df['cuisines'].cat.categories))
+
+    with col2:
+
+        price_options = st.multiselect('Tipos de preço (vazio para todos):', list(df['price_type'].cat.categories))
+
+    # Filtros - os seletores vazios não restringem a busca:
+    selections = {'country': countries}
+
+    if cuisine_options:
+        selections['cuisines'] = cuisine_options
+
+    if price_options:
+        selections['price_type'] = price_options
+
+    # A busca só é refeita quando o ponto, o raio ou os filtros mudam:
+    restaurantes = cached_section('restaurantes_proximos',
+                                  lambda: nearby_table(df, table, spatial_index, bitmaps, selections, latitude, longitude, radius),
+                                  {**selections, 'latitude': latitude, 'longitude': longitude, 'radius': radius}, dataset_version())
+
+    st.dataframe(restaurantes, use_container_width=True)
 
-    folium_static(map, width = 1024, height = 600)
-    
     return None
 
 # -------------------------------------------- Início da estrutura lógica do código ----------------------------------------------------------------
@@ -291,15 +297,29 @@ def restaurant_map(df):
 #==============================================
 # Import dataset
 #==============================================
-df_original = pd.read_csv('dataset/zomato.csv')
+# Registro do tempo de cada seção desta execução da página (utils.sections):
+start_sections()
 
-#==============================================
-# Limpeza e preparação dos dados
-#==============================================
-df = clean_dataframe(df_original)
+with section('Dados'):
+
+    # Dataset limpo, carregado uma única vez por processo e compartilhado (somente leitura) entre as sessões:
+    df = load_dataset()
 
-# Criando cópia do dataframe para as métricas principais não se alterarem com os filtros:
-metrics = df.copy()
+    # Tabela de agregados do dataset completo, usada nas métricas principais (não é afetada pelos filtros):
+    aggregates = load_dataset_aggregates()
+
+    # Índice de bitmaps usado para resolver os filtros sem comparar textos linha a linha:
+    bitmaps = load_dataset_bitmaps()
+
+    # Pirâmide de clusters por zoom e índice espacial usados pelo mapa interativo:
+    clusters = load_dataset_clusters()
+    spatial_index = load_dataset_spatial_index()
+
+    # Detalhes dos restaurantes indexados pelo restaurant_id, consultados quando um restaurante é clicado no mapa:
+    popups = load_dataset_popups()
+
+    # Tabela Arrow do dataset, da qual a tabela de restaurantes próximos é selecionada sem conversão do pandas:
+    table = load_dataset_arrow()
 
 #==============================================
 # Configuração da largura da página
@@ -351,19 +371,44 @@ st.sidebar.markdown('## Filtros')
 country_options = st.sidebar.multiselect('Escolha os países dos quais deseja visualizar restaurantes:', 
                                          list(df['country'].unique()), default=list(df['country'].unique()))
 
-# Botão para download dos dados tratados:
-dados_tratados = pd.read_csv('dataset/dados_tratados.csv', sep=';')
+# Seletor da visualização do mapa:
+map_options = st.sidebar.radio('Visualização do mapa:', ['Agrupado por região', 'Todos os restaurantes', 'Densidade por região'])
+
+# Seletor da cor das células do mapa de densidade:
+if map_options == 'Densidade por região':
+
+    density_options = st.sidebar.radio('Cor das células:', ['Quantidade de restaurantes', 'Nota média'])
+
+# Download dos dados tratados - o arquivo só é gerado (ou lido do cache de utils.exports) quando o download é pedido:
+with section('Download'):
+
+    st.sidebar.markdown('## Dados tratados')
 
-st.sidebar.markdown('## Dados tratados')
+    formato = st.sidebar.selectbox('Formato:', list(EXPORT_FORMATS))
 
-st.sidebar.download_button(label='Download',
-                           data=dados_tratados.to_csv(index=False, sep=';'),
-                           file_name='data.csv',
-                           mime='text/csv')
+    somente_filtrados = st.sidebar.checkbox('Somente os países selecionados')
 
-# Filtro países:
-linhas_selecionadas = df['country'].isin(country_options)
-df = df.loc[linhas_selecionadas, :]
+    # Downloads já preparados nesta sessão (versão dos dados, formato, países): o st.button só é True na execução do clique, e o botão
+    # de download precisa continuar na página quando outro widget muda:
+    preparados = st.session_state.setdefault('downloads_preparados', set())
+    exportados = country_options if somente_filtrados else None
+    download = (dataset_version(), formato, None if exportados is None else tuple(sorted(exportados)))
+
+    if st.sidebar.button('Preparar download'):
+
+        preparados.add(download)
+
+    if download in preparados:
+
+        dados_tratados = export_data(df, table, bitmaps, dataset_version(), formato, countries=exportados)
+
+        st.sidebar.download_button(label='Download',
+                                   data=dados_tratados,
+                                   file_name=export_file_name(formato, filtered=somente_filtrados),
+                                   mime=EXPORT_FORMATS[formato]['mime'])
+
+# Filtro países - posições das linhas selecionadas (o dataframe completo não é copiado):
+linhas_selecionadas = select_rows(bitmaps, country=country_options)
 
 # Contato:
 st.sidebar.markdown("### Feito por [Luísa Muzzi](https://luisamuzzi.github.io/portfolio_projetos/)")
@@ -378,10 +423,32 @@ st.markdown('## O melhor lugar para encontrar seu mais novo restaurante favorito
 st.markdown('### Temos as seguintes marcas dentro da nossa plataforma:')
 
 # Inserindo métricas gerais:
-general_metrics(metrics)
+with section('Métricas gerais'):
+
+    general_metrics(aggregates)
     
 # Inserindo mapa:
-with st.container():
+with st.container(), section('Mapa'):
+
+    if map_options == 'Agrupado por região':
+
+        restaurant_cluster_map(df, clusters, spatial_index, popups, country_options, linhas_selecionadas)
+
+    elif map_options == 'Densidade por região':
+
+        restaurant_density_map(df, linhas_selecionadas, country_options,
+                               'restaurants' if density_options == 'Quantidade de restaurantes' else 'rating')
+
+    else:
     
-    restaurant_map(df)
+        restaurant_map(df, popups, linhas_selecionadas, country_options)
+
+# Inserindo busca de restaurantes próximos:
+with st.container(), section('Restaurantes próximos'):
+
+    st.markdown('### Restaurantes próximos')
+
+    nearby_restaurants(df, table, spatial_index, bitmaps, country_options)
 
+# Tempo de cada seção desta execução (recalculada, reaproveitada ou sem cache) - exibido somente quando pedido:
+show_section_timings()
@@ -1,216 +1,31 @@
 #==============================================
 # Libraries
 #==============================================
-import pandas as pd
-import inflection
 import plotly.express as px
-import folium
-from folium.plugins import MarkerCluster
-from haversine import haversine
 import streamlit as st
-from streamlit_folium import folium_static
 from PIL import Image
 
-#==============================================
-# Variáveis auxiliares
-#==============================================
-# Variável COUNTRIES - Contém o nome do país correspondente a cada código numérico e será usada na função que preencherá o nome dos países (country_name).
-COUNTRIES = {
-    1: "India",
-    14: "Australia",
-    30: "Brazil",
-    37: "Canada",
-    94: "Indonesia",
-    148: "New Zeland",
-    162: "Philippines",
-    166: "Qatar",
-    184: "Singapure",
-    189: "South Africa",
-    191: "Sri Lanka",
-    208: "Turkey",
-    214: "United Arab Emirates",
-    215: "United Kingdom",
-    216: "United States of America",
-}
-
-# Variável COLORS - Contém o nome correspondente a cada código de cor e será usada na função que preencherá o nome das cores (color_name).
-COLORS = {
-    "3F7E00": "darkgreen",
-    "5BA829": "green",
-    "9ACD32": "lightgreen",
-    "CDD614": "orange",
-    "FFBA00": "red",
-    "CBCBC8": "darkred",
-    "FF7800": "darkred",
-}
+from utils.figures import cached_figure, plotly_figure
+from utils.loader import dataset_version, load_dataset, load_dataset_aggregates
+from utils.metrics import country_summary
+from utils.sections import section, show_section_timings, start_sections
 
 #==============================================
 # Funções
 #==============================================
-# Função para renomear as colunas do dataframe:
-def rename_columns(dataframe):
-    """ Essa função tem a responsabilidade de renomear as colunas do dataframe trocando as letras maiúsculas por minúsculas
-        e trocando espaços por underscore (_).
-        
-        Input: Dataframe
-        Output: Dataframe
-    
-    """
-    df = dataframe.copy()
-    title = lambda x: inflection.titleize(x)
-    snakecase = lambda x: inflection.underscore(x)
-    spaces = lambda x: x.replace(" ", "")
-    cols_old = list(df.columns)
-    cols_old = list(map(title, cols_old))
-    cols_old = list(map(spaces, cols_old))
-    cols_new = list(map(snakecase, cols_old))
-    df.columns = cols_new
-    
-    return df
-
-
-# Função para preenchimento do nome dos países:
-def country_name(country_id):
-    """ Essa função tem a responsabilidade de preencher o nome dos países utilizando a variável auxiliar COUNTRIES.
-        Aplicar em cada linha da coluna de código numérico dos países por meio do comando .apply().
-    
-    """
-    return COUNTRIES[country_id]
-
-
-# Função para criação da categoria do tipo de preço:
-def create_price_type(price_range):
-    """ Essa função tem a responsabilidade de preencher a categoria do tipo de preço dos restaurantes a partir da coluna de
-        faixa de preço.
-        Aplicar em cada linha da coluna de faixa de preço por meio do comando .apply().
-    """    
-    if price_range == 1:
-        return "cheap"
-    elif price_range == 2:
-        return "normal"
-    elif price_range == 3:
-        return "expensive"
-    else:
-        return "gourmet"
-
-    
-# Função para criação do nome das cores:
-def color_name(color_code):
-    """ Essa função tem a responsabilidade de preencher o nome das cores utilizando a variável auxiliar COLORS.
-        Aplicar em cada linha da coluna de código numérico das cores por meio do comando .apply().
-    """
-    return COLORS[color_code]
-
-
-# Função para ajustar a ordem das colunas:
-def adjust_columns_order(dataframe):
-    """ Essa função tem a responsabilidade de ajustar a ordem das colunas do dataframe.
-        
-        Input: Dataframe
-        Output: Dataframe
-        
-    """
-    df = dataframe.copy()
-
-    new_cols_order = [
-        "restaurant_id",
-        "restaurant_name",
-        "country",
-        "city",
-        "address",
-        "locality",
-        "locality_verbose",
-        "longitude",
-        "latitude",
-        "cuisines",
-        "price_range",
-        "price_type",
-        "average_cost_for_two",
-        "currency",
-        "has_table_booking",
-        "has_online_delivery",
-        "is_delivering_now",
-        "aggregate_rating",
-        "rating_color",
-        "color_name",
-        "rating_text",
-        "votes",
-    ]
-
-    return df.loc[:, new_cols_order]
-
-# Função para limpar o dataframe:
-def clean_dataframe(df):
-    """ Essa função tem a responsabilidade de limpar e preprar o dataframe.
-        
-        Tipos de limpeza e preparação realizadas:
-        1. Remoção de NA;
-        2. Mudança do nome das colunas substituindo espaços por _ e letras maiúsculas por minúsculas;
-        3. Remoção da coluna "switch_to_order_menu", que possui apenas um valor em todas as linhas;
-        4. Criação de uma coluna com o nome dos países e remoção da coluna com o código dos países;
-        5. Criação de uma coluna de tipo de preço;
-        6. Criação de uma coluna com o nome das cores;
-        7. Categorização dos restaurantes por somente um tipo de culinária;
-        8. Eliminação de linhas duplicadas;
-        9. Ajuste da ordem das colunas;
-        10. Remoção de outliers;
-        11. Reset do index.
-        
-        Input: Dataframe
-        Output: Dataframe
-        
-    """
-    
-    # Eliminando NaN:
-    df = df.dropna()
-
-    # Renomear as colunas do dataframe:
-    df = rename_columns(df)
-
-    # Remoção da coluna "switch_to_order_menu" - possui apenas um valor em todas as linhas:
-    df = df.drop(columns = ['switch_to_order_menu'])
-
-    # Criação de uma coluna com o nome dos países e remoção da coluna 'country_code':
-    df['country'] = df.loc[:, 'country_code'].apply(lambda x: country_name(x))
-    df = df.drop(columns=['country_code'])
-
-    # Criação de uma coluna da categoria do tipo de preço:
-    df['price_type'] = df.loc[:, 'price_range'].apply(lambda x: create_price_type(x))
-
-    # Criação de uma coluna com o nome das cores:
-    df['color_name'] = df.loc[:, 'rating_color'].apply(lambda x: color_name(x))
-
-    # Categorização dos restaurantes por somente um tipo de culinária:
-    df['cuisines'] = df.loc[:, 'cuisines'].apply(lambda x: x.split(',')[0])
-
-    # Eliminando linhas duplicadas:
-    df = df.drop_duplicates()
-
-    # Ajustando a ordem das colunas:
-    df = adjust_columns_order(df)
-
-    # Removendo outliers:
-    df = df.loc[df['average_cost_for_two'] != 25000017, :]
-
-    # Resetando o index:
-    df = df.reset_index(drop=True)
-        
-    return df
-
 # Função para plotar o gráfico do número de restaurantes registrados por país:
-def restaurants_per_country(df):
+def restaurants_per_country(countries):
     """ Essa função tem como responsabilidade plotar um gráfico de barras com o número de restaurantes (y) por país (x).
-        Utiliza as colunas 'country' e 'restaurant_id', agrupando por 'country' e realizando a contagem de 'restaurant_id'.
+        Utiliza a coluna 'restaurants' da tabela de métricas por país (country_metrics).
         
-        Input: Dataframe
+        Input: tabela de métricas por país (country_summary)
         Output: fig (o gráfico gerado)
         OBS: A função não exibe o gráfico, é preciso um comando separado para isso.
     """
 
-    df_aux = (df.loc[:, ['country', 'restaurant_id']].groupby('country')
-                                                  .count()
-                                                  .sort_values('restaurant_id', ascending=False)
-                                                  .reset_index())
+    df_aux = (countries.loc[:, ['restaurants']].rename(columns={'restaurants': 'restaurant_id'})
+              .sort_values('restaurant_id', ascending=False)
+              .reset_index())
 
     fig = px.bar(df_aux, x='country', y='restaurant_id', text='restaurant_id', category_orders={'restaurant_id': df_aux['restaurant_id']}, 
        labels={'country' : 'País', 'restaurant_id': 'Quantidade de restaurantes'})
@@ -221,19 +36,18 @@ def restaurants_per_country(df):
     return fig
 
 # Função para plotar o gráfico de número de cidades registradas por país:
-def cities_per_country(df):
+def cities_per_country(countries):
     """ Essa função tem por responsabilidade plotar o gráfico de barras do número de cidades (y) por país (x).
-        Utiliza as colunas 'country' e 'city', agrupando por 'country' e obtendo o número de cidades únicas.
+        Utiliza a coluna 'cities' (cidades distintas) da tabela de métricas por país (country_metrics).
         
-        Input: Dataframe
+        Input: tabela de métricas por país (country_summary)
         Output: fig (o gráfico gerado)
         OBS: A função não exibe o gráfico, é preciso um comando separado para isso.
     """
 
-    df_aux = (df.loc[:, ['country','city']].groupby('country')
-                                        .nunique()
-                                        .sort_values('city', ascending=False)
-                                        .reset_index())
+    df_aux = (countries.loc[:, ['cities']].rename(columns={'cities': 'city'})
+              .sort_values('city', ascending=False)
+              .reset_index())
 
     fig = px.bar(df_aux, x='country', y ='city', text='city', category_orders={'city': df_aux['city']}, 
        labels={'country': 'País',
@@ -245,19 +59,18 @@ def cities_per_country(df):
     return fig
 
 # Função para plotar o gráfico da média de avaliações por país:
-def avg_ratings_per_country(df):
+def avg_ratings_per_country(countries):
     """ Essa função tem a responsabilidade de plotar um gráfico de barras da média de avaliações (y) por país (x).
-        Utiliza as colunas 'country' e 'votes', agrupando por 'country' e calculando a média de 'votes'.
+        Utiliza a coluna 'avg_votes' da tabela de métricas por país (country_metrics).
         
-        Input: Dataframe
+        Input: tabela de métricas por país (country_summary)
         Output: fig (o gráfico gerado)
         OBS: A função não exibe o gráfico, é preciso um comando separado para isso.
     """
 
-    df_aux = (df.loc[:, ['votes', 'country']].groupby('country')
-                                      .mean()
-                                      .sort_values('votes', ascending=False)
-                                      .reset_index())
+    df_aux = (countries.loc[:, ['avg_votes']].rename(columns={'avg_votes': 'votes'})
+              .sort_values('votes', ascending=False)
+              .reset_index())
 
     fig = px.bar(df_aux, x='country', y='votes', text='votes', text_auto='.2f', category_orders={'votes': df_aux['votes']}, 
     labels={'country': 'País',
@@ -269,19 +82,18 @@ def avg_ratings_per_country(df):
     return fig
 
 # Função para plotar o gráfico da média de preço do prato para duas pessoas por país:
-def avg_price_for_two (df):
+def avg_price_for_two (countries):
     """ Essa função tem a responsabilidade de plotar um gráfico de barras da média de preço para duas pessoas (y) por país (x).
-        Utiliza as colunas 'country' e 'average_cost_for_two', agrupando por 'country' e calculando a média de 'average_cost_for_two'.
+        Utiliza a coluna 'avg_cost_for_two' da tabela de métricas por país (country_metrics).
         
-        Input: Dataframe
+        Input: tabela de métricas por país (country_summary)
         Output: fig (o gráfico gerado)
         OBS: A função não exibe o gráfico, é preciso um comando separado para isso.
     """
 
-    df_aux = (df.loc[:, ['country', 'average_cost_for_two']].groupby('country')
-                                                     .mean()
-                                                     .sort_values('average_cost_for_two', ascending=False)
-                                                     .reset_index())
+    df_aux = (countries.loc[:, ['avg_cost_for_two']].rename(columns={'avg_cost_for_two': 'average_cost_for_two'})
+              .sort_values('average_cost_for_two', ascending=False)
+              .reset_index())
 
     fig = px.bar(df_aux, x='country', y='average_cost_for_two', text='average_cost_for_two', text_auto='.2f',
     category_orders={'average_cost_for_two': df_aux['average_cost_for_two']}, 
@@ -298,15 +110,16 @@ def avg_price_for_two (df):
 #==============================================
 # Import dataset
 #==============================================
-df_original = pd.read_csv('dataset/zomato.csv')
+# Registro do tempo de cada seção desta execução da página (utils.sections):
+start_sections()
 
-#==============================================
-# Limpeza e preparação dos dados
-#==============================================
-df = clean_dataframe(df_original)
+with section('Dados'):
+
+    # Dataset limpo, carregado uma única vez por processo e compartilhado (somente leitura) entre as sessões:
+    df = load_dataset()
 
-# Criando cópia do dataframe para as métricas principais não se alterarem com os filtros:
-metrics = df.copy()
+    # Cubo de agregados (utils.aggregates) - a tabela de métricas por país é calculada a partir dele:
+    aggregates = load_dataset_aggregates()
 
 #==============================================
 # Configuração da largura da página
@@ -359,9 +172,10 @@ st.sidebar.markdown('## Filtros')
 country_options = st.sidebar.multiselect('Escolha os países dos quais deseja visualizar restaurantes:', 
                                          list(df['country'].unique()), default=list(df['country'].unique()))
 
-# Filtro países:
-linhas_selecionadas = df['country'].isin(country_options)
-df = df.loc[linhas_selecionadas, :]
+# Filtro países - os gráficos ficam no cache por seleção de países (utils.figures); a tabela de métricas só é calculada quando um deles
+# ainda não está no cache, uma vez por seleção:
+version = dataset_version()
+filters = {'country': country_options}
 
 # Contato:
 st.sidebar.markdown("### Feito por [Luísa Muzzi](https://luisamuzzi.github.io/portfolio_projetos/)")
@@ -371,46 +185,53 @@ st.sidebar.markdown("### Feito por [Luísa Muzzi](https://luisamuzzi.github.io/p
 #==============================================
 st.title('🌎 Visão Países')
 
-with st.container():
+with st.container(), section('Restaurantes por país'):
     
     # Número de restaurantes registrados por país:
   
     st.markdown('#### Quantidade de restaurantes registrados por país')
     
-    fig = restaurants_per_country(df)
+    fig = cached_figure('restaurants_per_country', lambda: restaurants_per_country(country_summary(aggregates, country_options, version)),
+                        filters, version)
     
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_figure(fig)
     
-with st.container():
+with st.container(), section('Cidades por país'):
     
     # Número de cidades registradas por país:
     
     st.markdown('#### Quantidade de cidades registradas por país')
    
-    fig = cities_per_country(df)
+    fig = cached_figure('cities_per_country', lambda: cities_per_country(country_summary(aggregates, country_options, version)),
+                        filters, version)
     
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_figure(fig)
     
 with st.container():
     
     col1, col2 = st.columns(2)
     
-    with col1:
+    with col1, section('Avaliações por país'):
         
         # Média de avaliações por país:
         
         st.markdown('#### Média de avaliações feitas por país')
                
-        fig = avg_ratings_per_country(df)
+        fig = cached_figure('avg_ratings_per_country', lambda: avg_ratings_per_country(country_summary(aggregates, country_options, version)),
+                            filters, version)
         
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_figure(fig)
         
-    with col2:
+    with col2, section('Preço para dois por país'):
         
         # Média de preço para duas pessoas:
         
         st.markdown('#### Média de preço de um prato para duas pessoas por país')
                 
-        fig = avg_price_for_two (df)
+        fig = cached_figure('avg_price_for_two', lambda: avg_price_for_two(country_summary(aggregates, country_options, version)),
+                            filters, version)
         
-        st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+        plotly_figure(fig)
+
+# Tempo de cada seção desta execução (recalculada, reaproveitada ou sem cache) - exibido somente quando pedido:
+show_section_timings()
@@ -1,49 +1,19 @@
 #==============================================
 # Libraries
 #==============================================
-import pandas as pd
-import inflection
 import plotly.express as px
-import folium
-from folium.plugins import MarkerCluster
-from haversine import haversine
 import streamlit as st
-from streamlit_folium import folium_static
 from PIL import Image
 
+from utils.bitmaps import select_rows
+from utils.figures import cached_figure, plotly_figure
+from utils.loader import dataset_version, load_dataset, load_dataset_aggregates, load_dataset_bitmaps
+from utils.metrics import city_competition, city_summary, top_n
+from utils.sections import section, show_section_timings, start_sections
+
 #==============================================
 # Variáveis auxiliares
 #==============================================
-# Variável COUNTRIES - Contém o nome do país correspondente a cada código numérico e será usada na função que preencherá o nome dos países (country_name).
-COUNTRIES = {
-    1: "India",
-    14: "Australia",
-    30: "Brazil",
-    37: "Canada",
-    94: "Indonesia",
-    148: "New Zeland",
-    162: "Philippines",
-    166: "Qatar",
-    184: "Singapure",
-    189: "South Africa",
-    191: "Sri Lanka",
-    208: "Turkey",
-    214: "United Arab Emirates",
-    215: "United Kingdom",
-    216: "United States of America",
-}
-
-# Variável COLORS - Contém o nome correspondente a cada código de cor e será usada na função que preencherá o nome das cores (color_name).
-COLORS = {
-    "3F7E00": "darkgreen",
-    "5BA829": "green",
-    "9ACD32": "lightgreen",
-    "CDD614": "orange",
-    "FFBA00": "red",
-    "CBCBC8": "darkred",
-    "FF7800": "darkred",
-}
-
 # Variável color_country - Contém cores para serem associadas a cada país para os funções que plotam os gráficos da Visão Cidades
 # (restaurants_per_city, restaurants_per_rating, cuisines_per_city).
 color_country = {
@@ -67,174 +37,23 @@ color_country = {
 #==============================================
 # Funções
 #==============================================
-# Função para renomear as colunas do dataframe:
-def rename_columns(dataframe):
-    """ Essa função tem a responsabilidade de renomear as colunas do dataframe trocando as letras maiúsculas por minúsculas
-        e trocando espaços por underscore (_).
-        
-        Input: Dataframe
-        Output: Dataframe
-    
-    """
-    df = dataframe.copy()
-    title = lambda x: inflection.titleize(x)
-    snakecase = lambda x: inflection.underscore(x)
-    spaces = lambda x: x.replace(" ", "")
-    cols_old = list(df.columns)
-    cols_old = list(map(title, cols_old))
-    cols_old = list(map(spaces, cols_old))
-    cols_new = list(map(snakecase, cols_old))
-    df.columns = cols_new
-    
-    return df
-
-
-# Função para preenchimento do nome dos países:
-def country_name(country_id):
-    """ Essa função tem a responsabilidade de preencher o nome dos países utilizando a variável auxiliar COUNTRIES.
-        Aplicar em cada linha da coluna de código numérico dos países por meio do comando .apply().
-    
-    """
-    return COUNTRIES[country_id]
-
-
-# Função para criação da categoria do tipo de preço:
-def create_price_type(price_range):
-    """ Essa função tem a responsabilidade de preencher a categoria do tipo de preço dos restaurantes a partir da coluna de
-        faixa de preço.
-        Aplicar em cada linha da coluna de faixa de preço por meio do comando .apply().
-    """    
-    if price_range == 1:
-        return "cheap"
-    elif price_range == 2:
-        return "normal"
-    elif price_range == 3:
-        return "expensive"
-    else:
-        return "gourmet"
-
-    
-# Função para criação do nome das cores:
-def color_name(color_code):
-    """ Essa função tem a responsabilidade de preencher o nome das cores utilizando a variável auxiliar COLORS.
-        Aplicar em cada linha da coluna de código numérico das cores por meio do comando .apply().
-    """
-    return COLORS[color_code]
-
-
-# Função para ajustar a ordem das colunas:
-def adjust_columns_order(dataframe):
-    """ Essa função tem a responsabilidade de ajustar a ordem das colunas do dataframe.
-        
-        Input: Dataframe
-        Output: Dataframe
-        
-    """
-    df = dataframe.copy()
-
-    new_cols_order = [
-        "restaurant_id",
-        "restaurant_name",
-        "country",
-        "city",
-        "address",
-        "locality",
-        "locality_verbose",
-        "longitude",
-        "latitude",
-        "cuisines",
-        "price_range",
-        "price_type",
-        "average_cost_for_two",
-        "currency",
-        "has_table_booking",
-        "has_online_delivery",
-        "is_delivering_now",
-        "aggregate_rating",
-        "rating_color",
-        "color_name",
-        "rating_text",
-        "votes",
-    ]
-
-    return df.loc[:, new_cols_order]
-
-# Função para limpar o dataframe:
-def clean_dataframe(df):
-    """ Essa função tem a responsabilidade de limpar e preprar o dataframe.
-        
-        Tipos de limpeza e preparação realizadas:
-        1. Remoção de NA;
-        2. Mudança do nome das colunas substituindo espaços por _ e letras maiúsculas por minúsculas;
-        3. Remoção da coluna "switch_to_order_menu", que possui apenas um valor em todas as linhas;
-        4. Criação de uma coluna com o nome dos países e remoção da coluna com o código dos países;
-        5. Criação de uma coluna de tipo de preço;
-        6. Criação de uma coluna com o nome das cores;
-        7. Categorização dos restaurantes por somente um tipo de culinária;
-        8. Eliminação de linhas duplicadas;
-        9. Ajuste da ordem das colunas;
-        10. Remoção de outliers;
-        11. Reset do index.
-        
-        Input: Dataframe
-        Output: Dataframe
-        
-    """
-    
-    # Eliminando NaN:
-    df = df.dropna()
-
-    # Renomear as colunas do dataframe:
-    df = rename_columns(df)
-
-    # Remoção da coluna "switch_to_order_menu" - possui apenas um valor em todas as linhas:
-    df = df.drop(columns = ['switch_to_order_menu'])
-
-    # Criação de uma coluna com o nome dos países e remoção da coluna 'country_code':
-    df['country'] = df.loc[:, 'country_code'].apply(lambda x: country_name(x))
-    df = df.drop(columns=['country_code'])
-
-    # Criação de uma coluna da categoria do tipo de preço:
-    df['price_type'] = df.loc[:, 'price_range'].apply(lambda x: create_price_type(x))
-
-    # Criação de uma coluna com o nome das cores:
-    df['color_name'] = df.loc[:, 'rating_color'].apply(lambda x: color_name(x))
-
-    # Categorização dos restaurantes por somente um tipo de culinária:
-    df['cuisines'] = df.loc[:, 'cuisines'].apply(lambda x: x.split(',')[0])
-
-    # Eliminando linhas duplicadas:
-    df = df.drop_duplicates()
-
-    # Ajustando a ordem das colunas:
-    df = adjust_columns_order(df)
-
-    # Removendo outliers:
-    df = df.loc[df['average_cost_for_two'] != 25000017, :]
-
-    # Resetando o index:
-    df = df.reset_index(drop=True)
-        
-    return df
-
 # Função para plotar o gráfico da quantidade de restaurantes registrados por cidade:
-def restaurants_per_city(df):
+def restaurants_per_city(cities):
     """ Essa função tem a responsabilidade de plotar o gráfico de baaras do número de restaurantes (y) por cidade (x), mostrando a qual país pertence cada
         cidade.
-        São utilizadas as colunas 'country', 'city' e 'restaurant_id', agrupando por 'country' e 'city' e contando a coluna 'restaurant_id'.
+        Usa a coluna 'restaurants' da tabela de métricas por cidade (city_metrics).
         Utiliza também a variável auxiliar color_country para definir as cores das barras.
         Plota as 10 primeiras cidades.
         
-        Input: Dataframe
+        Input: tabela de métricas por cidade (city_metrics)
         Output: fig (o gráfico gerado)
         OBS: A função não exibe o gráfico, é preciso um comando separado para isso. 
     """
-    df_aux = (df.loc[:, ['country','city', 'restaurant_id']].groupby(['country','city'])
-                                                     .count()
-                                                     .sort_values(['restaurant_id', 'city'], ascending=[False, True])
-                                                     .reset_index())
+    df_aux = (top_n(cities.loc[:, ['restaurants']], 'restaurants', n=10)
+                .rename(columns={'restaurants': 'restaurant_id'})
+                .reset_index())
 
-    fig = px.bar(df_aux.head(10), x='city', y ='restaurant_id', color='country', text='restaurant_id', 
+    fig = px.bar(df_aux, x='city', y ='restaurant_id', color='country', text='restaurant_id', 
     labels={'city': 'Cidade',
     'restaurant_id': 'Quantidade de restaurantes',
     'country': 'País'}, category_orders={'city': df_aux['city']}, color_discrete_map=color_country)
@@ -244,75 +63,51 @@ def restaurants_per_city(df):
     return fig
 
 # Função para plotar o gráfico da quantidade de restaurantes a partir do valor da média de avaliação:
-def restaurants_per_rating(df, rating):
+def restaurants_per_rating(cities, rating):
     """ Essa função tem a responsabilidade de plotar o gráfico de barras do número de restaurantes com média de avaliação acima de 4 (y) por cidade (x)
         OU o gráfico de barras do número de restaurantes com média de avaliação abaixo de 2.5 (y) por cidade (x).
-        Plota as 10 primeiras cidades.
+        Plota as 10 primeiras cidades (somente cidades com pelo menos um restaurante na faixa).
         
         Input: 
-            - df: dataframe com dados necessários para o cálculo
+            - cities: tabela de métricas por cidade (city_metrics); usa a coluna 'rating_above_4' ou 'rating_below_2_5'
             - rating: a nota da avaliação que determinará qual dos dois gráficos será pplotado.
                 4: rating=4 calcula a quantidade de restaurantes com média de avaliação ACIMA DE 4 (> 4)
                 2: rating=2.5 calcula a quantidade de restaurantes com média de avaliação ABAIXO DE 2.5 (< 2.5)
         Output: fig (o gráfico gerado)
     OBS: A função não exibe o gráfico, é preciso um comando separado para isso. 
     """
+    column = 'rating_above_4' if rating == 4 else 'rating_below_2_5'
 
-    if rating == 4:
-
-        df_aux = (df.loc[df['aggregate_rating'] > rating, ['aggregate_rating', 'city', 'country']]
-                    .groupby(['country', 'city'])
-                    .count()
-                    .sort_values(['aggregate_rating', 'city'], ascending=[False, True])
-                    .reset_index())
-
-        fig = px.bar(df_aux.head(10), x='city', y='aggregate_rating', color='country', text='aggregate_rating', 
-        labels={'city': 'Cidade',
-                'aggregate_rating': 'Quantidade de restaurantes',
-                'country': 'País'}, category_orders={'city': df_aux['city']}, color_discrete_map=color_country)
-
-        fig.update_traces(textposition='outside')
-        fig.update_layout(height=550)
-
-        return fig
-
-    elif rating == 2.5:
+    df_aux = (top_n(cities.loc[cities[column] > 0, [column]], column, n=10)
+                .rename(columns={column: 'aggregate_rating'})
+                .reset_index())
 
-        df_aux = (df.loc[df['aggregate_rating'] < rating, ['aggregate_rating', 'city', 'country']]
-        .groupby(['country', 'city'])
-        .count()
-        .sort_values(['aggregate_rating', 'city'], ascending=[False, True]) 
-        .reset_index())
+    fig = px.bar(df_aux, x='city', y='aggregate_rating', color='country', text='aggregate_rating', 
+    labels={'city': 'Cidade',
+            'aggregate_rating': 'Quantidade de restaurantes',
+            'country': 'País'}, category_orders={'city': df_aux['city']}, color_discrete_map=color_country)
 
-        fig = px.bar(df_aux.head(10), x='city', y='aggregate_rating', color='country', text='aggregate_rating', 
-        labels={'city': 'Cidade',
-                'aggregate_rating': 'Quantidade de restaurantes',
-                'country': 'País'}, category_orders={'city': df_aux['city']}, color_discrete_map=color_country)
+    fig.update_traces(textposition='outside')
+    fig.update_layout(height=550)
 
-        fig.update_traces(textposition='outside')
-        fig.update_layout(height=550)
+    return fig
 
-        return fig
 
 # Função para plotar o gráfico do número de tipos culinários por cidade:
-def cuisines_per_city(df):
+def cuisines_per_city(cities):
     """ Essa função tem a responsabilidade de plotar o gráfico de barras do número de tipos culinários (y) por cidade (x), mostrando a qual país pertence cada
     cidade.
-    São utilizadas as colunas 'country', 'city' e 'cuisines', agrupando por 'country' e 'city' e contando os valores únicos da coluna 'cuisines'.
+    Usa a coluna 'cuisines' (tipos culinários distintos) da tabela de métricas por cidade (city_metrics).
     Utiliza também a variável auxiliar color_country para definir as cores das barras.
     Plota as 10 primeiras cidades.
     
-    Input: Dataframe
+    Input: tabela de métricas por cidade (city_metrics)
     Output: fig (o gráfico gerado)
     OBS: A função não exibe o gráfico, é preciso um comando separado para isso. 
     """
-    df_aux = (df.loc[:, ['city', 'cuisines', 'country']]
-                .groupby(['country', 'city'])
-                .nunique()
-                .sort_values(['cuisines', 'city'], ascending=[False, True])
-                .reset_index())
+    df_aux = top_n(cities.loc[:, ['cuisines']], 'cuisines', n=10).reset_index()
 
-    fig = px.bar(df_aux.head(10), x='city', y='cuisines', color='country', text='cuisines', 
+    fig = px.bar(df_aux, x='city', y='cuisines', color='country', text='cuisines', 
     labels={'city': 'Cidade',
             'cuisines': 'Quantidade de tipos culinários únicos',
             'country': 'País'},  category_orders={'city': df_aux['city']}, color_discrete_map=color_country)
@@ -322,20 +117,50 @@ def cuisines_per_city(df):
 
     return fig
 
-# -------------------------------------------- Início da estrutura lógica do código ----------------------------------------------------------------
+
+# Função para plotar o gráfico da média de concorrentes por cidade:
+def competition_per_city(competition):
+    """ Essa função tem a responsabilidade de plotar o gráfico de barras da média de concorrentes (restaurantes do mesmo tipo de culinária)
+        a até 1 km de cada restaurante (y) por cidade (x), mostrando a qual país pertence cada cidade.
+        Usa a coluna 'avg_competitors_1km' da tabela de concorrência por cidade (city_competition); a distância média até o concorrente
+        mais próximo aparece ao passar o mouse.
+        Plota as 10 primeiras cidades.
+
+        Input: tabela de concorrência por cidade (city_competition)
+        Output: fig (o gráfico gerado)
+        OBS: A função não exibe o gráfico, é preciso um comando separado para isso.
+    """
+    df_aux = top_n(competition.round(2), 'avg_competitors_1km', n=10).reset_index()
+
+    fig = px.bar(df_aux, x='city', y='avg_competitors_1km', color='country', text='avg_competitors_1km',
+    hover_data=['avg_nearest_competitor_km'],
+    labels={'city': 'Cidade',
+            'avg_competitors_1km': 'Média de concorrentes a até 1 km',
+            'avg_nearest_competitor_km': 'Distância média até o concorrente mais próximo (km)',
+            'country': 'País'}, category_orders={'city': df_aux['city']}, color_discrete_map=color_country)
+
+    fig.update_traces(textposition='outside')
+    fig.update_layout(height=550)
+
+    return fig
+
 
 #==============================================
 # Import dataset
 #==============================================
-df_original = pd.read_csv('dataset/zomato.csv')
+# Registro do tempo de cada seção desta execução da página (utils.sections):
+start_sections()
 
-#==============================================
-# Limpeza e preparação dos dados
-#==============================================
-df = clean_dataframe(df_original)
+with section('Dados'):
+
+    # Dataset limpo, carregado uma única vez por processo e compartilhado (somente leitura) entre as sessões:
+    df = load_dataset()
 
-# Criando cópia do dataframe para as métricas principais não se alterarem com os filtros:
-metrics = df.copy()
+    # Cubo de agregados (utils.aggregates) - os gráficos são respondidos a partir dele, sem agrupar as linhas do dataset:
+    aggregates = load_dataset_aggregates()
+
+    # Índice de bitmaps usado para selecionar as linhas dos países no gráfico de concorrência:
+    bitmaps = load_dataset_bitmaps()
 
 #==============================================
 # Configuração da largura da página
@@ -388,9 +213,10 @@ st.sidebar.markdown('## Filtros')
 country_options = st.sidebar.multiselect('Escolha os países dos quais deseja visualizar restaurantes:', 
                                          list(df['country'].unique()), default=list(df['country'].unique()))
 
-# Filtro países:
-linhas_selecionadas = df['country'].isin(country_options)
-df = df.loc[linhas_selecionadas, :]
+# Filtro países - os gráficos ficam no cache por seleção de países (utils.figures); as métricas por cidade só são calculadas quando um
+# deles ainda não está no cache, uma vez por seleção (city_summary):
+version = dataset_version()
+filters = {'country': country_options}
 
 # Contato:
 st.sidebar.markdown("### Feito por [Luísa Muzzi](https://luisamuzzi.github.io/portfolio_projetos/)")
@@ -400,46 +226,65 @@ st.sidebar.markdown("### Feito por [Luísa Muzzi](https://luisamuzzi.github.io/p
 #==============================================
 st.title('🏙️ Visão Cidades')
 
-with st.container():
+with st.container(), section('Restaurantes por cidade'):
     
     st.markdown('#### Top 10 cidades com mais restaurantes na base de dados')
     
     # Quantidade de restaurantes registrados por cidade (exibe os 10 primeiros):
         
-    fig = restaurants_per_city(df)
+    fig = cached_figure('restaurants_per_city', lambda: restaurants_per_city(city_summary(aggregates, country_options, version)),
+                        filters, version)
     
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_figure(fig)
     
 with st.container():
     
     col1, col2 = st.columns(2)
     
-    with col1:
+    with col1, section('Cidades com avaliação acima de 4'):
         
         st.markdown('#### Top 10 cidades com restaurantes com média de avaliação acima de 4')
         
         # Quantidade de restaurantes por cidade com média de avaliação acima de 4 (exibe os 10 primeiros):
                 
-        fig = restaurants_per_rating(df, rating=4)
+        fig = cached_figure('restaurants_per_rating', lambda: restaurants_per_rating(city_summary(aggregates, country_options, version), rating=4),
+                            {**filters, 'rating': 4}, version)
         
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_figure(fig)
         
-    with col2:
+    with col2, section('Cidades com avaliação abaixo de 2,5'):
         
         st.markdown('#### Top 10 cidades com restaurantes com média de avaliação abaixo de 2,5')
         
         # Quantidade de restaurantes por cidade com média de avaliação abaixo de 2,5 (exibe os 10 primeiros):
                 
-        fig = restaurants_per_rating(df, rating=2.5)
+        fig = cached_figure('restaurants_per_rating', lambda: restaurants_per_rating(city_summary(aggregates, country_options, version), rating=2.5),
+                            {**filters, 'rating': 2.5}, version)
         
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_figure(fig)
 
-with st.container():
+with st.container(), section('Tipos de culinária por cidade'):
     
     st.markdown('#### Top 10 cidades com restaurates com o maior número de tipos de culinária distintos')
     
     # Encontrar a quantidade de tipos únicos de culinária por cidade.
    
-    fig = cuisines_per_city(df)
+    fig = cached_figure('cuisines_per_city', lambda: cuisines_per_city(city_summary(aggregates, country_options, version)),
+                        filters, version)
     
-    st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+    plotly_figure(fig)
+
+with st.container(), section('Concorrência por cidade'):
+
+    st.markdown('#### Top 10 cidades com mais concorrentes a até 1 km (média por restaurante, mesmo tipo de culinária)')
+
+    # Média de concorrentes a até 1 km por cidade (exibe os 10 primeiros):
+
+    # Métricas de concorrência por cidade (utils.competition) das linhas dos países selecionados:
+    fig = cached_figure('competition_per_city', lambda: competition_per_city(city_competition(df, select_rows(bitmaps, country=country_options))),
+                        filters, version)
+
+    plotly_figure(fig)
+
+# Tempo de cada seção desta execução (recalculada, reaproveitada ou sem cache) - exibido somente quando pedido:
+show_section_timings()
@@ -1,228 +1,42 @@
 #==============================================
 # Libraries
 #==============================================
-import pandas as pd
-import inflection
 import plotly.express as px
-import folium
-from folium.plugins import MarkerCluster
-from haversine import haversine
 import streamlit as st
-from streamlit_folium import folium_static
 from PIL import Image
 
-#==============================================
-# Variáveis auxiliares
-#==============================================
-# Variável COUNTRIES - Contém o nome do país correspondente a cada código numérico e será usada na função que preencherá o nome dos países (country_name).
-COUNTRIES = {
-    1: "India",
-    14: "Australia",
-    30: "Brazil",
-    37: "Canada",
-    94: "Indonesia",
-    148: "New Zeland",
-    162: "Philippines",
-    166: "Qatar",
-    184: "Singapure",
-    189: "South Africa",
-    191: "Sri Lanka",
-    208: "Turkey",
-    214: "United Arab Emirates",
-    215: "United Kingdom",
-    216: "United States of America",
-}
-
-# Variável COLORS - Contém o nome correspondente a cada código de cor e será usada na função que preencherá o nome das cores (color_name).
-COLORS = {
-    "3F7E00": "darkgreen",
-    "5BA829": "green",
-    "9ACD32": "lightgreen",
-    "CDD614": "orange",
-    "FFBA00": "red",
-    "CBCBC8": "darkred",
-    "FF7800": "darkred",
-}
+from utils.aggregates import filter_aggregates, rollup
+from utils.figures import cached_figure, plotly_figure
+from utils.loader import (dataset_version, load_dataset, load_dataset_aggregates, load_dataset_arrow, load_dataset_bitmaps,
+                          load_dataset_ranking)
+from utils.ranking import best_in_group, ranked_rows
+from utils.sections import section, show_section_timings, start_sections
+from utils.tables import table_rows
 
 #==============================================
 # Funções
 #==============================================
-# Função para renomear as colunas do dataframe:
-def rename_columns(dataframe):
-    """ Essa função tem a responsabilidade de renomear as colunas do dataframe trocando as letras maiúsculas por minúsculas
-        e trocando espaços por underscore (_).
-        
-        Input: Dataframe
-        Output: Dataframe
-    
-    """
-    df = dataframe.copy()
-    title = lambda x: inflection.titleize(x)
-    snakecase = lambda x: inflection.underscore(x)
-    spaces = lambda x: x.replace(" ", "")
-    cols_old = list(df.columns)
-    cols_old = list(map(title, cols_old))
-    cols_old = list(map(spaces, cols_old))
-    cols_new = list(map(snakecase, cols_old))
-    df.columns = cols_new
-    
-    return df
-
-
-# Função para preenchimento do nome dos países:
-def country_name(country_id):
-    """ Essa função tem a responsabilidade de preencher o nome dos países utilizando a variável auxiliar COUNTRIES.
-        Aplicar em cada linha da coluna de código numérico dos países por meio do comando .apply().
-    
-    """
-    return COUNTRIES[country_id]
-
-
-# Função para criação da categoria do tipo de preço:
-def create_price_type(price_range):
-    """ Essa função tem a responsabilidade de preencher a categoria do tipo de preço dos restaurantes a partir da coluna de
-        faixa de preço.
-        Aplicar em cada linha da coluna de faixa de preço por meio do comando .apply().
-    """    
-    if price_range == 1:
-        return "cheap"
-    elif price_range == 2:
-        return "normal"
-    elif price_range == 3:
-        return "expensive"
-    else:
-        return "gourmet"
-
-    
-# Função para criação do nome das cores:
-def color_name(color_code):
-    """ Essa função tem a responsabilidade de preencher o nome das cores utilizando a variável auxiliar COLORS.
-        Aplicar em cada linha da coluna de código numérico das cores por meio do comando .apply().
-    """
-    return COLORS[color_code]
-
-
-# Função para ajustar a ordem das colunas:
-def adjust_columns_order(dataframe):
-    """ Essa função tem a responsabilidade de ajustar a ordem das colunas do dataframe.
-        
-        Input: Dataframe
-        Output: Dataframe
-        
-    """
-    df = dataframe.copy()
-
-    new_cols_order = [
-        "restaurant_id",
-        "restaurant_name",
-        "country",
-        "city",
-        "address",
-        "locality",
-        "locality_verbose",
-        "longitude",
-        "latitude",
-        "cuisines",
-        "price_range",
-        "price_type",
-        "average_cost_for_two",
-        "currency",
-        "has_table_booking",
-        "has_online_delivery",
-        "is_delivering_now",
-        "aggregate_rating",
-        "rating_color",
-        "color_name",
-        "rating_text",
-        "votes",
-    ]
-
-    return df.loc[:, new_cols_order]
-
-# Função para limpar o dataframe:
-def clean_dataframe(df):
-    """ Essa função tem a responsabilidade de limpar e preprar o dataframe.
-        
-        Tipos de limpeza e preparação realizadas:
-        1. Remoção de NA;
-        2. Mudança do nome das colunas substituindo espaços por _ e letras maiúsculas por minúsculas;
-        3. Remoção da coluna "switch_to_order_menu", que possui apenas um valor em todas as linhas;
-        4. Criação de uma coluna com o nome dos países e remoção da coluna com o código dos países;
-        5. Criação de uma coluna de tipo de preço;
-        6. Criação de uma coluna com o nome das cores;
-        7. Categorização dos restaurantes por somente um tipo de culinária;
-        8. Eliminação de linhas duplicadas;
-        9. Ajuste da ordem das colunas;
-        10. Remoção de outliers;
-        11. Reset do index.
-        
-        Input: Dataframe
-        Output: Dataframe
-        
-    """
-    
-    # Eliminando NaN:
-    df = df.dropna()
-
-    # Renomear as colunas do dataframe:
-    df = rename_columns(df)
-
-    # Remoção da coluna "switch_to_order_menu" - possui apenas um valor em todas as linhas:
-    df = df.drop(columns = ['switch_to_order_menu'])
-
-    # Criação de uma coluna com o nome dos países e remoção da coluna 'country_code':
-    df['country'] = df.loc[:, 'country_code'].apply(lambda x: country_name(x))
-    df = df.drop(columns=['country_code'])
-
-    # Criação de uma coluna da categoria do tipo de preço:
-    df['price_type'] = df.loc[:, 'price_range'].apply(lambda x: create_price_type(x))
-
-    # Criação de uma coluna com o nome das cores:
-    df['color_name'] = df.loc[:, 'rating_color'].apply(lambda x: color_name(x))
-
-    # Categorização dos restaurantes por somente um tipo de culinária:
-    df['cuisines'] = df.loc[:, 'cuisines'].apply(lambda x: x.split(',')[0])
-
-    # Eliminando linhas duplicadas:
-    df = df.drop_duplicates()
-
-    # Ajustando a ordem das colunas:
-    df = adjust_columns_order(df)
-
-    # Removendo outliers:
-    df = df.loc[df['average_cost_for_two'] != 25000017, :]
-
-    # Resetando o index:
-    df = df.reset_index(drop=True)
-        
-    return df
-
 # Função para exibir as métricas dos melhores restaurantes por tipo culinário de acordo com a média de avaliações:
-def best_per_cuisine(metrics, cuisine, col):
-    """ Essa função tem a responsabilidade de calcular o melhor restaurante do tipo de culinária inserido de acordo com a média de avaliações.
+def best_per_cuisine(metrics, ranking, cuisine, col):
+    """ Essa função tem a responsabilidade de exibir o melhor restaurante do tipo de culinária inserido de acordo com a média de avaliações.
         Deve ser inserido o dataframe metrics, pois ele é uma cópia do dataframe df desvinculada dos filtros.
+        O restaurante vem do índice de ranking (utils.ranking), já ordenado por média de avaliação e restaurant_id dentro de cada tipo de
+        culinária: a consulta lê uma única posição, sem filtrar nem ordenar o dataframe.
         
         Input:
             - metrics: dataframe chamado metrics
-            - cuisine: tipo de culinária
-                cuisine='Italian'
-                cuisine='American'
-                cuisine='Arabian'
-                cuisine='Japanese'
-                cuisine='Home-made'
+            - ranking: índice de ranking do dataset (utils.ranking)
+            - cuisine: tipo de culinária (ex.: cuisine='Italian')
             - col: coluna na qual deve ser inserida a métrica
-                col=col1 para 'Italian'
-                col=col2 para 'American'
-                col=col3 para 'Arabian'
-                col=col4 para 'Japanese'
-                col=col5 para 'Home-made'
         Output: None
     
     """
-    metric = (metrics.loc[metrics['cuisines'] == cuisine, ['restaurant_id', 'restaurant_name', 'aggregate_rating', 'cuisines', 'city', 
-                                   'country', 'average_cost_for_two', 'votes', 'currency']]
-                     .sort_values(['aggregate_rating', 'restaurant_id'], ascending=[False, True])
-                     .reset_index(drop=True))
+    columns = ['restaurant_id', 'restaurant_name', 'aggregate_rating', 'cuisines', 'city', 'country', 'average_cost_for_two', 'votes', 'currency']
+
+    metric = metrics.iloc[best_in_group(ranking, 'cuisines', cuisine, n=1), metrics.columns.get_indexer(columns)]
+
+    if metric.empty:
+        return None
 
     col.metric(label=f'{metric.iloc[0,3]}: {metric.iloc[0,1]}', 
                 value=f'{metric.iloc[0,2]}/5.0',
@@ -237,14 +51,38 @@ def best_per_cuisine(metrics, cuisine, col):
 
     return None
 
+# Função para selecionar uma página do ranking de restaurantes:
+def ranking_page(table, ranked, page, size):
+    """ Essa função tem a responsabilidade de selecionar as linhas de uma página do ranking de restaurantes (maior média de avaliação
+        primeiro, empates pelo menor restaurant_id). Copia somente as linhas da página, de modo que o tempo não depende da página
+        escolhida nem da quantidade de restaurantes filtrados.
+
+        Input:
+            - table: tabela Arrow do dataset (load_dataset_arrow)
+            - ranked: posições das linhas filtradas na ordem do ranking (utils.ranking.ranked_rows)
+            - page: número da página (a partir de 1)
+            - size: quantidade de restaurantes por página
+        Output: pa.Table com as colunas exibidas na tabela, indexada pela posição no ranking
+        OBS: A tabela Arrow é enviada ao st.dataframe sem conversão para o pandas.
+    """
+    colunas = ['restaurant_id', 'restaurant_name', 'city','country', 'cuisines', 'average_cost_for_two','aggregate_rating', 'votes',
+               'nearest_competitor_km', 'competitors_1km']
+
+    inicio = (page - 1) * size
+    linhas = ranked[inicio:inicio + size]
+
+    return table_rows(table, linhas, colunas, index_name='posição', index_start=inicio + 1)
+
 #  Função para plotar o gráfico dos melhores ou dos piores tipos de culinária:
-def top_cuisines(df, ascending):
+def top_cuisines(aggregates, ascending):
     """ Essa função tem a responsabilidade de plotar um gráfico de barras dos melhores restaurantes OU dos piores restaurantes por tipo culinário.
-        Utiliza as colunas 'cuisines' e 'aggregate_rating', agrupando por 'cuisines' e calculando a média de 'aggregate_rating'.
+        Consolida o cubo de agregados por 'cuisines' e calcula a média de 'aggregate_rating' como rating_sum / restaurants.
+        A média é arredondada em 10 casas (rating_sum / restaurants pode diferir da média no último bit) e os empates são desempatados
+        pelo nome do tipo de culinária, para que a ordem das barras não dependa da ordem do cubo.
         Plota o top tipos culinários de acordo com o selecionado no filtro de número de informações.
         
         Input:
-            - df: dataframe com dados necessários para o cálculo
+            - aggregates: cubo de agregados (já filtrado)
             - ascending: ordenação dos dados
                 ascending=True: top piores tipos culinários
                 ascending=False: top melhores tipos culinários
@@ -252,11 +90,12 @@ def top_cuisines(df, ascending):
         OBS: A função não exibe o gráfico, é preciso um comando separado para isso.               
     """
 
-    df_aux = (df.loc[:, ['cuisines', 'aggregate_rating']]
-                .groupby('cuisines')
-                .mean('aggregate_rating')
-                .sort_values('aggregate_rating', ascending=ascending)
-                .reset_index())
+    df_aux = (rollup(aggregates, 'cuisines')
+                .eval('aggregate_rating = rating_sum / restaurants')
+                .loc[:, ['aggregate_rating']]
+                .round(10)
+                .reset_index()
+                .sort_values(['aggregate_rating', 'cuisines'], ascending=[ascending, True], kind='mergesort', ignore_index=True))
 
     fig = px.bar(df_aux.head(info_options), x='cuisines', y='aggregate_rating', text='aggregate_rating', text_auto='.2f' , 
                  labels={'cuisines': 'Tipos de culinária',
@@ -272,15 +111,28 @@ def top_cuisines(df, ascending):
 #==============================================
 # Import dataset
 #==============================================
-df_original = pd.read_csv('dataset/zomato.csv')
+# Registro do tempo de cada seção desta execução da página (utils.sections):
+start_sections()
 
-#==============================================
-# Limpeza e preparação dos dados
-#==============================================
-df = clean_dataframe(df_original)
+with section('Dados'):
+
+    # Dataset limpo, carregado uma única vez por processo e compartilhado (somente leitura) entre as sessões:
+    df = load_dataset()
+
+    # As métricas principais usam o dataframe completo; os filtros abaixo criam um novo dataframe e não o alteram:
+    metrics = df
+
+    # Cubo de agregados (utils.aggregates) - os gráficos de tipos de culinária são respondidos a partir dele:
+    aggregates = load_dataset_aggregates()
+
+    # Índice de bitmaps usado para resolver os filtros sem comparar textos linha a linha:
+    bitmaps = load_dataset_bitmaps()
 
-# Criando cópia do dataframe para as métricas principais não se alterarem com os filtros:
-metrics = df.copy()
+    # Índice de ranking, usado nos melhores restaurantes de cada tipo de culinária e no ranking paginado:
+    ranking = load_dataset_ranking()
+
+    # Tabela Arrow do dataset, da qual as páginas do ranking são selecionadas sem conversão do pandas:
+    table = load_dataset_arrow()
 
 #==============================================
 # Configuração da largura da página
@@ -347,16 +199,13 @@ st.sidebar.markdown("""___""")
 cuisine_options = st.sidebar.multiselect('Escolha os tipos de culinária:',
                                          list(df['cuisines'].unique()), default=list(df['cuisines'].unique()))
 
-# Filtro países:
-linhas_selecionadas = df['country'].isin(country_options)
-df = df.loc[linhas_selecionadas, :]
+# Filtro países e de tipos de culinária - o ranking e os gráficos ficam no cache por estado dos filtros (utils.ranking, utils.figures) e
+# só são recalculados quando ele muda:
+version = dataset_version()
+filters = {'country': country_options, 'cuisines': cuisine_options, 'info_options': info_options}
 
 # Filtro de quantidade de informações:
 
-# Filtro de tipos de culinária:
-linhas_selecionadas = df['cuisines'].isin(cuisine_options)
-df = df.loc[linhas_selecionadas, :]
-
 # Contato:
 st.sidebar.markdown("### Feito por [Luísa Muzzi](https://luisamuzzi.github.io/portfolio_projetos/)")
 
@@ -365,69 +214,83 @@ st.sidebar.markdown("### Feito por [Luísa Muzzi](https://luisamuzzi.github.io/p
 #==============================================
 st.title('🍽️ Visão Tipos de Culinária')
 
-with st.container():
+with st.container(), section('Melhores restaurantes'):
     
-    st.markdown('## Melhores restaurantes dos principais tipos culinários')
+    st.markdown('## Melhores restaurantes por tipo culinário')
+
+    # Qualquer tipo de culinária pode ser escolhido (os cinco principais por padrão); cada restaurante é uma consulta ao índice de ranking:
+    principais = ['Italian', 'American', 'Arabian', 'Japanese', 'Home-made']
+
+    melhores_cuisines = st.multiselect('Escolha os tipos de culinária dos melhores restaurantes:', list(metrics['cuisines'].cat.categories),
+                                       default=[cuisine for cuisine in principais if cuisine in metrics['cuisines'].cat.categories])
+
+    # Cinco restaurantes por linha:
+    for inicio in range(0, len(melhores_cuisines), 5):
+
+        colunas = st.columns(5)
+
+        for cuisine, col in zip(melhores_cuisines[inicio:inicio + 5], colunas):
+
+            with col:
+                # Restaurante do tipo de culinária com a maior média de avaliação:
+
+                best_per_cuisine(metrics, ranking, cuisine, col=col)
+
+with st.container(), section('Ranking de restaurantes'):
     
-    col1, col2, col3, col4, col5 = st.columns(5)
+    # Ranking dos restaurantes de acordo com a média de avaliação, em páginas:
     
+    st.markdown('## Ranking dos restaurantes')
+
+    col1, col2 = st.columns(2)
+
     with col1:
-        # Restaurante de culinária italiana com a maior média de avaliação:
-        
-        best_per_cuisine(metrics, cuisine='Italian', col=col1)
-        
+
+        tamanho_pagina = st.selectbox('Restaurantes por página:', [10, 20, 50, 100], index=1)
+
     with col2:
-        # Restaurante de culinária americana com a maior média de avaliação:
-        
-        best_per_cuisine(metrics, cuisine='American', col=col2)
-    
-    with col3:
-        # Restaurante de culinária árabe com a maior média de avaliação:
-                
-        best_per_cuisine(metrics, cuisine='Arabian', col=col3)
-                   
-    with col4:
-        # Restaurante de culinária japonesa com a maior média de avaliação:
-        
-        best_per_cuisine(metrics, cuisine='Japanese', col=col4)
-        
-    with col5:
-        # Restaurante de culinária caseira com a maior média de avaliação:
-        
-        best_per_cuisine(metrics, cuisine='Home-made',col=col5)
 
-with st.container():
-    
-    # Top restaurantes de acordo com a média de avaliação:
-    
-    st.markdown(f'## Top {info_options} restaurantes')
-    
-    top_restaurantes = (df.loc[:, ['restaurant_id', 'restaurant_name', 'city','country', 'cuisines', 'average_cost_for_two','aggregate_rating', 'votes']]
-                          .sort_values(['aggregate_rating', 'restaurant_id'], ascending=[False, True]))
-    
-    st.dataframe(top_restaurantes.head(info_options), use_container_width=True)
+        pagina = st.number_input('Página:', min_value=1, value=1, step=1)
+
+    # Ranking das linhas filtradas, calculado uma vez por estado dos filtros - cada página é uma fatia dele:
+    ranking_filtrado = ranked_rows(ranking, bitmaps, version, country=country_options, cuisines=cuisine_options)
+
+    total_paginas = max(1, -(-len(ranking_filtrado) // tamanho_pagina))
+    pagina = min(int(pagina), total_paginas)
+
+    # Somente as linhas da página são enviadas ao navegador:
+    st.dataframe(ranking_page(table, ranking_filtrado, pagina, tamanho_pagina), use_container_width=True)
+
+    st.caption(f'Página {pagina} de {total_paginas} ({len(ranking_filtrado)} restaurantes).')
     
 with st.container():
     
     col1, col2 = st.columns(2)
     
-    with col1:
+    with col1, section('Melhores tipos de culinária'):
         
         # Top melhores tipos de culinária de acordo com a média de avaliação:
         
         st.markdown(f'## Top {info_options} melhores tipos de culinária')
         
-        fig = top_cuisines(df, ascending=False)
+        fig = cached_figure('top_cuisines',
+                            lambda: top_cuisines(filter_aggregates(aggregates, country=country_options, cuisines=cuisine_options), ascending=False),
+                            {**filters, 'ascending': False}, version)
         
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_figure(fig)
         
         
-    with col2:
+    with col2, section('Piores tipos de culinária'):
         
         # Top piores tipos de culinária de acordo com a média de avaliação:
         
         st.markdown(f'## Top {info_options} piores tipos de culinária')
         
-        fig = top_cuisines(df, ascending=True)
+        fig = cached_figure('top_cuisines',
+                            lambda: top_cuisines(filter_aggregates(aggregates, country=country_options, cuisines=cuisine_options), ascending=True),
+                            {**filters, 'ascending': True}, version)
         
-        st.plotly_chart(fig, use_container_width=True)
\ No newline at end of file
+        plotly_figure(fig)
+
+# Tempo de cada seção desta execução (recalculada, reaproveitada ou sem cache) - exibido somente quando pedido:
+show_section_timings()
@@ -0,0 +1 @@
+""" Módulos compartilhados pelas páginas do dashboard (limpeza e carregamento dos dados). """
@@ -0,0 +1,142 @@
+#==============================================
+# Libraries
+#==============================================
+import numpy as np
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Variável AGGREGATE_KEYS - Dimensões do cubo de agregados (cada combinação distinta é uma célula).
+AGGREGATE_KEYS = ['country', 'city', 'cuisines', 'price_type', 'rating_bucket']
+
+# Variável AGGREGATE_MEASURES - Medidas aditivas de cada célula (podem ser somadas e subtraídas entre cubos).
+AGGREGATE_MEASURES = ['restaurants', 'votes_sum', 'cost_sum', 'rating_sum']
+
+# Variável RATING_BUCKETS - Faixas de nota média usadas como dimensão do cubo. Os limites são os dos gráficos da Visão Cidades:
+# abaixo de 2,5 (< 2.5), entre 2,5 e 4 (inclusive) e acima de 4 (> 4).
+RATING_BUCKETS = ['< 2.5', '2.5 - 4', '> 4']
+
+# Tipos das medidas:
+MEASURE_DTYPES = {'restaurants': 'int64', 'votes_sum': 'int64', 'cost_sum': 'int64', 'rating_sum': 'float64'}
+
+#==============================================
+# Funções
+#==============================================
+# Função para classificar as notas em faixas:
+def rating_bucket(ratings):
+    """ Essa função tem a responsabilidade de classificar cada nota média em uma das faixas de RATING_BUCKETS.
+
+        Input: Series com as notas médias
+        Output: np.ndarray com o nome da faixa de cada nota
+    """
+    return np.select([ratings < 2.5, ratings > 4], [RATING_BUCKETS[0], RATING_BUCKETS[2]], default=RATING_BUCKETS[1])
+
+
+# Função para calcular o cubo de agregados:
+def build_aggregates(df):
+    """ Essa função tem a responsabilidade de calcular o cubo de agregados aditivos por país, cidade, tipo de culinária, tipo de preço
+        e faixa de nota.
+
+        Medidas calculadas:
+        1. restaurants: quantidade de restaurantes;
+        2. votes_sum: soma das avaliações feitas;
+        3. cost_sum: soma do preço do prato para duas pessoas;
+        4. rating_sum: soma das notas médias.
+        Contagens distintas de países, cidades e tipos de culinária não precisam de medida própria: são dimensões do cubo e saem exatas
+        de count_distinct.
+
+        Input: Dataframe limpo
+        Output: Dataframe com index (AGGREGATE_KEYS) e as colunas de AGGREGATE_MEASURES
+    """
+    cells = (df.loc[:, ['country', 'city', 'cuisines', 'price_type', 'restaurant_id', 'votes', 'average_cost_for_two', 'aggregate_rating']]
+               .astype({'country': str, 'city': str, 'cuisines': str, 'price_type': str})
+               .assign(rating_bucket=rating_bucket(df['aggregate_rating'])))
+
+    aggregates = (cells.groupby(AGGREGATE_KEYS)
+                       .agg(restaurants=('restaurant_id', 'count'),
+                            votes_sum=('votes', 'sum'),
+                            cost_sum=('average_cost_for_two', 'sum'),
+                            rating_sum=('aggregate_rating', 'sum')))
+
+    return aggregates.astype(MEASURE_DTYPES)
+
+
+# Função para combinar dois cubos de agregados:
+def merge_aggregates(aggregates, other, sign=1):
+    """ Essa função tem a responsabilidade de somar (sign=1) ou subtrair (sign=-1) um cubo de agregados de outro.
+        Células que ficam sem restaurantes são removidas.
+
+        Input:
+            - aggregates: cubo de agregados
+            - other: cubo de agregados a ser somado ou subtraído
+            - sign: 1 para somar, -1 para subtrair
+        Output: Dataframe com o cubo de agregados combinado
+    """
+    merged = aggregates.add(other * sign, fill_value=0)
+
+    merged = merged.loc[merged['restaurants'] > 0, :].sort_index()
+
+    return merged.astype(MEASURE_DTYPES)
+
+
+# Função para atualizar o cubo de agregados:
+def update_aggregates(aggregates, removed, added):
+    """ Essa função tem a responsabilidade de atualizar o cubo de agregados sem recalculá-lo do zero: retira a contribuição das linhas
+        removidas (ou da versão antiga das linhas atualizadas) e soma a contribuição das linhas novas.
+
+        Input:
+            - aggregates: cubo de agregados atual
+            - removed: Dataframe com as linhas que saíram do dataset
+            - added: Dataframe com as linhas que entraram no dataset
+        Output: Dataframe com o cubo de agregados atualizado
+    """
+    aggregates = merge_aggregates(aggregates, build_aggregates(removed), sign=-1)
+
+    return merge_aggregates(aggregates, build_aggregates(added))
+
+
+# Função para filtrar as células do cubo:
+def filter_aggregates(aggregates, **selections):
+    """ Essa função tem a responsabilidade de manter somente as células do cubo cujas dimensões estão nas seleções informadas.
+
+        Input:
+            - aggregates: cubo de agregados
+            - selections: dimensão=lista de valores, por exemplo country=['India', 'Brazil'] ou rating_bucket=['> 4']
+        Output: Dataframe com as células selecionadas
+    """
+    mask = np.ones(len(aggregates), dtype=bool)
+
+    for dimension, values in selections.items():
+        mask &= aggregates.index.get_level_values(dimension).isin(values)
+
+    return aggregates.loc[mask, :]
+
+
+# Função para consolidar o cubo em menos dimensões:
+def rollup(aggregates, by):
+    """ Essa função tem a responsabilidade de consolidar (roll-up) o cubo nas dimensões informadas, somando as medidas aditivas.
+
+        Input:
+            - aggregates: cubo de agregados (normalmente já filtrado com filter_aggregates)
+            - by: dimensão ou lista de dimensões que permanecem
+        Output: Dataframe com index nas dimensões de `by` e as colunas de AGGREGATE_MEASURES
+    """
+    return aggregates.groupby(level=by).sum()
+
+
+# Função para contar valores distintos de uma dimensão:
+def count_distinct(aggregates, by, dimension):
+    """ Essa função tem a responsabilidade de contar quantos valores distintos de uma dimensão existem em cada grupo do roll-up.
+        A contagem é exata, pois as células do cubo guardam somente combinações que existem no dataset.
+
+        Input:
+            - aggregates: cubo de agregados
+            - by: dimensão ou lista de dimensões que permanecem
+            - dimension: dimensão cujos valores distintos serão contados (por exemplo 'city')
+        Output: Series com a contagem por grupo
+    """
+    levels = [by] if isinstance(by, str) else list(by)
+
+    keys = aggregates.index.to_frame(index=False).loc[:, levels + [dimension]].drop_duplicates()
+
+    return keys.groupby(levels)[dimension].count()
@@ -0,0 +1,85 @@
+""" Índice de bitmaps do dataset limpo: um bitset (1 bit por linha) para cada valor das colunas usadas nos filtros das páginas. """
+#==============================================
+# Libraries
+#==============================================
+import numpy as np
+import pandas as pd
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Variável BITMAP_COLUMNS - Colunas com um bitset por valor.
+BITMAP_COLUMNS = ['country', 'cuisines', 'price_type', 'rating_text']
+
+#==============================================
+# Funções
+#==============================================
+# Função para construir o índice de bitmaps:
+def build_bitmap_index(df):
+    """ Essa função tem a responsabilidade de construir um bitset compactado (np.packbits, 1 bit por linha) para cada valor de cada coluna
+        de BITMAP_COLUMNS. As linhas de cada valor são encontradas com uma única ordenação dos códigos da coluna.
+
+        Input: Dataframe limpo
+        Output: dict {'rows': quantidade de linhas, coluna: {valor: bitset (np.ndarray de uint8)}}
+        OBS: O bit i corresponde à posição i do dataframe (df.iloc), e não ao rótulo do index.
+    """
+    bitmaps = {'rows': len(df)}
+
+    for column in BITMAP_COLUMNS:
+
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            codes, values = df[column].cat.codes.to_numpy(), df[column].cat.categories
+        else:
+            codes, values = pd.factorize(df[column])
+
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(values) + 1))
+
+        bitmaps[column] = {}
+
+        for code, value in enumerate(values):
+
+            if bounds[code] == bounds[code + 1]:
+                continue
+
+            bits = np.zeros(len(df), dtype=bool)
+            bits[order[bounds[code]:bounds[code + 1]]] = True
+
+            bitmaps[column][value] = np.packbits(bits)
+
+    return bitmaps
+
+
+# Função para resolver uma combinação de filtros:
+def select_rows(bitmaps, **selections):
+    """ Essa função tem a responsabilidade de resolver uma combinação de filtros com operações bit a bit: OR entre os valores selecionados
+        de uma coluna e AND entre colunas. Uma coluna com todos os valores selecionados não restringe nada e é ignorada.
+
+        Input:
+            - bitmaps: índice de build_bitmap_index
+            - selections: coluna=lista de valores, por exemplo country=['India', 'Brazil'], cuisines=['Italian']
+        Output: np.ndarray com as posições (df.iloc) das linhas selecionadas, em ordem crescente
+        OBS: As posições devem ser usadas para ler somente as colunas necessárias (df[coluna].to_numpy()[linhas]) ou poucas linhas
+        (df.iloc[linhas]), sem criar uma cópia filtrada do dataframe inteiro.
+    """
+    mask = None
+
+    for column, values in selections.items():
+
+        index = bitmaps[column]
+        values = set(values)
+
+        if values.issuperset(index):
+            continue
+
+        selected = np.zeros((bitmaps['rows'] + 7) // 8, dtype=np.uint8)
+
+        for value in values.intersection(index):
+            np.bitwise_or(selected, index[value], out=selected)
+
+        mask = selected if mask is None else np.bitwise_and(mask, selected, out=mask)
+
+    if mask is None:
+        return np.arange(bitmaps['rows'])
+
+    return np.flatnonzero(np.unpackbits(mask, count=bitmaps['rows']))
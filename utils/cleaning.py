@@ -0,0 +1,405 @@
+#==============================================
+# Libraries
+#==============================================
+import inflection
+import numpy as np
+import pandas as pd
+
+from utils.pipeline import run_pipeline
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Variável COUNTRIES - Contém o nome do país correspondente a cada código numérico e será usada na função que preencherá o nome dos países (country_name).
+COUNTRIES = {
+    1: "India",
+    14: "Australia",
+    30: "Brazil",
+    37: "Canada",
+    94: "Indonesia",
+    148: "New Zeland",
+    162: "Philippines",
+    166: "Qatar",
+    184: "Singapure",
+    189: "South Africa",
+    191: "Sri Lanka",
+    208: "Turkey",
+    214: "United Arab Emirates",
+    215: "United Kingdom",
+    216: "United States of America",
+}
+
+# Variável COLORS - Contém o nome correspondente a cada código de cor e será usada na função que preencherá o nome das cores (color_name).
+COLORS = {
+    "3F7E00": "darkgreen",
+    "5BA829": "green",
+    "9ACD32": "lightgreen",
+    "CDD614": "orange",
+    "FFBA00": "red",
+    "CBCBC8": "darkred",
+    "FF7800": "darkred",
+}
+
+# Variável CATEGORICAL_COLUMNS - Colunas de texto com poucos valores distintos, armazenadas como category na representação compacta (compact_dataframe).
+CATEGORICAL_COLUMNS = [
+    "country",
+    "city",
+    "locality",
+    "cuisines",
+    "price_type",
+    "currency",
+    "rating_color",
+    "color_name",
+    "rating_text",
+]
+
+# Variável BOOLEAN_COLUMNS - Colunas 0/1 armazenadas como bool na representação compacta (compact_dataframe).
+BOOLEAN_COLUMNS = [
+    "has_table_booking",
+    "has_online_delivery",
+    "is_delivering_now",
+]
+
+# Variável INTEGER_COLUMNS - Colunas inteiras reduzidas para o menor tipo que comporta os valores (compact_dataframe).
+INTEGER_COLUMNS = [
+    "restaurant_id",
+    "price_range",
+    "average_cost_for_two",
+    "votes",
+]
+
+#==============================================
+# Funções
+#==============================================
+# Função para renomear as colunas do dataframe:
+def rename_columns(dataframe):
+    """ Essa função tem a responsabilidade de renomear as colunas do dataframe trocando as letras maiúsculas por minúsculas
+        e trocando espaços por underscore (_).
+        
+        Input: Dataframe
+        Output: Dataframe
+    
+    """
+    df = dataframe.copy()
+    title = lambda x: inflection.titleize(x)
+    snakecase = lambda x: inflection.underscore(x)
+    spaces = lambda x: x.replace(" ", "")
+    cols_old = list(df.columns)
+    cols_old = list(map(title, cols_old))
+    cols_old = list(map(spaces, cols_old))
+    cols_new = list(map(snakecase, cols_old))
+    df.columns = cols_new
+    
+    return df
+
+
+# Função para preenchimento do nome dos países:
+def country_name(country_codes):
+    """ Essa função tem a responsabilidade de preencher o nome dos países utilizando a variável auxiliar COUNTRIES.
+        Aplicar na coluna inteira de código numérico dos países (operação vetorizada com .map()).
+
+        Input: Series com os códigos dos países
+        Output: Series com os nomes dos países
+        OBS: Gera KeyError se algum código não estiver em COUNTRIES.
+    """
+    names = country_codes.map(COUNTRIES)
+
+    if names.isna().any():
+        raise KeyError(sorted(country_codes[names.isna()].unique()))
+
+    return names
+
+
+# Função para criação da categoria do tipo de preço:
+def create_price_type(price_range):
+    """ Essa função tem a responsabilidade de preencher a categoria do tipo de preço dos restaurantes a partir da coluna de
+        faixa de preço.
+        Aplicar na coluna inteira de faixa de preço (operação vetorizada com np.select): 1 = cheap, 2 = normal, 3 = expensive e
+        qualquer outro valor = gourmet.
+
+        Input: Series com a faixa de preço
+        Output: Series com o tipo de preço
+    """
+    conditions = [price_range == 1, price_range == 2, price_range == 3]
+
+    price_type = np.select(conditions, ['cheap', 'normal', 'expensive'], default='gourmet')
+
+    return pd.Series(price_type, index=price_range.index, dtype=object)
+
+
+# Função para criação do nome das cores:
+def color_name(color_codes):
+    """ Essa função tem a responsabilidade de preencher o nome das cores utilizando a variável auxiliar COLORS.
+        Aplicar na coluna inteira de código das cores (operação vetorizada com .map()).
+
+        Input: Series com os códigos das cores
+        Output: Series com os nomes das cores
+        OBS: Gera KeyError se algum código não estiver em COLORS.
+    """
+    names = color_codes.map(COLORS)
+
+    if names.isna().any():
+        raise KeyError(sorted(color_codes[names.isna()].unique()))
+
+    return names
+
+
+# Função para manter somente o primeiro tipo de culinária:
+def first_cuisine(cuisines):
+    """ Essa função tem a responsabilidade de categorizar os restaurantes por somente um tipo de culinária, mantendo o primeiro
+        tipo da lista separada por vírgulas.
+        A coluna é fatorada (pd.factorize) e o split é feito apenas uma vez por combinação distinta de culinárias; o resultado
+        volta para as linhas com uma indexação numpy (np.take).
+
+        Input: Series com os tipos de culinária
+        Output: Series com o primeiro tipo de culinária
+    """
+    codes, uniques = pd.factorize(cuisines)
+
+    first = np.array([value.split(',')[0] for value in uniques], dtype=object)
+
+    return pd.Series(first.take(codes), index=cuisines.index, name=cuisines.name)
+
+
+# Função para ajustar a ordem das colunas:
+def adjust_columns_order(dataframe):
+    """ Essa função tem a responsabilidade de ajustar a ordem das colunas do dataframe.
+        
+        Input: Dataframe
+        Output: Dataframe
+        
+    """
+    df = dataframe.copy()
+
+    new_cols_order = [
+        "restaurant_id",
+        "restaurant_name",
+        "country",
+        "city",
+        "address",
+        "locality",
+        "locality_verbose",
+        "longitude",
+        "latitude",
+        "cuisines",
+        "price_range",
+        "price_type",
+        "average_cost_for_two",
+        "currency",
+        "has_table_booking",
+        "has_online_delivery",
+        "is_delivering_now",
+        "aggregate_rating",
+        "rating_color",
+        "color_name",
+        "rating_text",
+        "votes",
+    ]
+
+    return df.loc[:, new_cols_order]
+
+# Função da etapa de remoção de NA:
+def _drop_na(df):
+    """ Remove as linhas com algum valor ausente. """
+    return df.dropna()
+
+
+# Função da etapa de renomeação das colunas:
+def _rename_columns(df):
+    """ Renomeia as colunas para snake_case (rename_columns). """
+    return rename_columns(df)
+
+
+# Função da etapa de remoção da coluna "switch_to_order_menu":
+def _drop_switch_to_order_menu(df):
+    """ Remove a coluna "switch_to_order_menu", que possui apenas um valor em todas as linhas. """
+    return df.drop(columns=['switch_to_order_menu'])
+
+
+# Função da etapa de criação da coluna com o nome dos países:
+def _country(df):
+    """ Retorna a coluna 'country' com o nome dos países (country_name). """
+    return country_name(df['country_code']).to_frame('country')
+
+
+# Função da etapa de criação da coluna de tipo de preço:
+def _price_type(df):
+    """ Retorna a coluna 'price_type' com a categoria do tipo de preço (create_price_type). """
+    return create_price_type(df['price_range']).to_frame('price_type')
+
+
+# Função da etapa de criação da coluna com o nome das cores:
+def _color_name(df):
+    """ Retorna a coluna 'color_name' com o nome das cores (color_name). """
+    return color_name(df['rating_color']).to_frame('color_name')
+
+
+# Função da etapa de categorização por somente um tipo de culinária:
+def _cuisines(df):
+    """ Retorna a coluna 'cuisines' somente com o primeiro tipo de culinária (first_cuisine). """
+    return first_cuisine(df['cuisines']).to_frame('cuisines')
+
+
+# Função da etapa de junção das colunas derivadas e ajuste da ordem das colunas:
+def _adjust_columns_order(df, country, price_type, colors, cuisines):
+    """ Junta as colunas derivadas ao dataframe, remove a coluna 'country_code' e ajusta a ordem das colunas (adjust_columns_order). """
+    df = df.assign(country=country['country'], price_type=price_type['price_type'], color_name=colors['color_name'],
+                   cuisines=cuisines['cuisines'])
+
+    return adjust_columns_order(df.drop(columns=['country_code']))
+
+
+# Função da etapa de remoção de outliers:
+def _remove_outliers(df):
+    """ Remove o restaurante com o preço de prato para dois fora da escala. """
+    return df.loc[df['average_cost_for_two'] != 25000017, :]
+
+
+# Função da etapa de eliminação de linhas duplicadas:
+def _drop_duplicates(df):
+    """ Remove as linhas duplicadas, mantendo a primeira ocorrência. """
+    return df.drop_duplicates()
+
+
+# Função da etapa de reset do index:
+def _reset_index(df):
+    """ Troca o index pelas posições das linhas (0 a n-1). """
+    return df.reset_index(drop=True)
+
+
+# Variável CLEANING_STAGES - Etapas da limpeza (DAG executado por utils.pipeline.run_pipeline), cada uma depois das etapas de que depende.
+# 'raw' é o dataframe bruto; 'depends' lista as funções auxiliares e os mapeamentos de que cada etapa depende - mudar um deles
+# recalcula somente a etapa e as etapas abaixo dela. As colunas de país, tipo de preço, cores e culinária são calculadas em etapas
+# independentes. Ficam no cache em disco o dataframe com as colunas já selecionadas, as colunas derivadas e o resultado final; os
+# filtros e seleções de colunas ('cache': False) custam menos para executar do que para gravar e ler.
+CLEANING_STAGES = [
+    {'name': 'dropna', 'function': _drop_na, 'inputs': ['raw'], 'cache': False},
+    {'name': 'rename_columns', 'function': _rename_columns, 'inputs': ['dropna'], 'depends': ['rename_columns'], 'cache': False},
+    {'name': 'drop_switch_to_order_menu', 'function': _drop_switch_to_order_menu, 'inputs': ['rename_columns']},
+    {'name': 'country', 'function': _country, 'inputs': ['drop_switch_to_order_menu'], 'depends': ['country_name', 'COUNTRIES']},
+    {'name': 'price_type', 'function': _price_type, 'inputs': ['drop_switch_to_order_menu'], 'depends': ['create_price_type']},
+    {'name': 'color_name', 'function': _color_name, 'inputs': ['drop_switch_to_order_menu'], 'depends': ['color_name', 'COLORS']},
+    {'name': 'cuisines', 'function': _cuisines, 'inputs': ['drop_switch_to_order_menu'], 'depends': ['first_cuisine']},
+    {'name': 'adjust_columns_order', 'function': _adjust_columns_order,
+     'inputs': ['drop_switch_to_order_menu', 'country', 'price_type', 'color_name', 'cuisines'], 'depends': ['adjust_columns_order'],
+     'cache': False},
+    {'name': 'remove_outliers', 'function': _remove_outliers, 'inputs': ['adjust_columns_order'], 'cache': False},
+    {'name': 'drop_duplicates', 'function': _drop_duplicates, 'inputs': ['remove_outliers'], 'cache': False},
+    {'name': 'reset_index', 'function': _reset_index, 'inputs': ['drop_duplicates']},
+]
+
+# Pasta do cache em disco dos resultados das etapas da limpeza:
+CLEANING_CACHE_DIR = 'dataset/cleaning_cache'
+
+
+# Função para executar a limpeza com os tempos de cada etapa:
+def run_cleaning(df, target='reset_index', cache_dir=None, fingerprint=None):
+    """ Essa função tem a responsabilidade de executar as etapas da limpeza (CLEANING_STAGES) até a etapa `target`. Com cache_dir,
+        o resultado de cada etapa é gravado em disco com a sua impressão digital (utils.pipeline), e somente as etapas cujas entradas,
+        código ou mapeamentos mudaram são executadas de novo.
+
+        Input:
+            - df: Dataframe bruto
+            - target: nome da última etapa executada
+            - cache_dir: pasta do cache em disco (ex.: CLEANING_CACHE_DIR) - None executa todas as etapas sem cache
+            - fingerprint: impressão digital do dataframe bruto já conhecida (ex.: hash do CSV, utils.storage.file_hash) - se None, é
+              calculada a partir do conteúdo do dataframe
+        Output: (Dataframe limpo, Dataframe com o estado e o tempo de cada etapa)
+    """
+    return run_pipeline(CLEANING_STAGES, {'raw': df}, target, cache_dir, {'raw': fingerprint})
+
+
+# Função para aplicar as etapas de limpeza que dependem somente de cada linha:
+def clean_rows(df):
+    """ Essa função tem a responsabilidade de aplicar as etapas de limpeza que olham uma linha de cada vez.
+        Por não dependerem das outras linhas, essas etapas podem ser aplicadas em partes (chunks) do dataset - ver utils.ingest.
+
+        Tipos de limpeza e preparação realizadas (etapas de CLEANING_STAGES até 'remove_outliers'):
+        1. Remoção de NA;
+        2. Mudança do nome das colunas substituindo espaços por _ e letras maiúsculas por minúsculas;
+        3. Remoção da coluna "switch_to_order_menu", que possui apenas um valor em todas as linhas;
+        4. Criação de uma coluna com o nome dos países e remoção da coluna com o código dos países;
+        5. Criação de uma coluna de tipo de preço;
+        6. Criação de uma coluna com o nome das cores;
+        7. Categorização dos restaurantes por somente um tipo de culinária;
+        8. Ajuste da ordem das colunas;
+        9. Remoção de outliers.
+
+        Input: Dataframe
+        Output: Dataframe
+
+    """
+    return run_cleaning(df, 'remove_outliers')[0]
+
+# Função para limpar o dataframe:
+def clean_dataframe(df, cache_dir=None, fingerprint=None):
+    """ Essa função tem a responsabilidade de limpar e preprar o dataframe.
+        
+        Tipos de limpeza e preparação realizadas (etapas de CLEANING_STAGES):
+        1. Etapas aplicadas linha a linha (clean_rows): remoção de NA, renomeação e seleção das colunas, criação das colunas de país,
+           tipo de preço e nome das cores, categorização por somente um tipo de culinária, ordem das colunas e remoção de outliers;
+        2. Eliminação de linhas duplicadas;
+        3. Reset do index.
+        OBS: A remoção de duplicadas acontece depois da remoção de outliers. Como as duas etapas são filtros por linha, o resultado é
+        o mesmo da ordem original.
+        
+        Input:
+            - df: Dataframe
+            - cache_dir: pasta do cache em disco das etapas (run_cleaning)
+            - fingerprint: impressão digital do dataframe bruto (run_cleaning)
+        Output: Dataframe
+        
+    """
+    return run_cleaning(df, 'reset_index', cache_dir, fingerprint)[0]
+
+
+# Função para criar a representação compacta do dataframe:
+def compact_dataframe(dataframe):
+    """ Essa função tem a responsabilidade de reduzir a memória ocupada pelo dataframe limpo.
+
+        Conversões realizadas:
+        1. Colunas de CATEGORICAL_COLUMNS para category (categorias sempre em ordem alfabética, mesmo vindas de um artefato gravado em chunks);
+        2. Colunas de BOOLEAN_COLUMNS para bool;
+        3. Colunas de INTEGER_COLUMNS para o menor tipo inteiro que comporta os valores.
+        As colunas float continuam float64: em float32 as notas seriam exibidas como 4.900000095367432 e as coordenadas perderiam precisão.
+
+        Input: Dataframe limpo
+        Output: Dataframe compacto
+        OBS: Agrupamentos por colunas category devem usar observed=True (para não gerar grupos vazios) seguido de .sort_index(), pois no
+        pandas 1.5 o observed=True devolve os grupos na ordem de aparição.
+    """
+    df = dataframe.copy()
+
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype('category')
+        df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories))
+
+    for col in BOOLEAN_COLUMNS:
+        df[col] = df[col].astype(bool)
+
+    for col in INTEGER_COLUMNS:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+
+    return df
+
+
+# Função para calcular a memória por linha:
+def bytes_per_row(df):
+    """ Essa função tem a responsabilidade de calcular quantos bytes o dataframe ocupa, em média, por linha (incluindo o conteúdo dos textos).
+
+        Input: Dataframe
+        Output: float
+    """
+    return df.memory_usage(index=True, deep=True).sum() / max(len(df), 1)
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    # Limpeza do CSV bruto com o cache em disco, mostrando quais etapas foram executadas e quais vieram do cache:
+    df, timings = run_cleaning(pd.read_csv('dataset/zomato.csv'), cache_dir=CLEANING_CACHE_DIR)
+
+    print(timings.to_string(index=False))
+    print(f"{len(df)} linhas, {timings['Tempo (ms)'].sum() + timings['Gravação (ms)'].sum():.1f} ms")
@@ -0,0 +1,265 @@
+""" Pirâmide de agrupamentos (clusters) dos restaurantes por nível de zoom e índice espacial dos restaurantes, usados pelo mapa
+    interativo da Visão Geral.
+
+    Em cada nível de zoom o mapa (projeção Web Mercator, a mesma do Leaflet) é dividido em uma grade de células de CELL_PIXELS pixels.
+    Cada célula guarda a quantidade de restaurantes, a soma das notas e a soma das coordenadas por país, de modo que a consulta de uma
+    região visível devolve no máximo algumas centenas de clusters, qualquer que seja o tamanho do dataset.
+"""
+#==============================================
+# Libraries
+#==============================================
+import numpy as np
+import pandas as pd
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Níveis de zoom da pirâmide (os mesmos do Leaflet) - acima de MAX_CLUSTER_ZOOM a consulta usa o último nível:
+MAX_CLUSTER_ZOOM = 16
+
+# Tamanho de cada célula da grade, em pixels da tela:
+CELL_PIXELS = 64
+
+# Tamanho do mapa do mundo no zoom 0, em pixels (tiles do Leaflet):
+TILE_PIXELS = 256
+
+# Limite de latitude da projeção Web Mercator:
+MAX_LATITUDE = 85.0511287798
+
+# Variável RATING_COLORS - Nota média mínima de cada cor, as mesmas faixas das cores de avaliação do dataset (color_name).
+RATING_COLORS = [(4.5, 'darkgreen'), (4.0, 'green'), (3.5, 'lightgreen'), (3.0, 'orange'), (2.5, 'red'), (0.0, 'darkred')]
+
+# Quantidade máxima de restaurantes enviados individualmente ao mapa em uma consulta - acima disso o mapa mostra os clusters:
+POINT_CAP = 500
+
+# Medidas aditivas de cada célula:
+CELL_MEASURES = ['restaurants', 'rating_sum', 'latitude_sum', 'longitude_sum']
+
+#==============================================
+# Funções
+#==============================================
+# Função para converter coordenadas para a projeção do mapa:
+def project(latitude, longitude):
+    """ Essa função tem a responsabilidade de converter latitude e longitude para coordenadas Web Mercator normalizadas entre 0 e 1
+        (x cresce para o leste e y para o sul, como nos tiles do Leaflet).
+
+        Input: arrays de latitude e longitude (graus)
+        Output: (x, y) arrays entre 0 e 1
+    """
+    latitude = np.radians(np.clip(latitude, -MAX_LATITUDE, MAX_LATITUDE))
+
+    x = (np.asarray(longitude) + 180) / 360
+    y = (1 - np.log(np.tan(latitude) + 1 / np.cos(latitude)) / np.pi) / 2
+
+    return np.clip(x, 0, 1 - 1e-12), np.clip(y, 0, 1 - 1e-12)
+
+
+# Função para obter a quantidade de células por eixo em um nível de zoom:
+def cells_per_axis(zoom):
+    """ Retorna a quantidade de células da grade por eixo no nível de zoom informado. """
+    return TILE_PIXELS * 2 ** zoom // CELL_PIXELS
+
+
+# Função para construir a pirâmide de clusters:
+def build_cluster_pyramid(df):
+    """ Essa função tem a responsabilidade de construir a pirâmide de clusters: no nível mais detalhado (MAX_CLUSTER_ZOOM) agrupa as
+        linhas por país e célula da grade; cada nível acima é obtido somando as células do nível de baixo (a célula (cx, cy) do zoom z
+        contém as células (2cx..2cx+1, 2cy..2cy+1) do zoom z+1), sem voltar às linhas do dataset.
+
+        Input: Dataframe limpo
+        Output: dict {zoom: Dataframe com as colunas 'country', 'cx', 'cy' e CELL_MEASURES, ordenado por 'cx' e 'cy'}
+    """
+    x, y = project(df['latitude'].to_numpy(), df['longitude'].to_numpy())
+    cells = cells_per_axis(MAX_CLUSTER_ZOOM)
+
+    level = pd.DataFrame({'country': df['country'].to_numpy(),
+                          'cx': (x * cells).astype(np.int64),
+                          'cy': (y * cells).astype(np.int64),
+                          'restaurants': 1,
+                          'rating_sum': df['aggregate_rating'].to_numpy(),
+                          'latitude_sum': df['latitude'].to_numpy(),
+                          'longitude_sum': df['longitude'].to_numpy()})
+
+    pyramid = {}
+
+    for zoom in range(MAX_CLUSTER_ZOOM, -1, -1):
+
+        level = level.groupby(['cx', 'cy', 'country'], observed=True, sort=True)[CELL_MEASURES].sum().reset_index()
+        pyramid[zoom] = level
+
+        level = level.assign(cx=level['cx'] // 2, cy=level['cy'] // 2)
+
+    return pyramid
+
+
+# Função para converter a região visível em intervalos de células:
+def view_cells(zoom, bounds, margin=1):
+    """ Essa função tem a responsabilidade de converter a região visível do mapa em intervalos de células da grade do nível de zoom,
+        com `margin` células a mais em cada lado. Trata regiões que atravessam a linha de data (longitude 180).
+
+        Input:
+            - zoom: nível de zoom da pirâmide
+            - bounds: ((lat_sul, lon_oeste), (lat_norte, lon_leste)), como o get_bounds do folium
+            - margin: células extras em cada lado
+        Output: (lista de intervalos (cx_min, cx_max), (cy_min, cy_max)), com os limites inclusivos
+    """
+    (south, west), (north, east) = bounds
+    cells = cells_per_axis(zoom)
+
+    x, y = project(np.array([north, south]), np.array([0.0, 0.0]))
+    cy = (max(int(y[0] * cells) - margin, 0), min(int(y[1] * cells) + margin, cells - 1))
+
+    if east - west >= 360:
+        return [(0, cells - 1)], cy
+
+    # Longitudes fora de -180..180 (mapa arrastado para os lados) voltam para o intervalo:
+    west, east = (west + 180) % 360 - 180, (east + 180) % 360 - 180
+
+    x, y = project(np.array([0.0, 0.0]), np.array([west, east]))
+    cx_min, cx_max = int(x[0] * cells) - margin, int(x[1] * cells) + margin
+
+    if west <= east:
+        return [(max(cx_min, 0), min(cx_max, cells - 1))], cy
+
+    return [(max(cx_min, 0), cells - 1), (0, min(cx_max, cells - 1))], cy
+
+
+# Função para arredondar a região visível para os tiles do zoom:
+def snap_bounds(zoom, bounds):
+    """ Essa função tem a responsabilidade de ampliar a região visível até as bordas dos tiles do Leaflet (TILE_PIXELS pixels) no nível
+        de zoom, para que movimentos pequenos do mapa resultem na mesma região (e na mesma chave de cache).
+
+        Input:
+            - zoom: zoom atual do mapa
+            - bounds: ((lat_sul, lon_oeste), (lat_norte, lon_leste)), como o get_bounds do folium
+        Output: ((lat_sul, lon_oeste), (lat_norte, lon_leste)) que contém a região informada
+    """
+    (south, west), (north, east) = bounds
+    tiles = 2 ** int(zoom)
+
+    if east - west >= 360:
+        west, east = -180.0, 180.0
+    else:
+        west = np.floor((west + 180) / 360 * tiles) / tiles * 360 - 180
+        east = np.ceil((east + 180) / 360 * tiles) / tiles * 360 - 180
+
+    # Latitude: arredondamento em y (Web Mercator) e volta para graus - a primeira e a última linha de tiles vão até os polos:
+    _, y = project(np.array([north, south]), np.array([0.0, 0.0]))
+    y = np.array([np.floor(y[0] * tiles), np.ceil(y[1] * tiles)]) / tiles
+    north, south = np.where([y[0] <= 0, y[1] >= 1], [90.0, -90.0], np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * y)))))
+
+    return ((float(south), float(west)), (float(north), float(east)))
+
+
+# Função para consultar os clusters da região visível:
+def clusters_in_view(pyramid, zoom, bounds, countries=None):
+    """ Essa função tem a responsabilidade de retornar os clusters da região visível no nível de zoom atual, somando os países
+        selecionados de cada célula. A busca usa a ordenação por 'cx' (np.searchsorted), sem percorrer o nível inteiro.
+
+        Input:
+            - pyramid: pirâmide de build_cluster_pyramid
+            - zoom: zoom atual do mapa (níveis acima de MAX_CLUSTER_ZOOM usam o último nível)
+            - bounds: região visível, ver view_cells
+            - countries: lista de países selecionados (None para todos)
+        Output: Dataframe com as colunas 'cx', 'cy', 'restaurants', 'rating' (nota média), 'latitude' e 'longitude' (centro dos restaurantes)
+    """
+    zoom = int(min(max(zoom, 0), MAX_CLUSTER_ZOOM))
+    level = pyramid[zoom]
+
+    cx_ranges, (cy_min, cy_max) = view_cells(zoom, bounds)
+    cx = level['cx'].to_numpy()
+
+    parts = []
+
+    for cx_min, cx_max in cx_ranges:
+        start, end = np.searchsorted(cx, [cx_min, cx_max + 1])
+        parts.append(level.iloc[start:end])
+
+    cells = pd.concat(parts)
+    cells = cells.loc[cells['cy'].between(cy_min, cy_max), :]
+
+    if countries is not None:
+        cells = cells.loc[cells['country'].isin(countries), :]
+
+    cells = cells.groupby(['cx', 'cy'], sort=True)[CELL_MEASURES].sum().reset_index()
+
+    return pd.DataFrame({'cx': cells['cx'],
+                         'cy': cells['cy'],
+                         'restaurants': cells['restaurants'],
+                         'rating': cells['rating_sum'] / cells['restaurants'],
+                         'latitude': cells['latitude_sum'] / cells['restaurants'],
+                         'longitude': cells['longitude_sum'] / cells['restaurants']})
+
+
+# Função para obter a cor de uma nota média:
+def rating_color(rating):
+    """ Essa função tem a responsabilidade de retornar a cor (RATING_COLORS) correspondente a uma nota média.
+
+        Input: nota média
+        Output: nome da cor (str)
+    """
+    return next(color for minimum, color in RATING_COLORS if rating >= minimum)
+
+
+# Função para construir o índice espacial dos restaurantes:
+def build_spatial_index(df):
+    """ Essa função tem a responsabilidade de construir o índice espacial dos restaurantes: as posições das linhas ordenadas pela
+        longitude, com a latitude na mesma ordem. Uma região visível vira uma faixa contínua de longitudes (np.searchsorted) e só
+        as linhas dessa faixa têm a latitude comparada.
+
+        Input: Dataframe limpo
+        Output: dict {'longitude', 'latitude', 'rows'} (arrays na ordem da longitude)
+    """
+    order = np.argsort(df['longitude'].to_numpy(), kind='stable')
+
+    return {'longitude': df['longitude'].to_numpy()[order],
+            'latitude': df['latitude'].to_numpy()[order],
+            'rows': order}
+
+
+# Função para consultar os restaurantes da região visível:
+def points_in_view(index, bounds, selected=None, cap=POINT_CAP):
+    """ Essa função tem a responsabilidade de retornar as posições dos restaurantes dentro da região visível, entre as linhas
+        selecionadas pelos filtros, parando em cap + 1 restaurantes.
+
+        Input:
+            - index: índice de build_spatial_index
+            - bounds: ((lat_sul, lon_oeste), (lat_norte, lon_leste)), como o get_bounds do folium
+            - selected: posições ordenadas das linhas selecionadas pelos filtros (utils.bitmaps.select_rows) ou None para todas
+            - cap: quantidade máxima de restaurantes
+        Output: np.ndarray com as posições (df.iloc). Mais de `cap` posições indica que a região tem restaurantes demais e o mapa
+        deve mostrar os clusters.
+    """
+    (south, west), (north, east) = bounds
+
+    # Uma seleção com todas as linhas (filtros sem restrição, select_rows retorna np.arange) não precisa ser consultada:
+    filtered = selected is not None and len(selected) < len(index['rows'])
+
+    # Máscara booleana das linhas selecionadas, consultada diretamente pela posição de cada linha da região:
+    if filtered:
+        mask = np.zeros(len(index['rows']), dtype=bool)
+        mask[selected] = True
+
+    if east - west >= 360:
+        ranges = [(-180.0, 180.0)]
+    else:
+        west, east = (west + 180) % 360 - 180, (east + 180) % 360 - 180
+        ranges = [(west, east)] if west <= east else [(west, 180.0), (-180.0, east)]
+
+    found = []
+
+    for start_longitude, end_longitude in ranges:
+
+        start = np.searchsorted(index['longitude'], start_longitude, side='left')
+        end = np.searchsorted(index['longitude'], end_longitude, side='right')
+
+        latitude = index['latitude'][start:end]
+        rows = index['rows'][start:end][(latitude >= south) & (latitude <= north)]
+
+        # Mantém somente as linhas selecionadas pelos filtros:
+        if filtered:
+            rows = rows[mask[rows]]
+
+        found.append(rows[:cap + 1])
+
+    return np.concatenate(found)[:cap + 1]
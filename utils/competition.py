@@ -0,0 +1,232 @@
+""" Métricas de concorrência de cada restaurante: distância até o restaurante mais próximo do mesmo tipo de culinária e quantidade de
+    restaurantes do mesmo tipo de culinária a até COMPETITION_RADIUS_KM km.
+
+    Os restaurantes são convertidos em pontos na esfera unitária (x, y, z) e agrupados em uma grade 3D por tipo de culinária: os vizinhos
+    de um ponto a até uma distância d (em corda) estão nas 27 células em volta da sua célula em uma grade de lado d. As células são
+    encontradas com uma ordenação das chaves e np.searchsorted, de modo que o custo é O(n log n) mais a quantidade de pares vizinhos,
+    sem comparar todos os pares (O(n²)). Depois de uma atualização do dataset, somente os restaurantes em volta das mudanças são
+    recalculados (update_competition_metrics).
+"""
+#==============================================
+# Libraries
+#==============================================
+import numpy as np
+import pandas as pd
+
+from utils.nearby import EARTH_RADIUS_KM
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Raio (km) usado na contagem de concorrentes:
+COMPETITION_RADIUS_KM = 1.0
+
+# Colunas adicionadas ao dataset limpo:
+COMPETITION_COLUMNS = ['nearest_competitor_km', 'competitors_1km']
+
+# Quantidade de pontos consultados por vez (limita a memória dos pares vizinhos):
+QUERY_CHUNK = 10_000
+
+# Deslocamentos das 27 células vizinhas (incluindo a própria célula):
+NEIGHBOR_OFFSETS = np.array([(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)])
+
+#==============================================
+# Funções
+#==============================================
+# Função para converter coordenadas em pontos da esfera unitária:
+def unit_vectors(latitude, longitude):
+    """ Essa função tem a responsabilidade de converter latitude e longitude em pontos (x, y, z) da esfera de raio 1, em que a distância
+        em linha reta (corda) cresce junto com a distância sobre a superfície.
+
+        Input: arrays de latitude e longitude (graus)
+        Output: np.ndarray (n, 3)
+    """
+    latitude, longitude = np.radians(latitude), np.radians(longitude)
+
+    return np.column_stack([np.cos(latitude) * np.cos(longitude), np.cos(latitude) * np.sin(longitude), np.sin(latitude)])
+
+
+# Função para converter distâncias em km para corda:
+def km_to_chord(km):
+    """ Retorna a corda (na esfera unitária) correspondente a uma distância em km sobre a superfície. """
+    return 2 * np.sin(np.minimum(km / EARTH_RADIUS_KM, np.pi) / 2)
+
+
+# Função para converter corda para distância em km:
+def chord_to_km(chord):
+    """ Retorna a distância em km sobre a superfície correspondente a uma corda (na esfera unitária). """
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord / 2, 1))
+
+
+# Função para encontrar os pares de pontos em células vizinhas:
+def neighbor_pairs(points, groups, queries, size, candidates=False):
+    """ Essa função tem a responsabilidade de gerar, em blocos de QUERY_CHUNK consultas, os candidatos do mesmo grupo em células vizinhas
+        de cada consulta em uma grade 3D de lado `size`. Todo ponto do mesmo grupo a até `size` (em corda) de uma consulta está entre os
+        candidatos dela. Os candidatos de cada consulta ficam em um trecho contínuo (para np.add.reduceat / np.minimum.reduceat) e a
+        própria consulta fica com distância infinita.
+
+        Input:
+            - points: np.ndarray (n, 3) de unit_vectors
+            - groups: códigos inteiros do grupo (tipo de culinária) de cada ponto
+            - queries: posições dos pontos consultados
+            - size: lado da célula (corda)
+            - candidates: se verdadeiro, devolve também a posição (em `points`) de cada candidato
+        Output: gerador de (posições das consultas do bloco, início do trecho de cada consulta, corda ao quadrado até cada candidato) ou,
+                com candidates, de (..., posição de cada candidato)
+    """
+    # Chave única por (grupo, célula) - a margem de 1 célula em cada eixo evita que um vizinho caia no eixo seguinte:
+    margin = int(np.ceil(1 / size)) + 1
+    base = 2 * margin + 1
+
+    cells = np.floor(points / size).astype(np.int64) + margin
+    keys = ((groups.astype(np.int64) * base + cells[:, 0]) * base + cells[:, 1]) * base + cells[:, 2]
+
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    # Coordenadas na ordem das chaves (os candidatos de uma célula ficam contíguos na memória) e posição de cada ponto nessa ordem:
+    x, y, z = (np.ascontiguousarray(points[order, axis]) for axis in range(3))
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+
+    shifts = (NEIGHBOR_OFFSETS[:, 0] * base + NEIGHBOR_OFFSETS[:, 1]) * base + NEIGHBOR_OFFSETS[:, 2]
+
+    for start in range(0, len(queries), QUERY_CHUNK):
+
+        chunk = queries[start:start + QUERY_CHUNK]
+
+        neighbor_keys = (keys[chunk][:, None] + shifts[None, :]).ravel()
+        first = np.searchsorted(sorted_keys, neighbor_keys, side='left')
+        counts = np.searchsorted(sorted_keys, neighbor_keys, side='right') - first
+
+        # Expande cada intervalo [first, first + count) de sorted_keys em posições, sem loop em Python:
+        candidate = np.repeat(first - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+
+        # Candidatos por consulta (a própria célula sempre contém a consulta, então nenhum trecho fica vazio):
+        per_query = counts.reshape(len(chunk), len(shifts)).sum(axis=1)
+        query = np.repeat(rank[chunk], per_query)
+
+        distance = (x[query] - x[candidate]) ** 2 + (y[query] - y[candidate]) ** 2 + (z[query] - z[candidate]) ** 2
+        distance[query == candidate] = np.inf
+
+        if candidates:
+            yield chunk, np.cumsum(per_query) - per_query, distance, order[candidate]
+        else:
+            yield chunk, np.cumsum(per_query) - per_query, distance
+
+
+# Função para buscar o concorrente mais próximo e os concorrentes no raio:
+def nearest_competitors(points, groups, queries):
+    """ Essa função tem a responsabilidade de calcular, para os pontos consultados, a distância até o ponto mais próximo do mesmo grupo
+        e a quantidade de pontos do mesmo grupo a até COMPETITION_RADIUS_KM km.
+
+        Etapas realizadas:
+        1. Contagem dos concorrentes e menor distância com a grade de lado COMPETITION_RADIUS_KM (neighbor_pairs);
+        2. Os pontos sem concorrente a até o lado da grade são consultados de novo em grades 4x maiores, até que todos tenham
+           um concorrente ou que a grade cubra a esfera inteira (pontos sem concorrente ficam com distância NaN).
+
+        Input:
+            - points: np.ndarray (n, 3) de unit_vectors
+            - groups: códigos inteiros do grupo (tipo de culinária) de cada ponto
+            - queries: posições dos pontos consultados
+        Output: (distância em km, quantidade de concorrentes), na ordem de queries
+    """
+    best = np.full(len(points), np.inf)
+    competitors = np.zeros(len(points), dtype=np.int32)
+
+    size = km_to_chord(COMPETITION_RADIUS_KM)
+
+    # Primeira grade - contagem dos concorrentes no raio e menor distância:
+    for chunk, starts, distance in neighbor_pairs(points, groups, queries, size):
+
+        competitors[chunk] = np.add.reduceat(distance <= size ** 2, starts)
+        best[chunk] = np.minimum.reduceat(distance, starts)
+
+    # Grades maiores somente para quem ainda não encontrou um concorrente garantido (a até `size`):
+    while True:
+
+        pending = queries[best[queries] > size ** 2]
+
+        if len(pending) == 0 or size >= 2:
+            break
+
+        size = min(size * 4, 2.0)
+
+        for chunk, starts, distance in neighbor_pairs(points, groups, pending, size):
+            best[chunk] = np.minimum(best[chunk], np.minimum.reduceat(distance, starts))
+
+    best = best[queries]
+
+    return np.where(np.isfinite(best), chord_to_km(np.sqrt(best)), np.nan), competitors[queries]
+
+
+# Função para calcular as métricas de concorrência:
+def competition_metrics(df):
+    """ Essa função tem a responsabilidade de calcular, para cada restaurante, a distância até o restaurante mais próximo do mesmo tipo
+        de culinária e a quantidade de restaurantes do mesmo tipo de culinária a até COMPETITION_RADIUS_KM km (nearest_competitors).
+
+        Input: Dataframe limpo (colunas 'latitude', 'longitude' e 'cuisines')
+        Output: Dataframe com o mesmo index do df e as colunas de COMPETITION_COLUMNS
+    """
+    points = unit_vectors(df['latitude'].to_numpy(), df['longitude'].to_numpy())
+    groups = pd.factorize(df['cuisines'])[0]
+
+    nearest, competitors = nearest_competitors(points, groups, np.arange(len(points)))
+
+    return pd.DataFrame({'nearest_competitor_km': nearest, 'competitors_1km': competitors}, index=df.index)
+
+
+# Função para atualizar as métricas de concorrência depois de uma atualização do dataset:
+def update_competition_metrics(df, previous, changed, removed):
+    """ Essa função tem a responsabilidade de atualizar as métricas de concorrência depois de restaurantes novos ou alterados
+        (utils.ingest.append_delta), recalculando somente os restaurantes que a mudança pode afetar.
+
+        Somente os tipos de culinária das linhas alteradas (versões anterior e nova) são considerados. Entre eles, são recalculados:
+        1. As linhas novas ou alteradas;
+        2. Os restaurantes a até COMPETITION_RADIUS_KM km da posição anterior ou nova de uma linha alterada - as células da grade em
+           volta das mudanças (neighbor_pairs);
+        3. Os restaurantes sem concorrente a até COMPETITION_RADIUS_KM km, cujo concorrente mais próximo pode estar longe da mudança.
+        Os demais restaurantes têm um concorrente a menos de COMPETITION_RADIUS_KM km e nenhuma mudança mais perto que ele, então
+        mantêm as métricas anteriores.
+
+        Input:
+            - df: Dataframe limpo já atualizado (colunas 'latitude', 'longitude' e 'cuisines')
+            - previous: Dataframe de competition_metrics antes da atualização, alinhado às posições de df (NaN nas linhas novas)
+            - changed: posições (df.iloc) das linhas novas ou alteradas
+            - removed: Dataframe com a versão anterior das linhas alteradas (colunas 'latitude', 'longitude' e 'cuisines')
+        Output: Dataframe com o mesmo index do df e as colunas de COMPETITION_COLUMNS, igual ao de competition_metrics(df)
+    """
+    cuisines = df['cuisines'].to_numpy()
+    touched = pd.Index(pd.unique(np.concatenate([cuisines[changed], removed['cuisines'].to_numpy()])))
+
+    subset = np.flatnonzero(touched.get_indexer(cuisines) >= 0)
+
+    # Pontos das culinárias afetadas no dataset atualizado, seguidos das posições anteriores das linhas alteradas:
+    points = unit_vectors(df['latitude'].to_numpy()[subset], df['longitude'].to_numpy()[subset])
+    groups = touched.get_indexer(cuisines[subset])
+
+    old_points = unit_vectors(removed['latitude'].to_numpy(), removed['longitude'].to_numpy())
+    old_groups = touched.get_indexer(removed['cuisines'].to_numpy())
+
+    nearest = previous['nearest_competitor_km'].to_numpy(dtype=float).copy()
+    competitors = previous['competitors_1km'].to_numpy(dtype=float).copy()
+
+    # 1 e 3 - linhas alteradas e restaurantes sem concorrente garantido no raio (margem para o arredondamento de chord_to_km):
+    changed_subset = np.searchsorted(subset, changed)
+
+    affected = ~(nearest[subset] < COMPETITION_RADIUS_KM * (1 - 1e-9))
+    affected[changed_subset] = True
+
+    # 2 - vizinhos no raio das posições nova e anterior de cada linha alterada:
+    size = km_to_chord(COMPETITION_RADIUS_KM)
+    queries = np.concatenate([changed_subset, len(subset) + np.arange(len(removed))])
+
+    for chunk, starts, distance, candidate in neighbor_pairs(np.vstack([points, old_points]), np.concatenate([groups, old_groups]),
+                                                             queries, size, candidates=True):
+        affected[candidate[(distance <= size ** 2) & (candidate < len(subset))]] = True
+
+    recalculated = np.flatnonzero(affected)
+
+    nearest[subset[recalculated]], competitors[subset[recalculated]] = nearest_competitors(points, groups, recalculated)
+
+    return pd.DataFrame({'nearest_competitor_km': nearest, 'competitors_1km': competitors.astype(np.int32)}, index=df.index)
@@ -0,0 +1,89 @@
+""" Grade de densidade dos restaurantes (quantidade e nota média por célula), usada na camada de densidade do mapa da Visão Geral.
+
+    A grade cobre a região dos restaurantes selecionados com GRID_CELLS células no lado maior, de modo que um país ou o mundo inteiro
+    chegam ao navegador como algumas centenas de células, e não como milhares de marcadores.
+"""
+#==============================================
+# Libraries
+#==============================================
+import numpy as np
+import pandas as pd
+
+from utils.lru import LRUCache
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Quantidade de células no lado maior (latitude ou longitude) da região dos restaurantes selecionados:
+GRID_CELLS = 60
+
+# Quantidade de grades (seleções de países) guardadas no processo:
+DENSITY_CACHE_SIZE = 64
+
+# Cache do processo - (versão dos dados, países selecionados) -> grade de densidade:
+_density_cache = LRUCache(DENSITY_CACHE_SIZE)
+
+#==============================================
+# Funções
+#==============================================
+# Função para agrupar os restaurantes em uma grade:
+def density_grid(df, rows, cells=GRID_CELLS):
+    """ Essa função tem a responsabilidade de agrupar os restaurantes selecionados em uma grade regular de latitude e longitude: a célula
+        de cada restaurante é calculada com uma divisão inteira das coordenadas e as medidas de cada célula com np.bincount, sem loops
+        em Python.
+
+        Input:
+            - df: Dataframe completo
+            - rows: posições das linhas selecionadas pelos filtros (utils.bitmaps.select_rows)
+            - cells: quantidade de células no lado maior da região
+        Output: Dataframe com uma linha por célula com restaurantes e as colunas 'south', 'west', 'north', 'east' (limites da célula),
+        'restaurants' e 'rating' (nota média)
+    """
+    latitude = df['latitude'].to_numpy()[rows]
+    longitude = df['longitude'].to_numpy()[rows]
+    rating = df['aggregate_rating'].to_numpy()[rows]
+
+    if len(rows) == 0:
+        return pd.DataFrame(columns=['south', 'west', 'north', 'east', 'restaurants', 'rating'])
+
+    south, west = latitude.min(), longitude.min()
+
+    # Lado da célula em graus (o mínimo evita divisão por zero quando todos os restaurantes estão no mesmo ponto):
+    size = max(latitude.max() - south, longitude.max() - west, 1e-3) / cells
+
+    cy = np.minimum(((latitude - south) / size).astype(np.int64), cells - 1)
+    cx = np.minimum(((longitude - west) / size).astype(np.int64), cells - 1)
+
+    occupied, codes = np.unique(cy * cells + cx, return_inverse=True)
+
+    restaurants = np.bincount(codes)
+    rating_sum = np.bincount(codes, weights=rating)
+
+    cy, cx = occupied // cells, occupied % cells
+
+    return pd.DataFrame({'south': south + cy * size,
+                         'west': west + cx * size,
+                         'north': south + (cy + 1) * size,
+                         'east': west + (cx + 1) * size,
+                         'restaurants': restaurants,
+                         'rating': rating_sum / restaurants})
+
+
+# Função para obter a grade de densidade com cache por seleção de países:
+def density_summary(df, rows, countries, version):
+    """ Essa função tem a responsabilidade de retornar density_grid dos países selecionados, calculando a grade somente na primeira vez
+        em que a seleção aparece. As últimas DENSITY_CACHE_SIZE seleções ficam guardadas no processo e são compartilhadas entre as sessões.
+
+        Input:
+            - df: Dataframe completo
+            - rows: posições das linhas dos países selecionados (utils.bitmaps.select_rows)
+            - countries: lista de países selecionados (a ordem não importa)
+            - version: versão dos dados (utils.loader.dataset_version), para que uma atualização dos dados invalide o cache
+        Output: Dataframe de density_grid
+        OBS: A grade é compartilhada e não deve ser alterada in-place.
+    """
+    key = (version, tuple(sorted(countries)))
+
+    grid, hit = _density_cache.get(key, lambda: density_grid(df, rows))
+
+    return grid
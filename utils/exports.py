@@ -0,0 +1,157 @@
+""" Arquivos de download dos dados tratados (CSV compactado com gzip, Parquet ou Arrow), gerados somente quando o download é pedido.
+
+    Cada arquivo é identificado pelo formato, pelos países exportados e pela versão dos dados e fica em cache no processo, compartilhado
+    entre as sessões: um novo pedido com as mesmas opções não gera o arquivo de novo, e uma atualização dos dados invalida o cache.
+    Os arquivos são escritos em blocos de linhas, sem montar o CSV inteiro em memória; Parquet e Arrow são escritos direto da tabela
+    Arrow do dataset (utils.tables), sem conversão do pandas.
+"""
+#==============================================
+# Libraries
+#==============================================
+import gzip
+import io
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.bitmaps import select_rows
+from utils.lru import LRUCache
+from utils.sections import canonical_state, record_lookup
+from utils.storage import ARTIFACT_FIELDS
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Variável EXPORT_FORMATS - Formatos de download: nome exibido -> extensão do arquivo e tipo MIME.
+EXPORT_FORMATS = {
+    'CSV (gzip)': {'extension': 'csv.gz', 'mime': 'application/gzip'},
+    'Parquet': {'extension': 'parquet', 'mime': 'application/vnd.apache.parquet'},
+    'Arrow': {'extension': 'arrow', 'mime': 'application/vnd.apache.arrow.file'},
+}
+
+# Colunas exportadas - as colunas do dataset limpo (utils.storage), sem as métricas calculadas pelo dashboard:
+EXPORT_COLUMNS = [name for name, _ in ARTIFACT_FIELDS]
+
+# Separador do CSV (o mesmo de dataset/dados_tratados.csv):
+CSV_SEPARATOR = ';'
+
+# Quantidade de linhas escritas por bloco:
+EXPORT_CHUNK_ROWS = 100_000
+
+# Quantidade máxima de arquivos guardados no processo:
+EXPORT_CACHE_SIZE = 8
+
+# Memória máxima (tamanho dos arquivos) dos arquivos guardados no processo:
+EXPORT_CACHE_BYTES = 256 * 2 ** 20
+
+# Cache do processo - (versão dos dados, formato, países) -> bytes do arquivo:
+_export_cache = LRUCache(EXPORT_CACHE_SIZE, EXPORT_CACHE_BYTES, size=len)
+
+#==============================================
+# Funções
+#==============================================
+# Função para escrever o CSV compactado:
+def _write_csv(df, rows, buffer):
+    """ Escreve as linhas `rows` do dataframe como CSV compactado com gzip, um bloco de EXPORT_CHUNK_ROWS linhas por vez. As colunas
+        booleanas são escritas como 0/1, como em dataset/dados_tratados.csv.
+    """
+    columns = df.columns.get_indexer(EXPORT_COLUMNS)
+
+    with gzip.GzipFile(fileobj=buffer, mode='wb', mtime=0) as file, io.TextIOWrapper(file, encoding='utf-8', newline='') as text:
+
+        for start in range(0, max(len(rows), 1), EXPORT_CHUNK_ROWS):
+
+            chunk = df.iloc[rows[start:start + EXPORT_CHUNK_ROWS], columns]
+            chunk = chunk.astype({column: 'int8' for column in chunk.columns if chunk[column].dtype == bool})
+
+            chunk.to_csv(text, sep=CSV_SEPARATOR, index=False, header=start == 0)
+
+    return None
+
+
+# Função para escrever o arquivo Parquet ou Arrow:
+def _write_arrow(table, rows, buffer, fmt):
+    """ Escreve as linhas `rows` da tabela Arrow em Parquet (um row group por bloco) ou no formato de arquivo Arrow (IPC), um bloco de
+        EXPORT_CHUNK_ROWS linhas por vez.
+    """
+    table = table.select(EXPORT_COLUMNS)
+
+    # Esquema sem os metadados do pandas, que descrevem as colunas do dashboard e o index:
+    schema = table.schema.remove_metadata()
+
+    if fmt == 'Parquet':
+        writer = pq.ParquetWriter(buffer, schema)
+    else:
+        writer = pa.ipc.new_file(buffer, schema)
+
+    with writer:
+
+        for start in range(0, len(rows), EXPORT_CHUNK_ROWS):
+            writer.write_table(table.take(rows[start:start + EXPORT_CHUNK_ROWS]).replace_schema_metadata(None))
+
+    return None
+
+
+# Função para gerar o arquivo de download com cache:
+def export_data(df, table, bitmaps, version, fmt, countries=None):
+    """ Essa função tem a responsabilidade de retornar os bytes do arquivo de download dos dados tratados no formato `fmt`, gerando o
+        arquivo somente na primeira vez em que a combinação (formato, países) é pedida para a versão dos dados. Os arquivos menos usados
+        recentemente saem do cache quando ele passa de EXPORT_CACHE_SIZE arquivos ou de EXPORT_CACHE_BYTES bytes.
+
+        Input:
+            - df: Dataframe limpo (load_dataset)
+            - table: tabela Arrow do dataset (load_dataset_arrow)
+            - bitmaps: índice de bitmaps dos filtros (load_dataset_bitmaps)
+            - version: versão dos dados (utils.loader.dataset_version), para que uma atualização dos dados invalide o cache
+            - fmt: formato, uma das chaves de EXPORT_FORMATS
+            - countries: países exportados - None exporta todos os restaurantes
+        Output: bytes do arquivo
+        OBS: Deve ser chamada somente quando o download for pedido - a exibição da página não precisa dos bytes.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f'Formato de download desconhecido: {fmt}')
+
+    def compute():
+        rows = np.arange(len(df)) if countries is None else select_rows(bitmaps, country=countries)
+
+        buffer = io.BytesIO()
+
+        if fmt == 'CSV (gzip)':
+            _write_csv(df, rows, buffer)
+        else:
+            _write_arrow(table, rows, buffer, fmt)
+
+        return buffer.getvalue()
+
+    data, hit = _export_cache.get((version, fmt, canonical_state({'country': countries})), compute)
+    record_lookup(hit)
+
+    return data
+
+
+# Função para obter o nome do arquivo de download:
+def export_file_name(fmt, filtered=False):
+    """ Essa função tem a responsabilidade de retornar o nome do arquivo de download no formato `fmt`.
+
+        Input:
+            - fmt: formato, uma das chaves de EXPORT_FORMATS
+            - filtered: se o arquivo contém somente os países selecionados
+        Output: nome do arquivo (str)
+    """
+    return f"data{'_filtered' if filtered else ''}.{EXPORT_FORMATS[fmt]['extension']}"
+
+
+# Função para obter os contadores do cache:
+def export_cache_stats():
+    """ Essa função tem a responsabilidade de retornar os contadores do cache de arquivos de download.
+
+        Output: dict {'hits': int, 'misses': int, 'bytes': int, 'entries': int}
+    """
+    return _export_cache.stats()
+
+
+# Função para limpar o cache:
+def clear_export_cache():
+    """ Essa função tem a responsabilidade de esvaziar o cache de arquivos de download e zerar os contadores. """
+    _export_cache.clear()
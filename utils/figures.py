@@ -0,0 +1,117 @@
+""" Cache dos gráficos do Plotly já serializados (JSON enviado ao navegador pelo st.plotly_chart), compartilhado entre as sessões.
+
+    Cada gráfico é identificado pelo nome, pelo estado dos filtros de que depende e pela versão dos dados: em uma nova execução da página
+    com os mesmos filtros, o JSON guardado é enviado de novo sem recalcular as métricas, montar o px.bar nem serializar a figura.
+
+    O envio do JSON sem passar pelo st.plotly_chart usa a API interna do Streamlit (st._main._enqueue e o proto PlotlyChart), e só
+    acontece com a versão em que essa chamada foi conferida (SUPPORTED_STREAMLIT, a mesma de requirements.txt). Com outra versão, o
+    cache guarda a própria figura, exibida pelo st.plotly_chart público (as métricas e o px.bar continuam vindo do cache).
+"""
+#==============================================
+# Libraries
+#==============================================
+import json
+
+import plotly.utils
+import streamlit as st
+
+try:
+    from streamlit.proto.PlotlyChart_pb2 import PlotlyChart as PlotlyChartProto
+except ImportError:
+    PlotlyChartProto = None
+
+from utils.lru import LRUCache
+from utils.sections import canonical_state, record_lookup
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Quantidade máxima de gráficos serializados guardados no processo:
+FIGURE_CACHE_SIZE = 256
+
+# Memória máxima (tamanho do JSON) dos gráficos serializados guardados no processo:
+FIGURE_CACHE_BYTES = 64 * 2 ** 20
+
+# Configuração enviada com cada gráfico (a mesma que o st.plotly_chart monta por padrão):
+FIGURE_CONFIG = json.dumps({'showLink': False, 'linkText': False})
+
+# Versão do Streamlit em que o envio direto do proto foi conferido:
+SUPPORTED_STREAMLIT = '1.24.1'
+
+# Indica se o gráfico serializado é enviado diretamente (proto PlotlyChart) ou pelo st.plotly_chart público:
+DIRECT_PROTO = (st.__version__ == SUPPORTED_STREAMLIT and PlotlyChartProto is not None
+                and hasattr(getattr(st, '_main', None), '_enqueue'))
+
+# Cache do processo - (versão dos dados, nome do gráfico, filtros) -> (JSON do gráfico ou figura, tamanho do JSON):
+_figure_cache = LRUCache(FIGURE_CACHE_SIZE, FIGURE_CACHE_BYTES, size=lambda entry: entry[1])
+
+#==============================================
+# Funções
+#==============================================
+# Função para obter o gráfico serializado com cache:
+def cached_figure(name, build, state, version):
+    """ Essa função tem a responsabilidade de retornar o gráfico `name` para o estado dos filtros, montando a figura com `build`
+        somente na primeira vez em que a combinação aparece. Os gráficos menos usados recentemente saem do cache quando ele passa de
+        FIGURE_CACHE_SIZE gráficos ou de FIGURE_CACHE_BYTES bytes.
+
+        Input:
+            - name: nome do gráfico (ex.: 'restaurants_per_country')
+            - build: função sem argumentos que calcula as métricas e monta a figura (chamada somente quando o gráfico não está no cache)
+            - state: dict com todos os filtros de que o gráfico depende (utils.sections.canonical_state)
+            - version: versão dos dados (utils.loader.dataset_version), para que uma atualização dos dados invalide o cache
+        Output: JSON do gráfico (str) ou, sem DIRECT_PROTO, a figura - no formato de plotly_figure
+    """
+    def compute():
+        figure = build()
+
+        # Mesma serialização do st.plotly_chart (também usada para medir o tamanho quando o cache guarda a figura):
+        spec = json.dumps(figure, cls=plotly.utils.PlotlyJSONEncoder)
+
+        return (spec if DIRECT_PROTO else figure), len(spec)
+
+    (value, size), hit = _figure_cache.get((version, name, canonical_state(state)), compute)
+    record_lookup(hit)
+
+    return value
+
+
+# Função para exibir um gráfico serializado:
+def plotly_figure(spec, use_container_width=True):
+    """ Essa função tem a responsabilidade de exibir o gráfico serializado (cached_figure) na página, como o st.plotly_chart, sem
+        converter e validar a figura de novo.
+
+        Input:
+            - spec: JSON do gráfico ou figura (cached_figure)
+            - use_container_width: ajusta a largura do gráfico à largura da coluna
+        Output: None
+        OBS: Repete o preenchimento do proto feito pelo st.plotly_chart (streamlit 1.24) com o tema 'streamlit'. Sem DIRECT_PROTO, a
+        figura guardada é exibida pelo st.plotly_chart, que a serializa de novo a cada execução.
+    """
+    if not isinstance(spec, str):
+        st.plotly_chart(spec, use_container_width=use_container_width, theme='streamlit')
+        return None
+
+    proto = PlotlyChartProto()
+    proto.use_container_width = use_container_width
+    proto.figure.spec = spec
+    proto.figure.config = FIGURE_CONFIG
+    proto.theme = 'streamlit'
+
+    st._main._enqueue('plotly_chart', proto)
+
+    return None
+
+
+# Função para obter os contadores do cache:
+def figure_cache_stats():
+    """ Essa função tem a responsabilidade de retornar os contadores do cache de gráficos serializados.
+
+        Output: dict {'hits': int, 'misses': int, 'bytes': int, 'entries': int}
+    """
+    return _figure_cache.stats()
+
+
+# Função para limpar o cache:
+def clear_figure_cache():
+    """ Essa função tem a responsabilidade de esvaziar o cache de gráficos serializados e zerar os contadores. """
+    _figure_cache.clear()
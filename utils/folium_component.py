@@ -0,0 +1,110 @@
+""" Adaptador do componente do streamlit-folium: único módulo que usa as funções internas do pacote (_component_func, _get_map_string,
+    _get_feature_group_string, _get_siblings), com as quais o mapa é renderizado uma vez e enviado ao componente a partir do cache
+    (utils.map_cache), como o st_folium faz a cada chamada.
+
+    As funções internas só são usadas com a versão do streamlit-folium em que essas chamadas foram conferidas (SUPPORTED_VERSION, a
+    mesma de requirements.txt). Com outra versão, ou se alguma delas não existir, o mapa é guardado sem renderizar e inserido com o
+    st_folium público, que renderiza o mapa a cada execução da página. Como o tamanho do mapa só seria conhecido renderizando-o, ele não
+    é guardado no cache de mapas nem no de seções ('bytes' None).
+"""
+#==============================================
+# Libraries
+#==============================================
+from importlib.metadata import PackageNotFoundError, version
+
+import streamlit_folium
+from streamlit_folium import st_folium
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Versão do streamlit-folium cujas funções internas são usadas:
+SUPPORTED_VERSION = '0.11.1'
+
+# Funções do streamlit_folium usadas pelo adaptador:
+INTERNAL_NAMES = ['_component_func', '_get_feature_group_string', '_get_map_string', '_get_siblings', 'generate_js_hash', 'get_full_id']
+
+# Versão instalada do streamlit-folium:
+try:
+    _installed_version = version('streamlit-folium')
+except PackageNotFoundError:
+    _installed_version = None
+
+# Indica se o mapa é renderizado com as funções internas (versão conferida e todas as funções de INTERNAL_NAMES presentes):
+INTERNALS = _installed_version == SUPPORTED_VERSION and all(hasattr(streamlit_folium, name) for name in INTERNAL_NAMES)
+
+#==============================================
+# Funções
+#==============================================
+# Função para renderizar um mapa para o componente:
+def render_component(folium_map, feature_group=None, key=None):
+    """ Essa função tem a responsabilidade de renderizar o mapa da mesma forma que o st_folium: o JavaScript do Leaflet, o HTML dos
+        elementos irmãos do mapa, o id do mapa, a camada adicionada dinamicamente (feature_group_to_add) e a chave do componente.
+
+        Input:
+            - folium_map: folium.Map
+            - feature_group: folium.FeatureGroup adicionado ao mapa no navegador ou None
+            - key: chave informada ao componente (ex.: 'mapa_restaurantes')
+        Output: dict {'script', 'html', 'id', 'feature_group', 'key', 'bytes'}
+        OBS: Sem as funções internas (INTERNALS falso), retorna {'map', 'feature_group', 'key', 'bytes'} com os objetos do folium, e
+        'bytes' é None (o tamanho só seria conhecido renderizando o mapa) - utils.lru.LRUCache não guarda valores de tamanho None.
+    """
+    if not INTERNALS:
+        return {'map': folium_map, 'feature_group': feature_group, 'key': key, 'bytes': None}
+
+    script = streamlit_folium._get_map_string(folium_map)
+    html = streamlit_folium._get_siblings(folium_map)
+    layer = None if feature_group is None else streamlit_folium._get_feature_group_string(feature_group, map=folium_map)
+
+    # A chave do componente é o hash do JavaScript inteiro, como no st_folium:
+    return {'script': script,
+            'html': html,
+            'id': streamlit_folium.get_full_id(folium_map),
+            'feature_group': layer,
+            'key': streamlit_folium.generate_js_hash(script, key),
+            'bytes': len(script) + len(html) + len(layer or '')}
+
+
+# Função para inserir um mapa renderizado no componente:
+def folium_component(rendered, returned_objects, width=1024, height=600):
+    """ Essa função tem a responsabilidade de inserir o mapa de render_component no componente do st_folium, com a mesma chamada que o
+        st_folium faz, ou com o próprio st_folium sem as funções internas.
+
+        Input:
+            - rendered: dict de render_component (pode ter outras chaves, como 'bounds' e 'zoom' de utils.map_cache.render_map)
+            - returned_objects: valores do mapa devolvidos à página (ex.: ['last_object_clicked_tooltip'])
+            - width, height: tamanho do mapa em pixels
+        Output: valor retornado pelo componente (dict com os returned_objects)
+    """
+    if 'map' in rendered:
+        return st_folium(rendered['map'], key=rendered['key'], width=width, height=height, returned_objects=returned_objects,
+                         feature_group_to_add=rendered['feature_group'])
+
+    return streamlit_folium._component_func(script=rendered['script'],
+                                            html=rendered['html'],
+                                            id=rendered['id'],
+                                            key=rendered['key'],
+                                            height=height,
+                                            width=width,
+                                            returned_objects=returned_objects,
+                                            default={name: rendered.get(name) for name in returned_objects},
+                                            zoom=None,
+                                            center=None,
+                                            feature_group=rendered['feature_group'])
+
+
+# Função para obter a chave com que o componente guarda o estado do mapa:
+def component_state_key(folium_map, key):
+    """ Essa função tem a responsabilidade de retornar a chave do st.session_state em que o componente guarda o último valor do mapa.
+
+        Input:
+            - folium_map: folium.Map base (sem a camada adicionada dinamicamente)
+            - key: chave informada ao componente
+        Output: chave do st.session_state (str)
+        OBS: Sem as funções internas, retorna a própria `key` - se o st_folium instalado guardar o estado com outra chave, a página lê
+        None e usa a região inicial do mapa.
+    """
+    if not INTERNALS:
+        return key
+
+    return streamlit_folium.generate_js_hash(streamlit_folium._get_map_string(folium_map), key)
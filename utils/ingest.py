@@ -0,0 +1,252 @@
+""" Ingestão do CSV bruto em partes (chunks), para datasets maiores que a memória disponível, e atualização incremental do artefato.
+
+    Construção do artefato em modo streaming (a partir da raiz do projeto):
+        python -m utils.ingest --chunksize 50000
+
+    Aplicação de um arquivo de atualização (CSV no formato do zomato.csv com restaurantes novos ou alterados):
+        python -m utils.ingest --delta novos_restaurantes.csv
+
+    Cálculo das métricas de concorrência (utils.competition) do artefato atual - etapa separada, porque precisa das coordenadas de
+    todas as linhas ao mesmo tempo (sem ela, as métricas são calculadas ao carregar o dataset):
+        python -m utils.ingest --competition
+"""
+#==============================================
+# Libraries
+#==============================================
+import argparse
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.aggregates import build_aggregates, merge_aggregates, update_aggregates
+from utils.cleaning import clean_dataframe, clean_rows, compact_dataframe
+from utils.competition import competition_metrics, update_competition_metrics
+from utils.storage import (ARTIFACT_PATH, DATASET_PATH, artifact_is_fresh, artifact_metadata, artifact_schema, build_artifact,
+                           file_hash, load_aggregates, read_competition, write_aggregates, write_artifact, write_competition)
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Quantidade padrão de linhas do CSV lidas por vez:
+CHUNKSIZE = 50_000
+
+#==============================================
+# Funções
+#==============================================
+# Função para calcular o hash de cada linha:
+def row_hashes(df):
+    """ Essa função tem a responsabilidade de calcular um hash de 64 bits para o conteúdo de cada linha (sem o index).
+        É a chave usada para encontrar linhas duplicadas entre chunks diferentes.
+
+        Input: Dataframe
+        Output: np.ndarray de uint64
+    """
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+# Função para remover as duplicadas de um chunk considerando os chunks anteriores:
+def drop_seen_duplicates(df, seen):
+    """ Essa função tem a responsabilidade de remover as linhas duplicadas de um chunk, tanto dentro do próprio chunk quanto em
+        relação às linhas já gravadas pelos chunks anteriores. Mantém a primeira ocorrência, como o drop_duplicates().
+
+        Input:
+            - df: chunk já limpo (clean_rows)
+            - seen: np.ndarray ordenado com os hashes das linhas já gravadas
+        Output: (chunk sem duplicadas, novo array ordenado de hashes)
+        OBS: O estado entre chunks é de 8 bytes por linha distinta, e não as linhas em si.
+    """
+    hashes = row_hashes(df)
+
+    keep = ~pd.Series(hashes).duplicated().to_numpy()
+
+    # Busca binária no array ordenado - só cria temporários do tamanho do chunk:
+    if len(seen):
+        position = np.minimum(np.searchsorted(seen, hashes), len(seen) - 1)
+        keep &= seen[position] != hashes
+
+    seen = np.concatenate([seen, hashes[keep]])
+    seen.sort()
+
+    return df.loc[keep, :], seen
+
+
+# Função para ler e limpar o CSV em partes:
+def iter_clean_chunks(source=DATASET_PATH, chunksize=CHUNKSIZE):
+    """ Essa função tem a responsabilidade de ler o CSV bruto em partes de `chunksize` linhas e devolver cada parte limpa,
+        sem linhas duplicadas em relação às partes anteriores.
+
+        Input:
+            - source: caminho do CSV bruto
+            - chunksize: quantidade de linhas lidas por vez
+        Output: gerador de Dataframes limpos
+    """
+    seen = np.array([], dtype=np.uint64)
+
+    for chunk in pd.read_csv(source, chunksize=chunksize):
+
+        df = clean_rows(chunk)
+
+        df, seen = drop_seen_duplicates(df, seen)
+
+        if len(df):
+            yield df
+
+
+# Função para construir o artefato em modo streaming:
+def stream_build_artifact(source=DATASET_PATH, artifact=ARTIFACT_PATH, chunksize=CHUNKSIZE):
+    """ Essa função tem a responsabilidade de gerar o artefato Parquet a partir do CSV bruto sem carregar o arquivo inteiro na memória.
+        Cada chunk limpo é gravado como um row group assim que fica pronto, com o mesmo esquema do artefato gerado em memória.
+        As métricas de concorrência não fazem parte da construção em streaming (dependem de todas as linhas): são gravadas pela etapa
+        separada update_competition (--competition).
+
+        Input:
+            - source: caminho do CSV bruto
+            - artifact: caminho do arquivo Parquet
+            - chunksize: quantidade de linhas lidas por vez
+        Output: quantidade de linhas gravadas
+    """
+    source_hash = file_hash(source)
+    schema = artifact_schema(source_hash)
+
+    tmp_path = f'{artifact}.tmp'
+    rows = 0
+    aggregates = None
+
+    with pq.ParquetWriter(tmp_path, schema) as writer:
+
+        for df in iter_clean_chunks(source, chunksize):
+
+            writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+            rows += len(df)
+
+            # Os agregados são aditivos - cada chunk soma a sua contribuição:
+            chunk_aggregates = build_aggregates(df)
+            aggregates = chunk_aggregates if aggregates is None else merge_aggregates(aggregates, chunk_aggregates)
+
+    os.replace(tmp_path, artifact)
+
+    if aggregates is not None:
+        write_aggregates(aggregates, source_hash, artifact)
+
+    return rows
+
+
+# Função para recalcular as métricas de concorrência do artefato:
+def update_competition(artifact=ARTIFACT_PATH):
+    """ Essa função tem a responsabilidade de recalcular as métricas de concorrência (utils.competition) de todas as linhas do artefato
+        e gravá-las ao lado dele com a versão atual dos dados. Lê somente as colunas usadas no cálculo.
+
+        Input: caminho do arquivo Parquet do artefato
+        Output: quantidade de linhas
+        OBS: A distância até o concorrente mais próximo depende das outras linhas, por isso as coordenadas e os tipos de culinária de
+        todas as linhas são lidos de uma vez (O(n log n)). É uma etapa separada da construção em streaming; as atualizações
+        (append_delta) recalculam somente os restaurantes em volta das mudanças.
+    """
+    df = pq.read_table(artifact, columns=['latitude', 'longitude', 'cuisines']).to_pandas()
+
+    write_competition(competition_metrics(df), artifact_metadata(artifact)['version'], artifact)
+
+    return len(df)
+
+
+# Função para aplicar restaurantes novos ou alterados ao artefato:
+def append_delta(delta, source=DATASET_PATH, artifact=ARTIFACT_PATH):
+    """ Essa função tem a responsabilidade de aplicar um arquivo de atualização ao artefato sem refazer a limpeza do dataset inteiro.
+
+        Etapas realizadas:
+        1. Limpeza somente das linhas do arquivo de atualização (se um restaurant_id aparecer mais de uma vez, vale a última linha);
+        2. Upsert por restaurant_id: restaurantes existentes são substituídos na mesma posição e os novos entram no final;
+        3. Atualização incremental da tabela de agregados (retira a versão antiga das linhas alteradas e soma as linhas novas);
+        4. Atualização das métricas de concorrência somente em volta das linhas alteradas (update_competition_metrics), se as métricas
+           da versão anterior estiverem gravadas;
+        5. Gravação do artefato, dos agregados e das métricas de concorrência com uma nova versão dos dados.
+
+        Input:
+            - delta: caminho do CSV de atualização (mesmas colunas do CSV bruto)
+            - source: caminho do CSV bruto que deu origem ao artefato
+            - artifact: caminho do arquivo Parquet
+        Output: dict {'updated': int, 'inserted': int, 'version': str}
+        OBS: As atualizações ficam somente no artefato. Se o CSV bruto mudar, o artefato é reconstruído e as atualizações precisam
+        ser aplicadas novamente.
+    """
+    source_hash = file_hash(source)
+
+    if not artifact_is_fresh(source_hash, artifact):
+        build_artifact(source, artifact)
+
+    metadata = artifact_metadata(artifact)
+    base = pq.read_table(artifact).to_pandas()
+    aggregates = load_aggregates(base, metadata['version'], artifact)
+
+    # Limpeza somente das linhas novas:
+    changes = compact_dataframe(clean_dataframe(pd.read_csv(delta)))
+    changes = changes.drop_duplicates('restaurant_id', keep='last')
+
+    # Upsert por restaurant_id, mantendo a posição dos restaurantes já existentes:
+    positions = pd.Series(range(len(base)), index=base['restaurant_id'])
+    is_update = changes['restaurant_id'].isin(positions.index).to_numpy()
+
+    change_positions = positions.reindex(changes['restaurant_id']).to_numpy()
+    change_positions[~is_update] = len(base) + np.arange((~is_update).sum())
+
+    replaced = base['restaurant_id'].isin(changes['restaurant_id']).to_numpy()
+    removed = base.loc[replaced, :]
+
+    merged = (pd.concat([base.loc[~replaced, :].assign(_position=np.flatnonzero(~replaced)),
+                         changes.assign(_position=change_positions)])
+                .sort_values('_position', kind='stable')
+                .drop(columns=['_position'])
+                .reset_index(drop=True))
+
+    # Nova versão dos dados - encadeia a versão anterior com o hash do arquivo de atualização:
+    delta_hash = file_hash(delta)
+    version = hashlib.sha256(f"{metadata['version']}:{delta_hash}".encode()).hexdigest()
+    deltas = metadata.get('deltas', []) + [delta_hash]
+
+    write_artifact(merged, source_hash, artifact, version=version, deltas=deltas)
+    write_aggregates(update_aggregates(aggregates, removed, changes), version, artifact)
+
+    # Sem as métricas da versão anterior (ex.: artefato construído em streaming), elas continuam sendo calculadas ao carregar o dataset:
+    previous = read_competition(metadata['version'], artifact)
+
+    if previous is not None:
+        previous = previous.reindex(range(len(merged)))
+        write_competition(update_competition_metrics(merged, previous, change_positions.astype(np.int64), removed), version, artifact)
+
+    return {'updated': int(is_update.sum()), 'inserted': int((~is_update).sum()), 'version': version}
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Gera o artefato Parquet lendo o CSV bruto em partes ou aplica um arquivo de atualização.')
+    parser.add_argument('--source', default=DATASET_PATH)
+    parser.add_argument('--artifact', default=ARTIFACT_PATH)
+    parser.add_argument('--chunksize', type=int, default=CHUNKSIZE)
+    parser.add_argument('--delta', help='CSV com restaurantes novos ou alterados a aplicar no artefato')
+    parser.add_argument('--competition', action='store_true', help='recalcula somente as métricas de concorrência do artefato')
+    args = parser.parse_args()
+
+    if args.competition:
+
+        rows = update_competition(args.artifact)
+
+        print(f'{args.artifact}: métricas de concorrência de {rows} linhas gravadas')
+
+    elif args.delta:
+
+        result = append_delta(args.delta, args.source, args.artifact)
+
+        print(f"{args.artifact}: {result['updated']} restaurantes atualizados, {result['inserted']} inseridos, versão {result['version'][:12]}")
+
+    else:
+
+        rows = stream_build_artifact(args.source, args.artifact, args.chunksize)
+
+        print(f'{args.artifact}: {rows} linhas gravadas em chunks de {args.chunksize}')
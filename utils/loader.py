@@ -0,0 +1,257 @@
+#==============================================
+# Libraries
+#==============================================
+import os
+import threading
+
+from utils.bitmaps import build_bitmap_index
+from utils.clusters import build_cluster_pyramid, build_spatial_index
+from utils.maps import popup_store
+from utils.ranking import build_ranking_index
+from utils.sections import record_lookup
+from utils.storage import ARTIFACT_PATH, DATASET_PATH, artifact_version, file_hash, load_aggregates, load_clean, load_competition
+from utils.tables import build_arrow_table
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Funções que constroem os índices do dataset a partir do dataframe limpo:
+INDEX_BUILDERS = {'arrow': build_arrow_table, 'bitmaps': build_bitmap_index, 'ranking': build_ranking_index,
+                  'clusters': build_cluster_pyramid, 'spatial': build_spatial_index, 'popups': popup_store}
+
+# Cache do processo - um registro por caminho de arquivo contendo a assinatura (mtime, tamanho do CSV e do artefato), o hash do CSV, a
+# versão dos dados e os artefatos já construídos dessa versão (o dataframe limpo, a tabela de agregados e os índices de INDEX_BUILDERS):
+_cache = {}
+
+# Contadores de acertos (hits) e faltas (misses) do cache:
+_stats = {'hits': 0, 'misses': 0}
+
+# Lock que protege _cache e _stats - nunca fica com quem está lendo os dados ou construindo um artefato:
+_lock = threading.Lock()
+
+#==============================================
+# Funções
+#==============================================
+# Função para calcular a assinatura dos arquivos de dados:
+def _signature(path):
+    """ Retorna (mtime, tamanho) do CSV bruto e do artefato. O artefato entra na assinatura porque as atualizações incrementais
+        (utils.ingest.append_delta) mudam os dados sem mudar o CSV.
+    """
+    signature = []
+
+    for file in (path, ARTIFACT_PATH):
+
+        try:
+            stat = os.stat(file)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+
+    return tuple(signature)
+
+
+# Função para obter o registro da versão atual dos dados:
+def _entry(path):
+    """ Retorna o registro do cache para o CSV informado. Se a assinatura mudou, a versão é calculada de novo fora do lock e, se ela
+        também mudou, um registro vazio é trocado no lugar do antigo - os artefatos da nova versão são construídos quando pedidos.
+    """
+    signature = _signature(path)
+
+    with _lock:
+        entry = _cache.get(path)
+
+    if entry is not None and entry['signature'] == signature:
+        return entry
+
+    source_hash = file_hash(path)
+    version = artifact_version(source_hash)
+
+    with _lock:
+
+        entry = _cache.get(path)
+
+        if entry is None or entry['version'] != version:
+            entry = {'version': version, 'source_hash': source_hash, 'artifacts': {}, 'locks': {}}
+            _cache[path] = entry
+
+        entry['signature'] = signature
+
+    return entry
+
+
+# Função para construir um artefato:
+def _build(path, entry, name):
+    """ Constrói o artefato `name` da versão do registro: o dataframe limpo com as métricas de concorrência (utils.competition), a
+        tabela de agregados ou um dos índices de INDEX_BUILDERS, a partir do dataframe.
+    """
+    if name == 'df':
+        df = load_clean(path, entry['source_hash'])
+        return df.assign(**load_competition(df, entry['version']))
+
+    df = _artifact(path, entry, 'df')
+
+    if name == 'aggregates':
+        return load_aggregates(df, entry['version'])
+
+    return INDEX_BUILDERS[name](df)
+
+
+# Função para obter um artefato do registro, construindo-o no primeiro pedido:
+def _artifact(path, entry, name):
+    """ Retorna o artefato `name` do registro, construído somente na primeira vez em que é pedido. A construção acontece fora de _lock,
+        com um lock por artefato: sessões que pedem o mesmo artefato esperam uma única construção, e as demais consultas não esperam.
+    """
+    with _lock:
+        hit = name in entry['artifacts']
+        lock = entry['locks'].setdefault(name, threading.Lock())
+
+    if not hit:
+
+        with lock:
+
+            # Outra sessão pode ter construído o artefato enquanto esta esperava o lock:
+            hit = name in entry['artifacts']
+
+            if not hit:
+                value = _build(path, entry, name)
+
+                with _lock:
+                    entry['artifacts'][name] = value
+
+    with _lock:
+        _stats['hits' if hit else 'misses'] += 1
+
+    record_lookup(hit=hit)
+
+    return entry['artifacts'][name]
+
+
+# Função para obter um artefato da versão atual dos dados:
+def _load(path, name):
+    """ Retorna o artefato `name` da versão atual dos dados (_entry e _artifact). """
+    return _artifact(path, _entry(path), name)
+
+
+# Função para carregar o dataset limpo compartilhado:
+def load_dataset(path=DATASET_PATH):
+    """ Essa função tem a responsabilidade de carregar o dataset limpo uma única vez por processo.
+        A leitura vem do artefato Parquet (utils.storage) e só recorre à limpeza do CSV se o artefato estiver ausente ou desatualizado.
+        Todas as sessões recebem o mesmo dataframe, que deve ser tratado como somente leitura. O cache é invalidado quando o mtime/tamanho
+        do CSV ou do artefato muda e a versão dos dados também mudou - um arquivo apenas "tocado" continua sendo servido pelo cache.
+        A tabela de agregados e os índices (load_dataset_arrow, load_dataset_bitmaps...) são construídos na primeira vez em que são
+        pedidos, e não junto com o dataframe.
+
+        Input: caminho do arquivo CSV bruto
+        Output: Dataframe limpo, com as colunas de concorrência de utils.competition (nearest_competitor_km e competitors_1km)
+        OBS: O dataframe não deve ser alterado in-place; filtros devem criar um novo dataframe (df.loc[...]).
+    """
+    return _load(path, 'df')
+
+
+# Função para carregar a tabela Arrow compartilhada:
+def load_dataset_arrow(path=DATASET_PATH):
+    """ Essa função tem a responsabilidade de retornar a tabela Arrow (utils.tables.build_arrow_table) da mesma versão do dataset de
+        load_dataset, da qual as páginas selecionam as tabelas exibidas com st.dataframe (utils.tables.table_rows).
+
+        Input: caminho do arquivo CSV bruto
+        Output: pa.Table com as linhas na mesma ordem do dataframe
+    """
+    return _load(path, 'arrow')
+
+
+# Função para carregar a tabela de agregados compartilhada:
+def load_dataset_aggregates(path=DATASET_PATH):
+    """ Essa função tem a responsabilidade de retornar a tabela de agregados (utils.aggregates) da mesma versão do dataset de load_dataset.
+
+        Input: caminho do arquivo CSV bruto
+        Output: tabela de agregados
+    """
+    return _load(path, 'aggregates')
+
+
+# Função para carregar o índice de bitmaps compartilhado:
+def load_dataset_bitmaps(path=DATASET_PATH):
+    """ Essa função tem a responsabilidade de retornar o índice de bitmaps (utils.bitmaps) da mesma versão do dataset de load_dataset,
+        usado para resolver os filtros das páginas com utils.bitmaps.select_rows.
+
+        Input: caminho do arquivo CSV bruto
+        Output: índice de bitmaps
+    """
+    return _load(path, 'bitmaps')
+
+
+# Função para carregar o índice de ranking compartilhado:
+def load_dataset_ranking(path=DATASET_PATH):
+    """ Essa função tem a responsabilidade de retornar o índice de ranking (utils.ranking) da mesma versão do dataset de load_dataset,
+        usado para encontrar os melhores restaurantes de um tipo de culinária, cidade ou país com utils.ranking.best_in_group.
+
+        Input: caminho do arquivo CSV bruto
+        Output: índice de ranking
+    """
+    return _load(path, 'ranking')
+
+
+# Função para carregar a pirâmide de clusters compartilhada:
+def load_dataset_clusters(path=DATASET_PATH):
+    """ Essa função tem a responsabilidade de retornar a pirâmide de clusters por zoom (utils.clusters) da mesma versão do dataset de
+        load_dataset, usada pelo mapa interativo da Visão Geral.
+
+        Input: caminho do arquivo CSV bruto
+        Output: pirâmide de clusters
+    """
+    return _load(path, 'clusters')
+
+
+# Função para carregar o índice espacial compartilhado:
+def load_dataset_spatial_index(path=DATASET_PATH):
+    """ Essa função tem a responsabilidade de retornar o índice espacial dos restaurantes (utils.clusters.build_spatial_index) da mesma
+        versão do dataset de load_dataset, usado para buscar os restaurantes da região visível do mapa interativo.
+
+        Input: caminho do arquivo CSV bruto
+        Output: índice espacial
+    """
+    return _load(path, 'spatial')
+
+
+# Função para carregar os detalhes dos restaurantes do mapa:
+def load_dataset_popups(path=DATASET_PATH):
+    """ Essa função tem a responsabilidade de retornar a tabela de detalhes dos restaurantes indexada pelo restaurant_id
+        (utils.maps.popup_store) da mesma versão do dataset de load_dataset, consultada quando um restaurante é clicado no mapa.
+
+        Input: caminho do arquivo CSV bruto
+        Output: Dataframe indexado por 'restaurant_id'
+    """
+    return _load(path, 'popups')
+
+
+# Função para obter a versão do dataset:
+def dataset_version(path=DATASET_PATH):
+    """ Essa função tem a responsabilidade de retornar a versão do dataset carregado: o hash do CSV ou, depois de atualizações
+        incrementais, a versão gravada no artefato.
+        Pode ser usada como parte da chave de outros caches que dependem dos dados.
+
+        Input: caminho do arquivo CSV bruto
+        Output: hash hexadecimal (str)
+    """
+    return _entry(path)['version']
+
+
+# Função para consultar os contadores do cache:
+def cache_stats():
+    """ Essa função tem a responsabilidade de retornar os contadores de hits e misses do cache do dataset.
+
+        Output: dict {'hits': int, 'misses': int}
+    """
+    with _lock:
+        return dict(_stats)
+
+
+# Função para limpar o cache:
+def clear_cache():
+    """ Essa função tem a responsabilidade de esvaziar o cache do dataset e zerar os contadores. """
+    with _lock:
+        _cache.clear()
+        _stats['hits'] = 0
+        _stats['misses'] = 0
+
+    return None
@@ -0,0 +1,78 @@
+""" Cache LRU do processo, limitado pela quantidade de entradas e, opcionalmente, pela memória, compartilhado entre as sessões.
+
+    É o cache dos módulos de utils que guardam resultados por versão dos dados e estado dos filtros (ex.: as tabelas de métricas de
+    utils.metrics). O st.cache_data e o st.cache_resource do Streamlit 1.24 só guardam valores dentro do `streamlit run` - sem o runtime
+    cada chamada recalcula -, e os benchmarks usam os mesmos módulos fora dele.
+"""
+#==============================================
+# Libraries
+#==============================================
+import threading
+from collections import OrderedDict
+
+#==============================================
+# Classes
+#==============================================
+# Classe do cache LRU limitado por quantidade e por memória:
+class LRUCache:
+    """ Cache LRU thread-safe: as entradas menos usadas recentemente saem quando o cache passa de max_entries entradas ou de max_bytes
+        bytes (a soma de `size` dos valores guardados). O valor é calculado fora do lock, de modo que uma sessão calculando um valor novo
+        não bloqueia as consultas das demais.
+
+        Input:
+            - max_entries: quantidade máxima de entradas
+            - max_bytes: memória máxima das entradas ou None para limitar somente pela quantidade
+            - size: função valor -> bytes, obrigatória com max_bytes; um valor cujo tamanho seja None (desconhecido) ou maior que
+              max_bytes não é guardado
+    """
+
+    def __init__(self, max_entries, max_bytes=None, size=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = size
+
+        # Entradas - chave -> (valor, tamanho), da usada há mais tempo para a mais recente:
+        self._entries = OrderedDict()
+        self._stats = {'hits': 0, 'misses': 0, 'bytes': 0}
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        """ Retorna (valor, hit): o valor guardado para `key` ou, se ele não estiver no cache, o resultado de compute() (função sem
+            argumentos), que é guardado se couber nos limites.
+        """
+        with self._lock:
+
+            if key in self._entries:
+                self._stats['hits'] += 1
+                self._entries.move_to_end(key)
+                return self._entries[key][0], True
+
+            self._stats['misses'] += 1
+
+        value = compute()
+        size = 0 if self.max_bytes is None else self.size(value)
+
+        if size is None or (self.max_bytes is not None and size > self.max_bytes):
+            return value, False
+
+        with self._lock:
+
+            if key not in self._entries:
+                self._entries[key] = (value, size)
+                self._stats['bytes'] += size
+
+            while len(self._entries) > self.max_entries or (self.max_bytes is not None and self._stats['bytes'] > self.max_bytes):
+                self._stats['bytes'] -= self._entries.popitem(last=False)[1][1]
+
+        return value, False
+
+    def stats(self):
+        """ Retorna os contadores do cache: dict {'hits': int, 'misses': int, 'bytes': int, 'entries': int}. """
+        with self._lock:
+            return {**self._stats, 'entries': len(self._entries)}
+
+    def clear(self):
+        """ Esvazia o cache e zera os contadores. """
+        with self._lock:
+            self._entries.clear()
+            self._stats.update(hits=0, misses=0, bytes=0)
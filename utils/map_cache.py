@@ -0,0 +1,101 @@
+""" Cache dos mapas já renderizados (JavaScript e HTML enviados ao componente do st_folium), compartilhado entre as sessões.
+
+    Montar e renderizar o folium.Map de todos os restaurantes leva de dezenas de milissegundos a segundos; com o cache, uma seleção de
+    países já vista (ex.: todos os países, somente a Índia) é enviada ao navegador sem montar o mapa de novo.
+"""
+#==============================================
+# Libraries
+#==============================================
+from utils.folium_component import folium_component, render_component
+from utils.lru import LRUCache
+from utils.sections import record_lookup
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Quantidade máxima de mapas renderizados guardados no processo:
+MAP_CACHE_SIZE = 32
+
+# Memória máxima (tamanho do JavaScript e do HTML) dos mapas renderizados guardados no processo:
+MAP_CACHE_BYTES = 256 * 2 ** 20
+
+# Cache do processo - (versão dos dados, nome do mapa, países selecionados) -> mapa renderizado, medido pelo 'bytes' de render_map:
+_map_cache = LRUCache(MAP_CACHE_SIZE, MAP_CACHE_BYTES, size=lambda rendered: rendered['bytes'])
+
+#==============================================
+# Funções
+#==============================================
+# Função para renderizar um mapa:
+def render_map(folium_map, feature_group=None, key=None):
+    """ Essa função tem a responsabilidade de renderizar o mapa da mesma forma que o st_folium (utils.folium_component.render_component)
+        e guardar junto a região e o zoom iniciais.
+
+        Input:
+            - folium_map: folium.Map
+            - feature_group: folium.FeatureGroup adicionado ao mapa no navegador ou None
+            - key: chave informada ao componente (ex.: 'mapa_restaurantes')
+        Output: dict de render_component com 'bounds' e 'zoom'
+        OBS: A chave do componente é o hash do JavaScript inteiro (como no st_folium), calculado aqui uma única vez por mapa renderizado,
+        e não a cada execução da página.
+    """
+    # A região inicial é a do mapa sem a camada, como no st_folium:
+    (south, west), (north, east) = folium_map.get_bounds()
+
+    return {**render_component(folium_map, feature_group, key),
+            'bounds': {'_southWest': {'lat': south, 'lng': west}, '_northEast': {'lat': north, 'lng': east}},
+            'zoom': folium_map.options.get('zoom')}
+
+
+# Função para obter o mapa renderizado com cache por seleção de países:
+def cached_map(build, countries, version, name='restaurants', key=None):
+    """ Essa função tem a responsabilidade de retornar o mapa renderizado (render_map) da seleção de países, montando o mapa com `build`
+        somente na primeira vez em que a seleção aparece. Os mapas menos usados recentemente saem do cache quando ele passa de
+        MAP_CACHE_SIZE mapas ou de MAP_CACHE_BYTES bytes; um mapa maior que MAP_CACHE_BYTES, ou de tamanho desconhecido (sem as
+        funções internas do streamlit-folium, utils.folium_component), não é guardado.
+
+        Input:
+            - build: função sem argumentos que monta o folium.Map ou (folium.Map, folium.FeatureGroup) - chamada somente quando a seleção
+              não está no cache
+            - countries: lista de países selecionados (a ordem não importa)
+            - version: versão dos dados (utils.loader.dataset_version), para que uma atualização dos dados invalide o cache
+            - name: identifica o mapa e os demais parâmetros de que ele depende (ex.: ('density', 'rating'), região visível)
+            - key: chave informada ao componente (render_map)
+        Output: dict de render_map
+    """
+    def compute():
+        built = build()
+        return render_map(*built, key=key) if isinstance(built, tuple) else render_map(built, key=key)
+
+    rendered, hit = _map_cache.get((version, name, key, tuple(sorted(countries))), compute)
+    record_lookup(hit)
+
+    return rendered
+
+
+# Função para inserir um mapa renderizado:
+def map_component(rendered, returned_objects, width=1024, height=600):
+    """ Essa função tem a responsabilidade de inserir o mapa renderizado no componente do st_folium, sem renderizar o folium.Map de novo.
+
+        Input:
+            - rendered: dict de render_map (com a chave do componente)
+            - returned_objects: valores do mapa devolvidos à página (ex.: ['last_object_clicked_tooltip'])
+            - width, height: tamanho do mapa em pixels
+        Output: valor retornado pelo componente (dict com os returned_objects)
+        OBS: A chamada ao componente fica em utils.folium_component, que usa o st_folium público se a versão do streamlit-folium mudar.
+    """
+    return folium_component(rendered, returned_objects, width=width, height=height)
+
+
+# Função para obter os contadores do cache:
+def map_cache_stats():
+    """ Essa função tem a responsabilidade de retornar os contadores do cache de mapas renderizados.
+
+        Output: dict {'hits': int, 'misses': int, 'bytes': int, 'entries': int}
+    """
+    return _map_cache.stats()
+
+
+# Função para limpar o cache:
+def clear_map_cache():
+    """ Essa função tem a responsabilidade de esvaziar o cache de mapas renderizados e zerar os contadores. """
+    _map_cache.clear()
@@ -0,0 +1,372 @@
+""" Mapas da localização dos restaurantes (folium). """
+#==============================================
+# Libraries
+#==============================================
+import base64
+import json
+import math
+
+import folium
+import numpy as np
+import pandas as pd
+from branca.colormap import linear
+from branca.element import CssLink, Element, JavascriptLink
+from folium.plugins import MarkerCluster
+from jinja2 import Template
+
+from utils.clusters import rating_color
+from utils.folium_component import component_state_key
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Quantidade máxima de restaurantes desenhados com um folium.Marker (e um folium.Popup) por restaurante. Acima disso o mapa usa o modo
+# de alto volume (CompactMarkerCluster), em que os pontos vão para o navegador em um único array e os marcadores são criados lá.
+MARKER_LIMIT = 1_000
+
+# Região e zoom iniciais do mapa interativo (o mundo inteiro, como o folium.Map() padrão):
+DEFAULT_VIEW = {'zoom': 1, 'bounds': ((-90.0, -180.0), (90.0, 180.0))}
+
+# Colunas enviadas ao navegador em cada marcador - os detalhes do restaurante ficam no servidor (popup_store):
+MAP_COLUMNS = ['restaurant_id', 'latitude', 'longitude', 'color_name']
+
+# Colunas dos detalhes mostrados quando um restaurante é clicado:
+POPUP_COLUMNS = ['restaurant_name', 'average_cost_for_two', 'currency', 'cuisines', 'aggregate_rating']
+
+#==============================================
+# Funções
+#==============================================
+# Função para codificar um array numérico em texto:
+def encode_array(values, dtype):
+    """ Essa função tem a responsabilidade de converter um array numérico para os bytes de `dtype` (little-endian) em base64, o formato
+        lido no navegador com os typed arrays do JavaScript (Float32Array, Int32Array, Uint16Array...).
+
+        Input:
+            - values: array ou Series numérica
+            - dtype: tipo numpy correspondente ao typed array (ex.: '<f4' para Float32Array)
+        Output: texto base64 (str)
+    """
+    return base64.b64encode(np.ascontiguousarray(values, dtype=dtype).tobytes()).decode('ascii')
+
+
+# Função para codificar uma coluna de textos repetidos:
+def encode_categories(series):
+    """ Essa função tem a responsabilidade de separar uma coluna de textos repetidos em uma lista de valores distintos e um array de
+        códigos (Uint16Array em base64), para que cada texto seja enviado ao navegador uma única vez.
+
+        Input: Series (category ou texto)
+        Output: dict {'values': lista de textos, 'codes': texto base64}
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, values = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, values = pd.factorize(series)
+
+    return {'values': [str(value) for value in values], 'codes': encode_array(codes, '<u2')}
+
+
+# Classe de um script já pronto:
+class RawScript(Element):
+    """ Elemento com um trecho de JavaScript já pronto. O texto é inserido como variável do template, sem passar pelo compilador do Jinja
+        (o Element padrão compila o próprio conteúdo como template, o que leva segundos com os arrays do modo de alto volume).
+    """
+    _template = Template('{{ this.text }}')
+
+    def __init__(self, text):
+        super().__init__()
+        self.text = text
+
+
+# Classe do modo de alto volume - os marcadores são criados no navegador a partir de arrays compactos:
+class CompactMarkerCluster(MarkerCluster):
+    """ Camada Leaflet.markercluster que recebe todos os pontos em um único objeto de arrays por coluna (typed arrays em base64 e cores
+        com dicionário) e cria os marcadores no navegador, com um ícone compartilhado por cor. No clique, o restaurant_id é ligado ao
+        marcador como tooltip invisível, o texto que o st_folium devolve em last_object_clicked_tooltip.
+        Os pontos entram no script da própria camada (o que o st_folium envia ao navegador) como variável do template, já convertidos
+        para JSON, e o script vai para a página em um RawScript.
+
+        Input: dict de compact_points
+    """
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){
+                function decode(text, type) {
+                    var raw = atob(text);
+                    var bytes = new Uint8Array(raw.length);
+                    for (var i = 0; i < raw.length; i++) { bytes[i] = raw.charCodeAt(i); }
+                    return new type(bytes.buffer);
+                }
+
+                var points = {{ this.points_json }};
+                var id = decode(points.id, points.wide_ids ? Float64Array : Int32Array);
+                var latitude = decode(points.latitude, Float32Array);
+                var longitude = decode(points.longitude, Float32Array);
+                var color = decode(points.color.codes, Uint16Array);
+
+                var icons = points.color.values.map(function (name) {
+                    return L.AwesomeMarkers.icon({icon: 'glyphicon glyphicon-cutlery', prefix: 'glyphicon', markerColor: name,
+                                                  iconColor: 'white', extraClasses: 'fa-rotate-0'});
+                });
+
+                function bindId() {
+                    if (!this.getTooltip()) { this.bindTooltip(String(this.options.restaurantId), {opacity: 0}); }
+                }
+
+                var markers = new Array(latitude.length);
+                for (var i = 0; i < latitude.length; i++) {
+                    markers[i] = L.marker([latitude[i], longitude[i]], {icon: icons[color[i]], restaurantId: id[i]})
+                                  .on('click', bindId);
+                }
+
+                var cluster = L.markerClusterGroup({{ this.options|tojson }});
+                cluster.addLayers(markers);
+                cluster.addTo({{ this._parent.get_name() }});
+                return cluster;
+            })();
+        {% endmacro %}"""
+    )
+
+    def __init__(self, points, **kwargs):
+        super().__init__(chunkedLoading=True, **kwargs)
+        self._name = 'CompactMarkerCluster'
+
+        # '<' escapado para que nenhum texto dos pontos feche a tag <script>:
+        self.points_json = json.dumps(points).replace('<', '\\u003c')
+
+    def render(self, **kwargs):
+        # Mesmo render do MarkerCluster (JSCSSMixin + MacroElement), com o script da camada em um RawScript:
+        figure = self.get_root()
+
+        for name, url in self.default_js:
+            figure.header.add_child(JavascriptLink(url), name=name)
+
+        for name, url in self.default_css:
+            figure.header.add_child(CssLink(url), name=name)
+
+        figure.script.add_child(RawScript(self._template.module.script(self, kwargs)), name=self.get_name())
+
+
+# Função para montar os arrays compactos do modo de alto volume:
+def compact_points(df_aux):
+    """ Essa função tem a responsabilidade de converter as colunas do mapa em arrays por coluna: restaurant_id e coordenadas como typed
+        arrays e cor como dicionário de textos + códigos.
+
+        Input: Dataframe com as colunas de MAP_COLUMNS
+        Output: dict usado por CompactMarkerCluster
+        OBS: O restaurant_id vai como Int32Array quando todos cabem em 32 bits e, caso contrário, como Float64Array ('wide_ids'), exato
+        até 2 ** 53 - o Int32Array truncaria os ids maiores.
+    """
+    ids = df_aux['restaurant_id'].to_numpy()
+    info = np.iinfo(np.int32)
+    wide_ids = len(ids) > 0 and (ids.min() < info.min or ids.max() > info.max)
+
+    if wide_ids and np.abs(ids).max() > 2 ** 53:
+        raise ValueError('restaurant_id acima de 2 ** 53 não pode ser enviado ao navegador sem perda de precisão')
+
+    return {'id': encode_array(ids, '<f8' if wide_ids else '<i4'),
+            'wide_ids': bool(wide_ids),
+            'latitude': encode_array(df_aux['latitude'], '<f4'),
+            'longitude': encode_array(df_aux['longitude'], '<f4'),
+            'color': encode_categories(df_aux['color_name'])}
+
+
+# Função para criar o marcador de um restaurante:
+def restaurant_marker(info):
+    """ Essa função tem a responsabilidade de criar o folium.Marker de um restaurante, com o ícone na cor da nota e o restaurant_id em um
+        tooltip invisível (devolvido pelo st_folium em last_object_clicked_tooltip quando o marcador é clicado).
+
+        Input: linha (Series) com as colunas de MAP_COLUMNS
+        Output: folium.Marker
+    """
+    return folium.Marker(location=[info['latitude'], info['longitude']],
+                         icon=folium.Icon(icon='glyphicon glyphicon-cutlery', color=info['color_name']),
+                         tooltip=folium.Tooltip(str(info['restaurant_id']), opacity=0))
+
+
+# Função para montar a tabela de detalhes dos restaurantes:
+def popup_store(df):
+    """ Essa função tem a responsabilidade de montar a tabela com os detalhes mostrados quando um restaurante é clicado no mapa
+        (POPUP_COLUMNS), indexada pelo restaurant_id. Os detalhes ficam no servidor e não são enviados com os marcadores.
+
+        Input: Dataframe limpo
+        Output: Dataframe com as colunas de POPUP_COLUMNS, indexado por 'restaurant_id'
+    """
+    return df.loc[:, ['restaurant_id'] + POPUP_COLUMNS].set_index('restaurant_id')
+
+
+# Função para consultar os detalhes de um restaurante clicado:
+def restaurant_details(store, restaurant_id):
+    """ Essa função tem a responsabilidade de retornar os detalhes do restaurante clicado no mapa.
+
+        Input:
+            - store: tabela de popup_store
+            - restaurant_id: texto devolvido pelo st_folium em last_object_clicked_tooltip (ou None)
+        Output: Series com as colunas de POPUP_COLUMNS, ou None se nenhum restaurante foi clicado (o tooltip de um cluster não é um
+        restaurant_id)
+    """
+    if not restaurant_id or not str(restaurant_id).isdigit() or int(restaurant_id) not in store.index:
+        return None
+
+    return store.loc[int(restaurant_id)]
+
+
+# Função para criar o mapa com um marcador folium por restaurante:
+def marker_map(df_aux):
+    """ Essa função tem a responsabilidade de criar o mapa com um folium.Marker (ícone na cor da nota e restaurant_id para os detalhes
+        no clique) por restaurante, agrupados com MarkerCluster.
+
+        Input: Dataframe com as colunas de MAP_COLUMNS
+        Output: folium.Map
+    """
+    folium_map = folium.Map()
+
+    marker_cluster = MarkerCluster().add_to(folium_map)
+
+    for index, info in df_aux.iterrows():
+
+        restaurant_marker(info).add_to(marker_cluster)
+
+    return folium_map
+
+
+# Função para criar o mapa no modo de alto volume:
+def fast_marker_map(df_aux):
+    """ Essa função tem a responsabilidade de criar o mapa no modo de alto volume: os pontos vão para o navegador em um único objeto de
+        arrays compactos (compact_points) e o agrupamento (Leaflet.markercluster, com chunkedLoading) acontece no navegador.
+        Mantém a cor do ícone pela nota e o restaurant_id no clique, como marker_map.
+
+        Input: Dataframe com as colunas de MAP_COLUMNS
+        Output: folium.Map
+    """
+    folium_map = folium.Map()
+
+    CompactMarkerCluster(compact_points(df_aux)).add_to(folium_map)
+
+    return folium_map
+
+
+# Função para criar o mapa dos restaurantes selecionados:
+def restaurant_map_figure(df, rows):
+    """ Essa função tem a responsabilidade de criar o mapa das linhas selecionadas, escolhendo o modo pela quantidade de restaurantes:
+        até MARKER_LIMIT um folium.Marker por restaurante (marker_map); acima disso o modo de alto volume (fast_marker_map).
+
+        Input:
+            - df: Dataframe completo
+            - rows: posições das linhas selecionadas pelos filtros (utils.bitmaps.select_rows)
+        Output: folium.Map
+    """
+    df_aux = df.iloc[rows, df.columns.get_indexer(MAP_COLUMNS)]
+
+    if len(df_aux) <= MARKER_LIMIT:
+        return marker_map(df_aux)
+
+    return fast_marker_map(df_aux)
+
+
+# Função para criar a camada de clusters do mapa interativo:
+def cluster_layer(clusters):
+    """ Essa função tem a responsabilidade de criar a camada com um círculo por cluster (utils.clusters.clusters_in_view): posição no
+        centro dos restaurantes do cluster, raio pela quantidade de restaurantes (escala logarítmica), cor pela nota média e a
+        quantidade e a nota média no tooltip.
+
+        Input: Dataframe de clusters_in_view
+        Output: folium.FeatureGroup
+    """
+    layer = folium.FeatureGroup(name='clusters')
+
+    for cluster in clusters.itertuples(index=False):
+
+        color = rating_color(cluster.rating)
+
+        folium.CircleMarker(location=[cluster.latitude, cluster.longitude],
+                            radius=6 + 4 * math.log10(cluster.restaurants),
+                            color=color, fill=True, fill_color=color, fill_opacity=0.7, weight=1,
+                            tooltip=f'{cluster.restaurants} restaurantes - nota média {cluster.rating:.1f}/5.0').add_to(layer)
+
+    return layer
+
+
+# Função para criar o mapa de densidade:
+def density_map(grid, measure):
+    """ Essa função tem a responsabilidade de criar o mapa com um retângulo por célula da grade de densidade (utils.density.density_grid),
+        com a cor pela quantidade de restaurantes (escala logarítmica, de amarelo a vermelho) ou pela nota média (as mesmas cores dos
+        clusters) e a quantidade e a nota média no tooltip. O mapa abre enquadrado na região da grade.
+
+        Input:
+            - grid: Dataframe de density_grid
+            - measure: 'restaurants' (quantidade de restaurantes) ou 'rating' (nota média)
+        Output: folium.Map
+    """
+    folium_map = folium.Map()
+
+    if grid.empty:
+        return folium_map
+
+    colormap = linear.YlOrRd_09.scale(0, max(math.log10(grid['restaurants'].max()), 1))
+
+    layer = folium.FeatureGroup(name='densidade')
+
+    for cell in grid.itertuples(index=False):
+
+        color = colormap(math.log10(cell.restaurants)) if measure == 'restaurants' else rating_color(cell.rating)
+
+        folium.Rectangle(bounds=[[cell.south, cell.west], [cell.north, cell.east]],
+                         color=color, fill=True, fill_color=color, fill_opacity=0.6, weight=0,
+                         tooltip=f'{cell.restaurants} restaurantes - nota média {cell.rating:.1f}/5.0').add_to(layer)
+
+    layer.add_to(folium_map)
+
+    folium_map.fit_bounds([[grid['south'].min(), grid['west'].min()], [grid['north'].max(), grid['east'].max()]])
+
+    return folium_map
+
+
+# Função para criar a camada com os restaurantes da região visível:
+def point_layer(df, rows):
+    """ Essa função tem a responsabilidade de criar a camada do mapa interativo com um marcador por restaurante (restaurant_marker), usada
+        quando a região visível tem poucos restaurantes (utils.clusters.points_in_view).
+
+        Input:
+            - df: Dataframe completo
+            - rows: posições das linhas na região visível
+        Output: folium.FeatureGroup
+    """
+    layer = folium.FeatureGroup(name='restaurantes')
+
+    for index, info in df.iloc[rows, df.columns.get_indexer(MAP_COLUMNS)].iterrows():
+        restaurant_marker(info).add_to(layer)
+
+    return layer
+
+
+# Função para obter a chave do componente do mapa interativo:
+def component_key(folium_map, key):
+    """ Essa função tem a responsabilidade de retornar a chave interna com que o st_folium registra o mapa no st.session_state. Com ela a
+        página lê o zoom e a região visível da última interação antes de chamar o st_folium, e monta a camada de clusters já na região
+        nova (sem uma segunda execução da página).
+
+        Input:
+            - folium_map: folium.Map base (sem a camada de clusters)
+            - key: chave informada ao st_folium
+        Output: chave do st.session_state (str)
+        OBS: A chave vem de utils.folium_component, que usa as mesmas funções do streamlit_folium que o st_folium usa para gerá-la.
+    """
+    return component_state_key(folium_map, key)
+
+
+# Função para converter o retorno do st_folium em zoom e região visível:
+def map_view(value):
+    """ Essa função tem a responsabilidade de extrair o zoom e a região visível do valor retornado pelo st_folium, usando DEFAULT_VIEW
+        antes da primeira interação.
+
+        Input: valor do componente (dict com 'zoom' e 'bounds') ou None
+        Output: dict {'zoom': int, 'bounds': ((lat_sul, lon_oeste), (lat_norte, lon_leste))}
+    """
+    if not value or not value.get('bounds') or value['bounds']['_southWest']['lat'] is None:
+        return DEFAULT_VIEW
+
+    south_west, north_east = value['bounds']['_southWest'], value['bounds']['_northEast']
+
+    return {'zoom': int(value.get('zoom') or DEFAULT_VIEW['zoom']),
+            'bounds': ((south_west['lat'], south_west['lng']), (north_east['lat'], north_east['lng']))}
@@ -0,0 +1,195 @@
+""" Tabelas de métricas das páginas do dashboard, calculadas em uma única passada sobre o cubo de agregados (utils.aggregates) ou, para
+    as métricas de concorrência (utils.competition), sobre as linhas selecionadas.
+"""
+#==============================================
+# Libraries
+#==============================================
+import numpy as np
+import pandas as pd
+
+from utils.aggregates import filter_aggregates
+from utils.lru import LRUCache
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Quantidade máxima de seleções de países guardadas no cache de country_summary:
+COUNTRY_CACHE_SIZE = 64
+
+# Cache do processo - (versão dos dados, países selecionados) -> tabela de métricas por país:
+_country_cache = LRUCache(COUNTRY_CACHE_SIZE)
+
+# Quantidade máxima de seleções de países guardadas no cache de city_summary:
+CITY_CACHE_SIZE = 64
+
+# Cache do processo - (versão dos dados, países selecionados) -> tabela de métricas por cidade:
+_city_cache = LRUCache(CITY_CACHE_SIZE)
+
+#==============================================
+# Funções
+#==============================================
+# Função para calcular a tabela de métricas por cidade:
+def city_metrics(aggregates):
+    """ Essa função tem a responsabilidade de calcular, em uma única passada pelas células do cubo, todas as métricas da Visão Cidades
+        agrupadas por 'country' e 'city'. O agrupamento usa os códigos inteiros do index do cubo (np.bincount), sem comparar textos.
+
+        Métricas calculadas:
+        1. restaurants: quantidade de restaurantes;
+        2. rating_above_4: quantidade de restaurantes com média de avaliação acima de 4;
+        3. rating_below_2_5: quantidade de restaurantes com média de avaliação abaixo de 2,5;
+        4. cuisines: quantidade de tipos culinários distintos.
+
+        Input: cubo de agregados (já filtrado)
+        Output: Dataframe com index ('country', 'city') e as colunas das métricas
+    """
+    index = aggregates.index
+    levels = dict(zip(index.names, index.levels))
+    codes = dict(zip(index.names, index.codes))
+
+    # Número do grupo (país, cidade) de cada célula, na ordem alfabética do groupby:
+    n_cities = len(levels['city'])
+    group, keys = pd.factorize(codes['country'].astype(np.int64) * n_cities + codes['city'], sort=True)
+
+    restaurants = aggregates['restaurants'].to_numpy()
+    bucket = codes['rating_bucket']
+    above_4, below_2_5 = levels['rating_bucket'].get_indexer(['> 4', '< 2.5'])
+
+    # Tipos culinários distintos - cada par (grupo, tipo culinário) é contado uma vez:
+    n_cuisines = len(levels['cuisines'])
+    cuisine_pairs = np.unique(group * n_cuisines + codes['cuisines'])
+
+    table = {'restaurants': np.bincount(group, weights=restaurants, minlength=len(keys)),
+             'rating_above_4': np.bincount(group, weights=restaurants * (bucket == above_4), minlength=len(keys)),
+             'rating_below_2_5': np.bincount(group, weights=restaurants * (bucket == below_2_5), minlength=len(keys)),
+             'cuisines': np.bincount(cuisine_pairs // n_cuisines, minlength=len(keys))}
+
+    cities = pd.MultiIndex.from_arrays([levels['country'][keys // n_cities], levels['city'][keys % n_cities]], names=['country', 'city'])
+
+    return pd.DataFrame(table, index=cities).astype('int64')
+
+
+# Função para obter a tabela de métricas por cidade de uma seleção de países:
+def city_summary(aggregates, countries, version):
+    """ Essa função tem a responsabilidade de retornar city_metrics dos países selecionados, calculando a tabela somente na primeira vez
+        em que a seleção aparece. As últimas CITY_CACHE_SIZE seleções ficam guardadas no processo e são compartilhadas entre as sessões.
+
+        Input:
+            - aggregates: cubo de agregados completo (sem filtro)
+            - countries: lista de países selecionados (a ordem não importa)
+            - version: versão dos dados (utils.loader.dataset_version), para que uma atualização dos dados invalide o cache
+        Output: Dataframe de city_metrics
+        OBS: A tabela é compartilhada e não deve ser alterada in-place.
+    """
+    key = (version, tuple(sorted(countries)))
+
+    summary, hit = _city_cache.get(key, lambda: city_metrics(filter_aggregates(aggregates, country=list(countries))))
+
+    return summary
+
+
+# Função para calcular as métricas de concorrência por cidade:
+def city_competition(df, rows):
+    """ Essa função tem a responsabilidade de calcular as métricas de concorrência (utils.competition) de cada cidade, a partir das colunas
+        de concorrência das linhas selecionadas. O agrupamento usa os códigos das colunas category (np.bincount), como city_metrics.
+
+        Métricas calculadas:
+        1. restaurants: quantidade de restaurantes;
+        2. avg_competitors_1km: média de concorrentes (mesmo tipo de culinária) a até 1 km por restaurante;
+        3. avg_nearest_competitor_km: média da distância até o concorrente mais próximo (NaN se nenhum restaurante tiver concorrente).
+
+        Input:
+            - df: Dataframe completo (com as colunas de utils.competition)
+            - rows: posições das linhas selecionadas pelos filtros (utils.bitmaps.select_rows)
+        Output: Dataframe com index ('country', 'city') e as colunas das métricas
+    """
+    country, city = df['country'], df['city']
+    n_cities = len(city.cat.categories)
+
+    group, keys = pd.factorize(country.cat.codes.to_numpy()[rows].astype(np.int64) * n_cities + city.cat.codes.to_numpy()[rows], sort=True)
+
+    competitors = df['competitors_1km'].to_numpy()[rows]
+    nearest = df['nearest_competitor_km'].to_numpy()[rows]
+    has_competitor = ~np.isnan(nearest)
+
+    restaurants = np.bincount(group, minlength=len(keys))
+
+    with np.errstate(invalid='ignore'):
+        avg_nearest = (np.bincount(group[has_competitor], weights=nearest[has_competitor], minlength=len(keys))
+                       / np.bincount(group[has_competitor], minlength=len(keys)))
+
+    cities = pd.MultiIndex.from_arrays([country.cat.categories[keys // n_cities], city.cat.categories[keys % n_cities]],
+                                       names=['country', 'city'])
+
+    return pd.DataFrame({'restaurants': restaurants,
+                         'avg_competitors_1km': np.bincount(group, weights=competitors, minlength=len(keys)) / restaurants,
+                         'avg_nearest_competitor_km': avg_nearest}, index=cities)
+
+
+# Função para selecionar as n maiores linhas de uma métrica:
+def top_n(df, column, n=10, tiebreak='city'):
+    """ Essa função tem a responsabilidade de retornar as n linhas com os maiores valores de `column`, desempatando pela ordem alfabética
+        de `tiebreak` - o mesmo resultado de sort_values([column, tiebreak], ascending=[False, True]).head(n).
+
+        A seleção é parcial (np.partition): encontra o n-ésimo maior valor sem ordenar a tabela e ordena somente as linhas que o alcançam
+        (as n primeiras e os empates com a última).
+
+        Input:
+            - df: Dataframe com a métrica (`tiebreak` pode ser coluna ou nível do index)
+            - column: coluna da métrica
+            - n: quantidade de linhas
+            - tiebreak: coluna usada para desempatar
+        Output: Dataframe com no máximo n linhas, ordenado
+    """
+    values = df[column].to_numpy()
+
+    if 0 < n < len(values):
+        threshold = np.partition(values, len(values) - n)[len(values) - n]
+        df = df.loc[values >= threshold, :]
+
+    return df.sort_values([column, tiebreak], ascending=[False, True]).head(n)
+
+
+# Função para calcular a tabela de métricas por país:
+def country_metrics(aggregates):
+    """ Essa função tem a responsabilidade de calcular, em um único agrupamento por 'country' (named aggregation), todas as métricas
+        da Visão Países.
+
+        Métricas calculadas:
+        1. restaurants: quantidade de restaurantes;
+        2. cities: quantidade de cidades distintas;
+        3. avg_votes: média de avaliações feitas por restaurante;
+        4. avg_cost_for_two: média de preço do prato para duas pessoas.
+
+        Input: cubo de agregados (já filtrado)
+        Output: Dataframe com index 'country' e as colunas das métricas
+    """
+    cells = aggregates.loc[:, ['restaurants', 'votes_sum', 'cost_sum']].assign(city=aggregates.index.get_level_values('city'))
+
+    summary = cells.groupby(level='country').agg(restaurants=('restaurants', 'sum'),
+                                                 cities=('city', 'nunique'),
+                                                 votes_sum=('votes_sum', 'sum'),
+                                                 cost_sum=('cost_sum', 'sum'))
+
+    return pd.DataFrame({'restaurants': summary['restaurants'],
+                         'cities': summary['cities'],
+                         'avg_votes': summary['votes_sum'] / summary['restaurants'],
+                         'avg_cost_for_two': summary['cost_sum'] / summary['restaurants']})
+
+
+# Função para obter a tabela de métricas por país de uma seleção de países:
+def country_summary(aggregates, countries, version):
+    """ Essa função tem a responsabilidade de retornar country_metrics dos países selecionados, calculando a tabela somente na primeira vez
+        em que a seleção aparece. As últimas COUNTRY_CACHE_SIZE seleções ficam guardadas no processo e são compartilhadas entre as sessões.
+
+        Input:
+            - aggregates: cubo de agregados completo (sem filtro)
+            - countries: lista de países selecionados (a ordem não importa)
+            - version: versão dos dados (utils.loader.dataset_version), para que uma atualização dos dados invalide o cache
+        Output: Dataframe de country_metrics
+        OBS: A tabela é compartilhada e não deve ser alterada in-place.
+    """
+    key = (version, tuple(sorted(countries)))
+
+    summary, hit = _country_cache.get(key, lambda: country_metrics(filter_aggregates(aggregates, country=list(countries))))
+
+    return summary
@@ -0,0 +1,91 @@
+""" Busca dos restaurantes próximos a um ponto (dentro de um raio), ordenados pela distância.
+
+    A busca usa o índice espacial do mapa (utils.clusters.build_spatial_index), construído uma vez por versão dos dados: o círculo vira
+    um retângulo de latitude e longitude, somente os restaurantes do retângulo têm a distância calculada (fórmula de haversine
+    vetorizada com numpy) e os que estão dentro do raio são ordenados pela distância.
+"""
+#==============================================
+# Libraries
+#==============================================
+import numpy as np
+
+from utils.clusters import points_in_view
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Raio médio da Terra em km (o mesmo da biblioteca haversine):
+EARTH_RADIUS_KM = 6371.0088
+
+#==============================================
+# Funções
+#==============================================
+# Função para calcular distâncias com a fórmula de haversine:
+def haversine_km(latitude, longitude, point_latitude, point_longitude):
+    """ Essa função tem a responsabilidade de calcular a distância (km) entre cada par de coordenadas e um ponto, com a fórmula de
+        haversine aplicada de uma vez a todos os arrays.
+
+        Input:
+            - latitude, longitude: arrays de coordenadas (graus)
+            - point_latitude, point_longitude: coordenadas do ponto (graus)
+        Output: np.ndarray de distâncias em km
+    """
+    latitude, longitude = np.radians(latitude), np.radians(longitude)
+    point_latitude, point_longitude = np.radians(point_latitude), np.radians(point_longitude)
+
+    a = (np.sin((latitude - point_latitude) / 2) ** 2
+         + np.cos(latitude) * np.cos(point_latitude) * np.sin((longitude - point_longitude) / 2) ** 2)
+
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1)))
+
+
+# Função para calcular o retângulo que contém um círculo:
+def radius_bounds(latitude, longitude, radius_km):
+    """ Essa função tem a responsabilidade de retornar o retângulo de latitude e longitude que contém o círculo de raio `radius_km` em
+        volta do ponto. Perto dos polos (ou com raios muito grandes) o retângulo cobre todas as longitudes.
+
+        Input: latitude e longitude do ponto (graus) e raio (km)
+        Output: ((lat_sul, lon_oeste), (lat_norte, lon_leste)), no formato de utils.clusters.points_in_view
+    """
+    angle = radius_km / EARTH_RADIUS_KM
+
+    south, north = latitude - np.degrees(angle), latitude + np.degrees(angle)
+
+    if south <= -90 or north >= 90 or np.sin(angle) >= np.cos(np.radians(latitude)):
+        return ((max(south, -90.0), -180.0), (min(north, 90.0), 180.0))
+
+    # Maior diferença de longitude de um ponto do círculo (nas latitudes em que o círculo é tangente aos meridianos):
+    delta_longitude = np.degrees(np.arcsin(np.sin(angle) / np.cos(np.radians(latitude))))
+
+    return ((south, longitude - delta_longitude), (north, longitude + delta_longitude))
+
+
+# Função para buscar os restaurantes próximos a um ponto:
+def restaurants_near(df, index, latitude, longitude, radius_km, selected=None, limit=None):
+    """ Essa função tem a responsabilidade de retornar os restaurantes a até `radius_km` km do ponto, do mais próximo para o mais distante.
+
+        Input:
+            - df: Dataframe completo
+            - index: índice espacial (utils.loader.load_dataset_spatial_index)
+            - latitude, longitude: coordenadas do ponto (graus)
+            - radius_km: raio da busca (km)
+            - selected: posições ordenadas das linhas selecionadas pelos filtros (utils.bitmaps.select_rows) ou None para todas
+            - limit: quantidade máxima de restaurantes retornados (None para todos) - com limite, só os mais próximos são ordenados
+        Output: (posições das linhas (df.iloc), distâncias em km), na ordem da distância
+    """
+    candidates = points_in_view(index, radius_bounds(latitude, longitude, radius_km), selected=selected, cap=len(index['rows']))
+
+    distances = haversine_km(df['latitude'].to_numpy()[candidates], df['longitude'].to_numpy()[candidates], latitude, longitude)
+
+    inside = distances <= radius_km
+    candidates, distances = candidates[inside], distances[inside]
+
+    # Seleção parcial: só os restaurantes até a `limit`-ésima menor distância (np.partition) são ordenados:
+    if limit is not None and 0 < limit < len(distances):
+        nearest = distances <= np.partition(distances, limit - 1)[limit - 1]
+        candidates, distances = candidates[nearest], distances[nearest]
+
+    # Ordem pela distância (empates pela posição da linha):
+    order = np.lexsort((candidates, distances))[:limit]
+
+    return candidates[order], distances[order]
@@ -0,0 +1,171 @@
+""" Execução de um DAG de etapas nomeadas com cache em disco por etapa (usado pela limpeza dos dados, utils.cleaning).
+
+    Cada etapa é um dict {'name', 'function', 'inputs', 'depends', 'cache'}: a função recebe os resultados das etapas de 'inputs' (ou as
+    entradas do DAG) e retorna um dataframe; 'depends' lista as variáveis globais do módulo da função (mapeamentos como COUNTRIES e
+    funções auxiliares como country_name) de que o resultado depende; 'cache' (padrão True) indica se o resultado é gravado em disco -
+    etapas mais rápidas de executar do que de gravar e ler (filtros e seleções de colunas) são sempre executadas.
+
+    Os resultados são gravados no formato de arquivo Arrow (Feather) sem compressão, que é lido e gravado bem mais rápido que o Parquet.
+
+    A impressão digital (fingerprint) de uma etapa combina o código da função, o conteúdo de cada dependência e as impressões digitais
+    das entradas, então é calculada sem executar nada. Ao mudar uma entrada ou um mapeamento, mudam somente as impressões digitais da
+    etapa afetada e das etapas abaixo dela: as demais são lidas do cache (e somente se algum resultado abaixo delas precisar ser
+    recalculado).
+"""
+#==============================================
+# Libraries
+#==============================================
+import glob
+import hashlib
+import inspect
+import json
+import os
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+#==============================================
+# Funções
+#==============================================
+# Função para calcular a impressão digital de um dataframe:
+def frame_fingerprint(df):
+    """ Essa função tem a responsabilidade de calcular a impressão digital do conteúdo de um dataframe (valores, index, nomes e tipos das
+        colunas), usada para as entradas do DAG.
+
+        Input: Dataframe
+        Output: hash hexadecimal (str)
+    """
+    sha = hashlib.sha256()
+
+    sha.update(json.dumps([list(map(str, df.columns)), list(map(str, df.dtypes))]).encode())
+    sha.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+
+    return sha.hexdigest()
+
+
+# Função para obter o conteúdo de uma dependência:
+def _dependency_source(value):
+    """ Retorna o texto que representa a dependência na impressão digital: o código, para funções, ou o conteúdo, para os dados. """
+    if callable(value):
+        return inspect.getsource(value)
+
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+# Função para calcular as impressões digitais das etapas:
+def stage_fingerprints(stages, sources):
+    """ Essa função tem a responsabilidade de calcular a impressão digital de cada etapa do DAG, sem executar nenhuma etapa.
+
+        Input:
+            - stages: lista de etapas, cada uma depois das etapas de que depende
+            - sources: dict nome da entrada do DAG -> impressão digital (frame_fingerprint)
+        Output: dict nome da etapa -> impressão digital (str)
+    """
+    fingerprints = dict(sources)
+
+    for stage in stages:
+
+        sha = hashlib.sha256()
+
+        sha.update(stage['name'].encode())
+        sha.update(inspect.getsource(stage['function']).encode())
+
+        for name in stage.get('depends', []):
+            sha.update(name.encode())
+            sha.update(_dependency_source(stage['function'].__globals__[name]).encode())
+
+        for name in stage['inputs']:
+            sha.update(fingerprints[name].encode())
+
+        fingerprints[stage['name']] = sha.hexdigest()
+
+    return fingerprints
+
+
+# Função para obter o caminho do resultado de uma etapa no cache:
+def _stage_path(cache_dir, name, fingerprint):
+    """ Retorna o caminho do arquivo Feather com o resultado da etapa para a impressão digital informada. """
+    return os.path.join(cache_dir, f'{name}-{fingerprint[:20]}.feather')
+
+
+# Função para gravar o resultado de uma etapa no cache:
+def _write_stage(cache_dir, name, fingerprint, df):
+    """ Grava o resultado da etapa (com o index) e remove os resultados anteriores da mesma etapa, de modo que o cache guarda um
+        arquivo por etapa. Grava em um arquivo temporário e o renomeia, para que nenhuma leitura encontre um arquivo pela metade.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+
+    path = _stage_path(cache_dir, name, fingerprint)
+
+    feather.write_feather(pa.Table.from_pandas(df, preserve_index=True), f'{path}.tmp', compression='uncompressed')
+    os.replace(f'{path}.tmp', path)
+
+    for old in glob.glob(os.path.join(cache_dir, f'{name}-*.feather')):
+
+        if old != path:
+            os.remove(old)
+
+    return None
+
+
+# Função para executar o DAG:
+def run_pipeline(stages, sources, target, cache_dir=None, source_fingerprints=None):
+    """ Essa função tem a responsabilidade de calcular o resultado da etapa `target`, executando somente as etapas necessárias: uma
+        etapa cujo resultado está no cache (mesma impressão digital) é lida do disco, e as etapas acima dela não são visitadas.
+
+        Input:
+            - stages: lista de etapas, cada uma depois das etapas de que depende
+            - sources: dict nome da entrada do DAG -> Dataframe
+            - target: nome da etapa cujo resultado é retornado
+            - cache_dir: pasta do cache em disco - None executa todas as etapas necessárias sem ler nem gravar o cache
+            - source_fingerprints: dict nome da entrada -> impressão digital já conhecida (ex.: hash do arquivo lido), para não calcular
+              frame_fingerprint sobre o dataframe
+        Output: (Dataframe da etapa target, Dataframe com as colunas 'Etapa', 'Estado' ('executada' ou 'cache'), 'Tempo (ms)' (execução
+                 ou leitura do cache) e 'Gravação (ms)' (gravação no cache), na ordem em que as etapas foram resolvidas)
+        OBS: As funções das etapas não devem alterar os dataframes de entrada in-place - o mesmo resultado pode alimentar várias etapas.
+    """
+    by_name = {stage['name']: stage for stage in stages}
+
+    # Sem cache, as impressões digitais não são usadas:
+    if cache_dir is not None:
+        known = source_fingerprints or {}
+        fingerprints = stage_fingerprints(stages, {name: known.get(name) or frame_fingerprint(df) for name, df in sources.items()})
+
+    results = dict(sources)
+    timings = []
+
+    def resolve(name):
+
+        if name in results:
+            return results[name]
+
+        start = time.perf_counter()
+        path = None if cache_dir is None or not by_name[name].get('cache', True) else _stage_path(cache_dir, name, fingerprints[name])
+        write = 0.0
+
+        if path is not None and os.path.exists(path):
+            results[name] = feather.read_table(path).to_pandas()
+            state = 'cache'
+        else:
+            inputs = [resolve(input_name) for input_name in by_name[name]['inputs']]
+
+            # O tempo da etapa não inclui o das entradas:
+            start = time.perf_counter()
+            results[name] = by_name[name]['function'](*inputs)
+            state = 'executada'
+
+            if path is not None:
+                write = time.perf_counter()
+                _write_stage(cache_dir, name, fingerprints[name], results[name])
+                write = time.perf_counter() - write
+
+        timings.append({'Etapa': name, 'Estado': state, 'Tempo (ms)': round((time.perf_counter() - start - write) * 1000, 1),
+                        'Gravação (ms)': round(write * 1000, 1)})
+
+        return results[name]
+
+    df = resolve(target)
+
+    return df, pd.DataFrame(timings, columns=['Etapa', 'Estado', 'Tempo (ms)', 'Gravação (ms)'])
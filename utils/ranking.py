@@ -0,0 +1,125 @@
+""" Índice de ranking do dataset limpo: para cada valor das colunas de RANKING_COLUMNS, as posições dos restaurantes na ordem da média
+    de avaliação (maior primeiro, empates pelo menor restaurant_id). Os N melhores restaurantes de qualquer grupo são lidos com uma
+    fatia do índice, em O(N), sem filtrar nem ordenar o dataframe.
+
+    O ranking de uma combinação de filtros (ranked_rows) é a ordem do dataset inteiro restrita às linhas selecionadas - O(n), sem
+    comparar linhas - e fica em cache por estado dos filtros, para que as páginas da tabela sejam apenas fatias dele.
+"""
+#==============================================
+# Libraries
+#==============================================
+import numpy as np
+import pandas as pd
+
+from utils.bitmaps import select_rows
+from utils.lru import LRUCache
+from utils.sections import canonical_state, record_lookup
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Variável RANKING_COLUMNS - Colunas com um ranking por valor.
+RANKING_COLUMNS = ['cuisines', 'city', 'country']
+
+# Quantidade máxima de rankings de combinações de filtros guardados no cache de ranked_rows:
+RANKED_CACHE_SIZE = 16
+
+# Cache do processo - (versão dos dados, filtros) -> posições das linhas selecionadas na ordem do ranking:
+_ranked_cache = LRUCache(RANKED_CACHE_SIZE)
+
+#==============================================
+# Funções
+#==============================================
+# Função para ordenar as linhas pela média de avaliação:
+def rating_order(df):
+    """ Essa função tem a responsabilidade de retornar as posições (df.iloc) das linhas na ordem do ranking das páginas: maior
+        'aggregate_rating' primeiro e, nos empates, menor 'restaurant_id' (a mesma ordem de
+        sort_values(['aggregate_rating', 'restaurant_id'], ascending=[False, True])).
+
+        Input: Dataframe limpo
+        Output: np.ndarray de posições
+    """
+    return np.lexsort((df['restaurant_id'].to_numpy(), -df['aggregate_rating'].to_numpy()))
+
+
+# Função para construir o índice de ranking:
+def build_ranking_index(df):
+    """ Essa função tem a responsabilidade de construir, para cada coluna de RANKING_COLUMNS, as posições das linhas agrupadas por valor
+        e, dentro de cada valor, na ordem de rating_order. Usa uma única ordenação do dataset e uma ordenação estável por coluna.
+
+        Input: Dataframe limpo
+        Output: dict {'rows': quantidade de linhas, 'order': posições de todas as linhas na ordem de rating_order,
+                coluna: {'values': pd.Index dos valores, 'ranked': posições, 'bounds': início do trecho de cada valor em 'ranked' (mais o
+                fim do último)}}
+        OBS: As posições correspondem a df.iloc, e não ao rótulo do index.
+    """
+    order = rating_order(df)
+
+    ranking = {'rows': len(df), 'order': order}
+
+    for column in RANKING_COLUMNS:
+
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            codes, values = df[column].cat.codes.to_numpy(), df[column].cat.categories
+        else:
+            codes, values = pd.factorize(df[column])
+
+        # A ordenação estável pelo valor mantém a ordem do ranking dentro de cada valor:
+        ranked = order[np.argsort(codes[order], kind='stable')]
+        bounds = np.searchsorted(codes[ranked], np.arange(len(values) + 1))
+
+        ranking[column] = {'values': pd.Index(values), 'ranked': ranked, 'bounds': bounds}
+
+    return ranking
+
+
+# Função para obter os melhores restaurantes de um grupo:
+def best_in_group(ranking, column, value, n=1):
+    """ Essa função tem a responsabilidade de retornar as posições dos n melhores restaurantes de um valor de uma coluna (ex.: os 10
+        melhores restaurantes de culinária 'Italian'), na ordem de rating_order.
+
+        Input:
+            - ranking: índice de build_ranking_index
+            - column: coluna de RANKING_COLUMNS
+            - value: valor da coluna
+            - n: quantidade de restaurantes
+        Output: np.ndarray com até n posições (df.iloc) - vazio se o valor não existir no dataset
+    """
+    index = ranking[column]
+
+    if value not in index['values']:
+        return index['ranked'][:0]
+
+    code = index['values'].get_loc(value)
+    start, end = index['bounds'][code], index['bounds'][code + 1]
+
+    return index['ranked'][start:min(start + n, end)]
+
+
+# Função para obter o ranking das linhas selecionadas pelos filtros:
+def ranked_rows(ranking, bitmaps, version, **selections):
+    """ Essa função tem a responsabilidade de retornar as posições das linhas selecionadas pelos filtros na ordem de rating_order. A ordem
+        do dataset inteiro já está no índice, então basta manter as posições selecionadas (sem ordenar). O resultado fica em cache por
+        estado dos filtros: as próximas páginas da tabela são fatias do mesmo array. As últimas RANKED_CACHE_SIZE combinações ficam
+        guardadas no processo e são compartilhadas entre as sessões.
+
+        Input:
+            - ranking: índice de build_ranking_index
+            - bitmaps: índice de bitmaps do dataset (utils.bitmaps)
+            - version: versão dos dados (utils.loader.dataset_version), para que uma atualização dos dados invalide o cache
+            - selections: filtros no formato de utils.bitmaps.select_rows (ex.: country=['India'], cuisines=['Italian'])
+        Output: np.ndarray (int32) de posições (df.iloc)
+        OBS: O array é compartilhado e não deve ser alterado in-place.
+    """
+    def compute():
+        selected = np.zeros(ranking['rows'], dtype=bool)
+        selected[select_rows(bitmaps, **selections)] = True
+
+        order = ranking['order']
+
+        return order[selected[order]].astype(np.int32)
+
+    ranked, hit = _ranked_cache.get((version, canonical_state(selections)), compute)
+    record_lookup(hit)
+
+    return ranked
@@ -0,0 +1,234 @@
+""" Seções das páginas do dashboard: blocos cujo cálculo só é refeito quando as entradas de que dependem mudam.
+
+    O Streamlit (1.24) executa a página inteira a cada interação, e os elementos de cada seção precisam ser enviados de novo em toda
+    execução - as seções são memoizadas, e não puladas: o corpo de cada uma executa em todo rerun. O que é reaproveitado é o cálculo,
+    guardado no processo (cached_section e os caches de utils.figures e utils.map_cache) e identificado pelo nome, pelas entradas
+    (widgets e filtros) de que ele depende e pela versão dos dados: quando um widget muda, somente os cálculos que dependem dele são
+    refeitos; as demais seções só exibem de novo o resultado guardado. O tempo de cada seção e se o seu cálculo foi refeito ou
+    reaproveitado ficam registrados por execução da página e só são exibidos para quem os pede (show_section_timings).
+"""
+#==============================================
+# Libraries
+#==============================================
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+
+from utils.lru import LRUCache
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Quantidade máxima de resultados de seções guardados no processo:
+SECTION_CACHE_SIZE = 256
+
+# Variável de ambiente que exibe a tabela de tempos das seções em todas as páginas (ex.: SHOW_SECTION_TIMINGS=1):
+TIMINGS_ENV = 'SHOW_SECTION_TIMINGS'
+
+# Parâmetro da URL que exibe a tabela de tempos das seções na página aberta (ex.: ?timings=1):
+TIMINGS_PARAM = 'timings'
+
+# Memória máxima (result_bytes) dos resultados de seções guardados no processo:
+SECTION_CACHE_BYTES = 128 * 2 ** 20
+
+# Cache do processo - (versão dos dados, nome da seção, entradas) -> resultado, medido por result_bytes (definida abaixo):
+_section_cache = LRUCache(SECTION_CACHE_SIZE, SECTION_CACHE_BYTES, size=lambda result: result_bytes(result))
+
+# Registro da execução atual da página (o Streamlit executa cada rerun de cada sessão em uma thread própria):
+_run = threading.local()
+
+#==============================================
+# Funções
+#==============================================
+# Função para obter a forma canônica do estado dos filtros:
+def canonical_state(state):
+    """ Essa função tem a responsabilidade de transformar o estado dos filtros em uma chave de cache que não depende da ordem das chaves
+        nem da ordem dos itens selecionados (ex.: ['India', 'Brazil'] e ['Brazil', 'India'] geram a mesma chave).
+
+        Input: dict {nome do filtro: valor}, em que o valor é um escalar ou uma lista de itens selecionados
+        Output: tuple ordenada de (nome do filtro, valor)
+    """
+    return tuple(sorted((name, tuple(sorted(map(str, value))) if isinstance(value, (list, tuple, set)) else value)
+                        for name, value in state.items()))
+
+
+# Função para iniciar o registro de uma execução da página:
+def start_sections():
+    """ Essa função tem a responsabilidade de esvaziar o registro de tempos das seções no início de cada execução da página. """
+    _run.timings = []
+    _run.current = None
+
+    return None
+
+
+# Função para registrar uma consulta a um cache dentro da seção atual:
+def record_lookup(hit):
+    """ Essa função tem a responsabilidade de registrar, na seção em execução, uma consulta a um dos caches das seções (cached_section,
+        utils.figures.cached_figure, utils.map_cache.cached_map). Fora de uma seção a consulta não é registrada.
+
+        Input: hit (True se o resultado veio do cache)
+        Output: None
+    """
+    entry = getattr(_run, 'current', None)
+
+    if entry is not None:
+        entry['lookups'] += 1
+        entry['misses'] += not hit
+
+    return None
+
+
+# Função para medir uma seção da página:
+@contextmanager
+def section(name):
+    """ Essa função tem a responsabilidade de medir o tempo do bloco `with section(name):` e registrar se o cálculo da seção foi refeito:
+        ela é considerada reaproveitada quando todas as suas consultas a um cache vieram do cache, e sem cache quando não fez nenhuma
+        (ex.: uma seção que só lê o índice de ranking). O bloco sempre executa.
+
+        Input: nome da seção exibido na tabela de tempos
+        Output: gerenciador de contexto
+    """
+    if getattr(_run, 'timings', None) is None:
+        start_sections()
+
+    entry = {'section': name, 'lookups': 0, 'misses': 0}
+    previous, _run.current = _run.current, entry
+
+    start = time.perf_counter()
+
+    try:
+        yield entry
+    finally:
+        entry['ms'] = (time.perf_counter() - start) * 1000
+        _run.current = previous
+        _run.timings.append(entry)
+
+
+# Função para estimar a memória de um resultado:
+def result_bytes(result):
+    """ Essa função tem a responsabilidade de estimar a memória ocupada pelo resultado de uma seção: mapas renderizados
+        (utils.map_cache.render_map) pelo tamanho do JavaScript e do HTML, dataframes pelo memory_usage, arrays do numpy e tabelas Arrow
+        pelo nbytes, textos pelo tamanho e listas, tuplas e dicts pela soma dos itens.
+
+        Input: resultado de uma seção
+        Output: bytes (int) ou None, se o tamanho de alguma parte for desconhecido (mapa com 'bytes' None)
+    """
+    if isinstance(result, dict) and 'bytes' in result:
+        return result['bytes']
+
+    # O memory_usage de um dataframe tem uma linha por coluna; o de uma Series já é o total:
+    if isinstance(result, pd.DataFrame):
+        return int(result.memory_usage(deep=True).sum())
+
+    if isinstance(result, pd.Series):
+        return int(result.memory_usage(deep=True))
+
+    if hasattr(result, 'nbytes'):
+        return int(result.nbytes)
+
+    if isinstance(result, (str, bytes)):
+        return len(result)
+
+    if isinstance(result, (list, tuple, dict)):
+        sizes = [result_bytes(item) for item in (result.values() if isinstance(result, dict) else result)]
+        return None if None in sizes else sum(sizes)
+
+    return sys.getsizeof(result)
+
+
+# Função para obter o resultado de uma seção com cache:
+def cached_section(name, compute, inputs, version):
+    """ Essa função tem a responsabilidade de retornar o resultado da seção `name` para as entradas, calculando com `compute` somente
+        na primeira vez em que a combinação aparece. Os resultados menos usados recentemente saem do cache quando ele passa de
+        SECTION_CACHE_SIZE resultados ou de SECTION_CACHE_BYTES bytes (result_bytes); um resultado maior que SECTION_CACHE_BYTES, ou de
+        tamanho desconhecido, não é guardado.
+
+        Input:
+            - name: nome da seção (ex.: 'top_restaurantes')
+            - compute: função sem argumentos que calcula o resultado (chamada somente quando ele não está no cache)
+            - inputs: dict com todas as entradas (widgets e filtros) de que o resultado depende (canonical_state)
+            - version: versão dos dados (utils.loader.dataset_version), para que uma atualização dos dados invalide o cache
+        Output: resultado de compute
+        OBS: O resultado é compartilhado entre as sessões e não deve ser alterado in-place.
+    """
+    result, hit = _section_cache.get((version, name, canonical_state(inputs)), compute)
+    record_lookup(hit)
+
+    return result
+
+
+# Função para obter o estado de uma seção:
+def section_state(entry):
+    """ Essa função tem a responsabilidade de classificar uma seção medida (section) pelas suas consultas aos caches.
+
+        Input: registro da seção
+        Output: 'recalculada' (alguma consulta calculou o resultado), 'reaproveitada' (todas vieram do cache) ou 'sem cache' (nenhuma
+        consulta)
+    """
+    if not entry['lookups']:
+        return 'sem cache'
+
+    return 'recalculada' if entry['misses'] else 'reaproveitada'
+
+
+# Função para obter os tempos das seções da execução atual:
+def section_timings():
+    """ Essa função tem a responsabilidade de retornar a tabela de tempos das seções medidas na execução atual da página.
+
+        Output: Dataframe com as colunas 'Seção', 'Estado' ('recalculada', 'reaproveitada' ou 'sem cache') e 'Tempo (ms)'
+    """
+    timings = getattr(_run, 'timings', None) or []
+
+    return pd.DataFrame({'Seção': [entry['section'] for entry in timings],
+                         'Estado': [section_state(entry) for entry in timings],
+                         'Tempo (ms)': [round(entry['ms'], 1) for entry in timings]})
+
+
+# Função para verificar se os tempos das seções devem ser exibidos:
+def timings_enabled():
+    """ Essa função tem a responsabilidade de verificar se a tabela de tempos das seções foi pedida: pela variável de ambiente
+        TIMINGS_ENV ou pelo parâmetro TIMINGS_PARAM da URL da página.
+
+        Output: bool
+    """
+    if os.environ.get(TIMINGS_ENV, '') not in ('', '0'):
+        return True
+
+    return st.experimental_get_query_params().get(TIMINGS_PARAM, ['0'])[0] not in ('', '0')
+
+
+# Função para exibir os tempos das seções:
+def show_section_timings():
+    """ Essa função tem a responsabilidade de exibir, na barra lateral, a tabela de tempos das seções da execução atual (section_timings),
+        somente quando ela foi pedida (timings_enabled) - é uma ferramenta de diagnóstico, e não parte do dashboard.
+
+        Output: None
+    """
+    if not timings_enabled():
+        return None
+
+    with st.sidebar.expander('Tempo por seção'):
+
+        st.dataframe(section_timings(), use_container_width=True, hide_index=True)
+
+    return None
+
+
+# Função para obter os contadores do cache:
+def section_cache_stats():
+    """ Essa função tem a responsabilidade de retornar os contadores do cache de seções.
+
+        Output: dict {'hits': int, 'misses': int, 'bytes': int, 'entries': int}
+    """
+    return _section_cache.stats()
+
+
+# Função para limpar o cache:
+def clear_section_cache():
+    """ Essa função tem a responsabilidade de esvaziar o cache de seções e zerar os contadores. """
+    _section_cache.clear()
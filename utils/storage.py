@@ -0,0 +1,367 @@
+""" Artefato colunar (Parquet) com o dataset já limpo.
+
+    Construção do artefato (a partir da raiz do projeto):
+        python -m utils.storage
+"""
+#==============================================
+# Libraries
+#==============================================
+import hashlib
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.aggregates import AGGREGATE_KEYS, build_aggregates
+from utils.cleaning import bytes_per_row, clean_dataframe, compact_dataframe
+from utils.competition import competition_metrics
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Caminho padrão do dataset bruto:
+DATASET_PATH = 'dataset/zomato.csv'
+
+# Caminho padrão do artefato limpo:
+ARTIFACT_PATH = 'dataset/zomato.parquet'
+
+# Versão do esquema do artefato - deve ser incrementada sempre que a limpeza mudar as colunas ou os tipos gerados:
+SCHEMA_VERSION = 4
+
+# Chave dos metadados do projeto dentro do esquema Parquet:
+METADATA_KEY = b'zomato'
+
+# Tipo Arrow usado para as colunas category (dicionário de textos):
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+# Variável ARTIFACT_FIELDS - Colunas do artefato, na ordem de adjust_columns_order, com tipos fixos.
+# Os inteiros são gravados como int64 para que chunks diferentes (utils.ingest) usem sempre o mesmo esquema; a redução para o menor
+# tipo acontece na leitura (compact_dataframe).
+ARTIFACT_FIELDS = [
+    ('restaurant_id', pa.int64()),
+    ('restaurant_name', pa.string()),
+    ('country', CATEGORY),
+    ('city', CATEGORY),
+    ('address', pa.string()),
+    ('locality', CATEGORY),
+    ('locality_verbose', pa.string()),
+    ('longitude', pa.float64()),
+    ('latitude', pa.float64()),
+    ('cuisines', CATEGORY),
+    ('price_range', pa.int64()),
+    ('price_type', CATEGORY),
+    ('average_cost_for_two', pa.int64()),
+    ('currency', CATEGORY),
+    ('has_table_booking', pa.bool_()),
+    ('has_online_delivery', pa.bool_()),
+    ('is_delivering_now', pa.bool_()),
+    ('aggregate_rating', pa.float64()),
+    ('rating_color', CATEGORY),
+    ('color_name', CATEGORY),
+    ('rating_text', CATEGORY),
+    ('votes', pa.int64()),
+]
+
+#==============================================
+# Funções
+#==============================================
+# Função para calcular o hash do conteúdo de um arquivo:
+def file_hash(path):
+    """ Essa função tem a responsabilidade de calcular o hash SHA-256 do conteúdo de um arquivo, lendo-o em blocos.
+
+        Input: caminho do arquivo
+        Output: hash hexadecimal (str)
+    """
+    sha = hashlib.sha256()
+
+    with open(path, 'rb') as f:
+
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+
+    return sha.hexdigest()
+
+
+# Função para montar o esquema do artefato:
+def artifact_schema(source_hash, version=None, deltas=()):
+    """ Essa função tem a responsabilidade de montar o esquema Arrow do artefato, com a versão do esquema, o hash do CSV de origem,
+        a versão dos dados e os hashes dos arquivos de atualização (utils.ingest.append_delta) gravados nos metadados.
+
+        Input:
+            - source_hash: hash do CSV bruto que gerou os dados
+            - version: versão dos dados (igual ao source_hash quando não há atualizações)
+            - deltas: lista com os hashes dos arquivos de atualização já aplicados
+        Output: pa.Schema
+    """
+    metadata = {'schema_version': SCHEMA_VERSION,
+                'source_hash': source_hash,
+                'version': version or source_hash,
+                'deltas': list(deltas)}
+
+    return pa.schema(ARTIFACT_FIELDS, metadata={METADATA_KEY: json.dumps(metadata).encode()})
+
+
+# Função para obter o caminho da tabela de agregados:
+def aggregates_path(artifact=ARTIFACT_PATH):
+    """ Essa função tem a responsabilidade de retornar o caminho da tabela de agregados gravada ao lado do artefato.
+
+        Input: caminho do arquivo Parquet do artefato
+        Output: caminho do arquivo Parquet dos agregados
+    """
+    return artifact.replace('.parquet', '_aggregates.parquet')
+
+
+# Função para obter o caminho das métricas de concorrência:
+def competition_path(artifact=ARTIFACT_PATH):
+    """ Essa função tem a responsabilidade de retornar o caminho das métricas de concorrência (utils.competition) gravadas ao lado do
+        artefato.
+
+        Input: caminho do arquivo Parquet do artefato
+        Output: caminho do arquivo Parquet das métricas de concorrência
+    """
+    return artifact.replace('.parquet', '_competition.parquet')
+
+
+# Função para gravar um arquivo Parquet sem expor um arquivo pela metade:
+def _replace_parquet(table, path):
+    """ Grava em um arquivo temporário e substitui o antigo, para que nenhuma leitura encontre um arquivo pela metade. """
+    tmp_path = f'{path}.tmp'
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+# Função para gravar uma tabela derivada com a versão dos dados:
+def _write_versioned(table, version, path):
+    """ Grava uma tabela derivada do artefato (agregados, concorrência) com a versão do esquema e a versão dos dados de origem. """
+    metadata = dict(table.schema.metadata or {})
+    metadata[METADATA_KEY] = json.dumps({'schema_version': SCHEMA_VERSION, 'version': version}).encode()
+
+    _replace_parquet(table.replace_schema_metadata(metadata), path)
+
+
+# Função para ler uma tabela derivada da versão dos dados informada:
+def _read_versioned(path, version):
+    """ Retorna a tabela derivada gravada em `path` se ela corresponder ao esquema atual e à versão dos dados informada, ou None. """
+    if not os.path.exists(path):
+        return None
+
+    table = pq.read_table(path)
+    metadata = json.loads((table.schema.metadata or {}).get(METADATA_KEY, b'{}'))
+
+    if metadata.get('schema_version') == SCHEMA_VERSION and metadata.get('version') == version:
+        return table
+
+    return None
+
+
+# Função para gravar o artefato limpo:
+def write_artifact(df, source_hash, artifact=ARTIFACT_PATH, version=None, deltas=()):
+    """ Essa função tem a responsabilidade de gravar o dataframe limpo em Parquet, junto com a versão do esquema e o hash do CSV de origem.
+
+        Input:
+            - df: dataframe limpo
+            - source_hash: hash do CSV bruto que gerou o dataframe
+            - artifact: caminho do arquivo Parquet
+            - version, deltas: ver artifact_schema
+        Output: None
+    """
+    table = pa.Table.from_pandas(df, schema=artifact_schema(source_hash, version, deltas), preserve_index=False)
+
+    _replace_parquet(table, artifact)
+
+    return None
+
+
+# Função para gravar a tabela de agregados:
+def write_aggregates(aggregates, version, artifact=ARTIFACT_PATH):
+    """ Essa função tem a responsabilidade de gravar a tabela de agregados (utils.aggregates) ao lado do artefato, com a versão dos dados
+        de onde ela foi calculada.
+
+        Input:
+            - aggregates: tabela de agregados
+            - version: versão dos dados do artefato
+            - artifact: caminho do arquivo Parquet do artefato
+        Output: None
+    """
+    _write_versioned(pa.Table.from_pandas(aggregates.reset_index(), preserve_index=False), version, aggregates_path(artifact))
+
+    return None
+
+
+# Função para gravar as métricas de concorrência:
+def write_competition(competition, version, artifact=ARTIFACT_PATH):
+    """ Essa função tem a responsabilidade de gravar as métricas de concorrência (utils.competition) ao lado do artefato, na ordem das
+        linhas do artefato, com a versão dos dados de onde elas foram calculadas.
+
+        Input:
+            - competition: Dataframe de competition_metrics
+            - version: versão dos dados do artefato
+            - artifact: caminho do arquivo Parquet do artefato
+        Output: None
+    """
+    _write_versioned(pa.Table.from_pandas(competition, preserve_index=False), version, competition_path(artifact))
+
+    return None
+
+
+# Função para construir o artefato a partir do CSV:
+def build_artifact(source=DATASET_PATH, artifact=ARTIFACT_PATH, cache_dir=None):
+    """ Essa função tem a responsabilidade de executar clean_dataframe uma única vez sobre o CSV bruto e gravar o artefato Parquet
+        já na representação compacta (compact_dataframe), junto com a tabela de agregados e as métricas de concorrência.
+        Com cache_dir, as etapas da limpeza usam o cache em disco (utils.cleaning.run_cleaning): somente as etapas afetadas por uma
+        mudança são executadas.
+
+        Input:
+            - source: caminho do CSV bruto
+            - artifact: caminho do arquivo Parquet
+            - cache_dir: pasta do cache em disco das etapas da limpeza (ex.: utils.cleaning.CLEANING_CACHE_DIR) - None limpa sem cache
+        Output: Dataframe limpo e compacto
+    """
+    source_hash = file_hash(source)
+
+    df = compact_dataframe(clean_dataframe(pd.read_csv(source), cache_dir=cache_dir, fingerprint=source_hash))
+
+    write_artifact(df, source_hash, artifact)
+    write_aggregates(build_aggregates(df), source_hash, artifact)
+    write_competition(competition_metrics(df), source_hash, artifact)
+
+    return df
+
+
+# Função para ler os metadados do artefato:
+def artifact_metadata(artifact=ARTIFACT_PATH):
+    """ Essa função tem a responsabilidade de ler a versão do esquema e o hash de origem gravados no artefato, sem ler os dados.
+
+        Input: caminho do arquivo Parquet
+        Output: dict {'schema_version', 'source_hash', 'version', 'deltas'} ou None se o artefato não existir ou não tiver metadados
+    """
+    if not os.path.exists(artifact):
+        return None
+
+    metadata = pq.read_schema(artifact).metadata or {}
+
+    if METADATA_KEY not in metadata:
+        return None
+
+    return json.loads(metadata[METADATA_KEY])
+
+
+# Função para verificar se o artefato corresponde ao CSV atual:
+def artifact_is_fresh(source_hash, artifact=ARTIFACT_PATH):
+    """ Essa função tem a responsabilidade de verificar se o artefato existe, usa o esquema atual e foi gerado a partir do CSV informado.
+
+        Input:
+            - source_hash: hash do CSV bruto atual
+            - artifact: caminho do arquivo Parquet
+        Output: bool
+    """
+    metadata = artifact_metadata(artifact)
+
+    return (metadata is not None
+            and metadata.get('schema_version') == SCHEMA_VERSION
+            and metadata.get('source_hash') == source_hash)
+
+
+# Função para obter a versão dos dados:
+def artifact_version(source_hash, artifact=ARTIFACT_PATH):
+    """ Essa função tem a responsabilidade de retornar a versão dos dados que load_clean vai entregar: a versão gravada no artefato
+        (que muda a cada atualização incremental) ou, se o artefato estiver desatualizado, o próprio hash do CSV.
+
+        Input:
+            - source_hash: hash do CSV bruto atual
+            - artifact: caminho do arquivo Parquet
+        Output: versão (str)
+    """
+    if artifact_is_fresh(source_hash, artifact):
+        return artifact_metadata(artifact).get('version', source_hash)
+
+    return source_hash
+
+
+# Função para carregar o dataset limpo:
+def load_clean(source=DATASET_PATH, source_hash=None, artifact=ARTIFACT_PATH, cache_dir=None):
+    """ Essa função tem a responsabilidade de carregar o dataset limpo a partir do artefato Parquet.
+        Se o artefato estiver ausente ou desatualizado (esquema antigo ou hash diferente do CSV), limpa o CSV bruto - com cache_dir, usando
+        o cache em disco das etapas da limpeza.
+        Nos dois casos o resultado passa por compact_dataframe.
+
+        Input:
+            - source: caminho do CSV bruto
+            - source_hash: hash do CSV bruto (calculado aqui se não for informado)
+            - artifact: caminho do arquivo Parquet
+            - cache_dir: pasta do cache em disco das etapas da limpeza - None limpa sem cache
+        Output: Dataframe limpo e compacto
+    """
+    if source_hash is None:
+        source_hash = file_hash(source)
+
+    if artifact_is_fresh(source_hash, artifact):
+        return compact_dataframe(pq.read_table(artifact).to_pandas())
+
+    return compact_dataframe(clean_dataframe(pd.read_csv(source), cache_dir=cache_dir, fingerprint=source_hash))
+
+
+# Função para carregar a tabela de agregados:
+def load_aggregates(df, version, artifact=ARTIFACT_PATH):
+    """ Essa função tem a responsabilidade de carregar a tabela de agregados gravada ao lado do artefato, se ela corresponder à versão
+        dos dados informada. Caso contrário, calcula a tabela a partir do dataframe.
+
+        Input:
+            - df: dataframe limpo (usado somente se a tabela gravada estiver ausente ou desatualizada)
+            - version: versão dos dados (artifact_version)
+            - artifact: caminho do arquivo Parquet do artefato
+        Output: tabela de agregados
+    """
+    table = _read_versioned(aggregates_path(artifact), version)
+
+    if table is not None:
+        return table.to_pandas().set_index(AGGREGATE_KEYS)
+
+    return build_aggregates(df)
+
+
+# Função para ler as métricas de concorrência gravadas:
+def read_competition(version, artifact=ARTIFACT_PATH):
+    """ Essa função tem a responsabilidade de ler as métricas de concorrência gravadas ao lado do artefato, se elas corresponderem à
+        versão dos dados informada.
+
+        Input:
+            - version: versão dos dados (artifact_version)
+            - artifact: caminho do arquivo Parquet do artefato
+        Output: Dataframe com as colunas de utils.competition.COMPETITION_COLUMNS, na ordem das linhas do artefato, ou None
+    """
+    table = _read_versioned(competition_path(artifact), version)
+
+    return None if table is None else table.to_pandas()
+
+
+# Função para carregar as métricas de concorrência:
+def load_competition(df, version, artifact=ARTIFACT_PATH):
+    """ Essa função tem a responsabilidade de carregar as métricas de concorrência gravadas ao lado do artefato, se elas corresponderem
+        à versão dos dados informada. Caso contrário, calcula as métricas a partir do dataframe.
+
+        Input:
+            - df: dataframe limpo (usado somente se as métricas gravadas estiverem ausentes ou desatualizadas)
+            - version: versão dos dados (artifact_version)
+            - artifact: caminho do arquivo Parquet do artefato
+        Output: Dataframe com o mesmo index do df e as colunas de utils.competition.COMPETITION_COLUMNS
+    """
+    competition = read_competition(version, artifact)
+
+    if competition is not None and len(competition) == len(df):
+        return competition.set_index(df.index)
+
+    return competition_metrics(df)
+
+
+#==============================================
+# Execução
+#==============================================
+if __name__ == '__main__':
+
+    df = build_artifact()
+
+    print(f'{ARTIFACT_PATH}: {len(df)} linhas, esquema v{SCHEMA_VERSION}, origem {file_hash(DATASET_PATH)[:12]}')
+    print(f'bytes por linha: {bytes_per_row(clean_dataframe(pd.read_csv(DATASET_PATH))):.0f} (limpo) -> {bytes_per_row(df):.0f} (compacto)')
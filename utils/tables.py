@@ -0,0 +1,97 @@
+""" Tabela Arrow do dataset limpo, mantida ao lado do dataframe, para as tabelas exibidas com st.dataframe.
+
+    O st.dataframe converte um dataframe do pandas para Arrow a cada execução da página (pa.Table.from_pandas, incluindo as colunas de
+    texto); uma pa.Table é serializada diretamente. As tabelas das páginas são montadas a partir da tabela Arrow do dataset: um trecho
+    contínuo de linhas é uma fatia sem cópia (pa.Table.slice) e um conjunto qualquer de linhas copia somente essas linhas
+    (pa.Table.take), sem passar pelo pandas.
+
+    O navegador lê os nomes, os tipos das colunas e o index da tabela nos metadados 'pandas' do esquema, então cada tabela selecionada
+    leva os metadados somente das suas colunas (os do dataset inteiro descrevem todas as colunas e aumentariam a mensagem).
+"""
+#==============================================
+# Libraries
+#==============================================
+import json
+
+import numpy as np
+import pyarrow as pa
+
+#==============================================
+# Variáveis auxiliares
+#==============================================
+# Chave dos metadados do pandas no esquema Arrow:
+PANDAS_METADATA_KEY = b'pandas'
+
+#==============================================
+# Funções
+#==============================================
+# Função para construir a tabela Arrow do dataset:
+def build_arrow_table(df):
+    """ Essa função tem a responsabilidade de converter o dataframe limpo para uma tabela Arrow, uma única vez por versão dos dados.
+        As colunas category viram colunas de dicionário, como na conversão feita pelo st.dataframe.
+
+        Input: Dataframe limpo
+        Output: pa.Table com as mesmas colunas, na mesma ordem (sem o index)
+        OBS: As linhas da tabela correspondem às posições (df.iloc) do dataframe.
+    """
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+# Função para gravar os metadados do pandas de uma tabela selecionada:
+def _with_metadata(table, metadata, columns, index):
+    """ Retorna a tabela com os metadados 'pandas' restritos às colunas `columns` (entradas de metadata['columns']) e o index `index`. """
+    metadata = {**metadata, 'index_columns': [index], 'columns': columns}
+
+    return table.replace_schema_metadata({PANDAS_METADATA_KEY: json.dumps(metadata).encode()})
+
+
+# Função para selecionar linhas e colunas da tabela Arrow:
+def table_rows(table, rows, columns, index_name=None, index_start=0):
+    """ Essa função tem a responsabilidade de selecionar as linhas e as colunas de uma tabela exibida na página. Quando as posições são
+        consecutivas, a tabela é uma fatia sem cópia da tabela do dataset; caso contrário, somente as linhas selecionadas são copiadas.
+
+        Input:
+            - table: tabela Arrow do dataset (build_arrow_table)
+            - rows: np.ndarray de posições (df.iloc), na ordem em que as linhas devem aparecer
+            - columns: lista de colunas, na ordem em que devem aparecer
+            - index_name: nome do index exibido (ex.: 'posição')
+            - index_start: primeiro valor do index - o index é uma sequência (RangeIndex), que não ocupa espaço na mensagem
+        Output: pa.Table
+    """
+    metadata = json.loads(table.schema.metadata[PANDAS_METADATA_KEY])
+    fields = {column['field_name']: column for column in metadata['columns']}
+
+    rows = np.asarray(rows)
+
+    if len(rows) == 0 or np.all(np.diff(rows) == 1):
+        selected = table.select(columns).slice(int(rows[0]) if len(rows) else 0, len(rows))
+    else:
+        selected = table.select(columns).take(rows)
+
+    index = {'kind': 'range', 'name': index_name, 'start': index_start, 'stop': index_start + len(rows), 'step': 1}
+
+    return _with_metadata(selected, metadata, [fields[column] for column in columns], index)
+
+
+# Função para acrescentar colunas calculadas a uma tabela selecionada:
+def append_columns(table, **arrays):
+    """ Essa função tem a responsabilidade de acrescentar colunas calculadas na página (ex.: distância até o ponto da busca) ao fim de
+        uma tabela de table_rows, com os metadados correspondentes.
+
+        Input:
+            - table: tabela de table_rows
+            - arrays: nome da coluna -> np.ndarray numérico com uma posição por linha da tabela
+        Output: pa.Table
+    """
+    metadata = json.loads(table.schema.metadata[PANDAS_METADATA_KEY])
+    columns = list(metadata['columns'])
+
+    for name, values in arrays.items():
+
+        values = np.asarray(values)
+
+        table = table.append_column(name, pa.array(values))
+        columns.append({'name': name, 'field_name': name, 'pandas_type': values.dtype.name, 'numpy_type': values.dtype.name,
+                        'metadata': None})
+
+    return _with_metadata(table, metadata, columns, metadata['index_columns'][0])